@@ -37,8 +37,12 @@ def list_markets() -> list[str]:
 
 
 def market_mongo_filter(market: str) -> dict:
-    """Match docs for a venue; US includes legacy rows without market field."""
+    """
+    Match docs for a venue; US includes legacy rows without market field
+    (null matches a missing field, and as point values it keeps the
+    (market, ...) indexes usable for sorts).
+    """
     code = normalize_market(market)
     if code == "US":
-        return {"$or": [{"market": "US"}, {"market": {"$exists": False}}]}
+        return {"market": {"$in": ["US", None]}}
     return {"market": code}
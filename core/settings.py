@@ -27,9 +27,14 @@ REDIS_URI = os.getenv("REDIS_URI") or os.getenv("REDISCLOUD_URL")
 
 # PostgreSQL read-model configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
+PG_POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+OHLCV_SYNC_POOL_MAX_SIZE = int(os.getenv("OHLCV_SYNC_POOL_MAX_SIZE", "5"))
 PG_STORAGE_LIMIT_BYTES = int(os.getenv("PG_STORAGE_LIMIT_BYTES", "10737418240"))
 MONGO_HOT_WINDOW_DAYS = int(os.getenv("MONGO_HOT_WINDOW_DAYS", "70"))
 OHLCV_CACHE_DISABLED = os.getenv("OHLCV_CACHE_DISABLED", "0") == "1"
+OHLCV_GROUPED_INGEST = os.getenv("OHLCV_GROUPED_INGEST", "1") == "1"
+# per-session ticker universe in Postgres, mirrored in Redis
+TICKER_UNIVERSE_STORE_DISABLED = os.getenv("TICKER_UNIVERSE_STORE_DISABLED", "0") == "1"
 OHLCV_LOOKBACK_BUFFER_DAYS = int(
     os.getenv("OHLCV_LOOKBACK_BUFFER_DAYS", str(MONGO_HOT_WINDOW_DAYS + 85))
 )
@@ -55,13 +60,50 @@ QUANDL_SLEEP_MINUTES = int(os.getenv("QUANDL_SLEEP_MINUTES", 10))
 
 # Polygon API key
 POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
+POLYGON_BASE_URL = os.getenv("POLYGON_BASE_URL", "https://api.polygon.io")
 
 # EODHD API key (Toronto / TO market)
 EODHD_API_KEY = os.getenv("EODHD_API_KEY")
+EODHD_BASE_URL = os.getenv("EODHD_BASE_URL", "https://eodhd.com/api")
 
-# Cron parallel ingest
+# Serve markets from recorded column files instead of the vendors (providers/replay.py)
+MARKET_DATA_REPLAY_DIR = os.getenv("MARKET_DATA_REPLAY_DIR")
+
+# Pooled async HTTP transport for market data providers
+PROVIDER_HTTP_MAX_CONNECTIONS = int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "100"))
+PROVIDER_HTTP_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_HTTP_TIMEOUT_SECONDS", "60"))
+
+# Provider plan quotas (requests/second, 0 = unmetered) and adaptive in-flight bounds
+POLYGON_REQUESTS_PER_SECOND = float(os.getenv("POLYGON_REQUESTS_PER_SECOND", "100"))
+EODHD_REQUESTS_PER_SECOND = float(os.getenv("EODHD_REQUESTS_PER_SECOND", "16"))
+PROVIDER_MIN_CONCURRENCY = int(os.getenv("PROVIDER_MIN_CONCURRENCY", "2"))
+PROVIDER_MAX_CONCURRENCY = int(os.getenv("PROVIDER_MAX_CONCURRENCY", "64"))
+PROVIDER_TARGET_LATENCY_SECONDS = float(os.getenv("PROVIDER_TARGET_LATENCY_SECONDS", "2"))
+
+# Cron parallel ingest (CRON_MAX_WORKERS also seeds the provider in-flight limit)
 CRON_MAX_WORKERS = int(os.getenv("CRON_MAX_WORKERS", "15"))
 CRON_INSERT_BATCH_SIZE = int(os.getenv("CRON_INSERT_BATCH_SIZE", "500"))
+# analytics upsert batches in flight at once on the Motor pool
+CRON_INSERT_CONCURRENCY = int(os.getenv("CRON_INSERT_CONCURRENCY", "4"))
+# worker processes for indicator math (0 computes in a thread instead)
+CRON_CPU_WORKERS = int(os.getenv("CRON_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+CRON_COMPUTE_CHUNK_SIZE = int(os.getenv("CRON_COMPUTE_CHUNK_SIZE", "500"))
+# markets run concurrently; sessions within one market share this many slots
+CRON_SESSIONS_PER_MARKET = int(os.getenv("CRON_SESSIONS_PER_MARKET", "1"))
+# negative-result cache: tickers without usable data are skipped for the session
+TICKER_SKIP_CACHE_DISABLED = os.getenv("TICKER_SKIP_CACHE_DISABLED", "0") == "1"
+CRON_RETRY_SKIPPED_TICKERS = os.getenv("CRON_RETRY_SKIPPED_TICKERS", "0") == "1"
+TICKER_SKIP_MISMATCH_RETRY_MINUTES = int(
+    os.getenv("TICKER_SKIP_MISMATCH_RETRY_MINUTES", "120")
+)
+# per-market trading-session calendar (Postgres) for probes and window checks
+SESSION_CALENDAR_DISABLED = os.getenv("SESSION_CALENDAR_DISABLED", "0") == "1"
+# day-over-day base analytics from per-ticker state (needs the bar store)
+INDICATOR_STATE_DISABLED = os.getenv("INDICATOR_STATE_DISABLED", "0") == "1"
+# per-ticker tracking appearance bitsets for frequency reads (Mongo)
+TRACKING_APPEARANCES_DISABLED = os.getenv("TRACKING_APPEARANCES_DISABLED", "0") == "1"
+# how often the cron runtime samples asyncpg pool occupancy for its report
+CRON_POOL_SAMPLE_SECONDS = float(os.getenv("CRON_POOL_SAMPLE_SECONDS", "0.5"))
 
 # Session probe tickers (LastCompletedSession resolution)
 PROBE_TICKER_US = os.getenv("PROBE_TICKER_US", "SPY")
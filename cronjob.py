@@ -7,19 +7,23 @@ Raises:
 """
 
 import argparse
+import json
 import sys
-from dataclasses import dataclass, field
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
 from typing import Optional
 
-from time import time
+from time import perf_counter, time
 from core.markets import MARKETS, list_markets, normalize_market
+import core.settings as settings
 from core.settings import MONGO_HOT_WINDOW_DAYS
 from db.crud.analytics import get_analytics_tickers
 from db.crud.tracking import put_top_tickers
 from db.crud.published_archive import is_session_published
 from db.crud.mongo_storage import prune_mongo_session_date
+from db.crud.cron_spans import insert_cron_spans
 from db.mongodb import connect as connect_mongo, get_database as get_mongo_database, close as close_mongo
-from db.postgres import connect as connect_postgres, get_pool as get_postgres_pool, close as close_postgres
 from utils.handle_telegram import notify_developer
 from utils.handle_datetimes import (
     get_past_date,
@@ -29,6 +33,10 @@ from utils.handle_validation import validate_date_string
 from utils.handle_external_apis import clear_ticker_universe_cache
 import services.analytics_service as analytics_service
 import services.publish_service as publish_service
+from providers.rate_limiter import throttle_stats
+from services.compute_pool import shutdown_compute_pool
+from services.cron_runtime import CronRuntime, open_cron_runtime
+from services.stage_timings import StageTimings
 from services.cron_dates import unpublished_session_dates
 import scripts.mongo_storage_monitor as mongo_storage_monitor
 
@@ -49,9 +57,24 @@ class CronPhaseError:
     error: str
 
 
+@dataclass
+class CronSpan:
+    market: str
+    date: str
+    phase: str
+    seconds: float
+    counts: dict = field(default_factory=dict)
+
+
 @dataclass
 class CronRunReport:
     errors: list[CronPhaseError] = field(default_factory=list)
+    spans: list[CronSpan] = field(default_factory=list)
+    throttle_stats: dict = field(default_factory=dict)
+    market_seconds: dict = field(default_factory=dict)
+    resource_stats: dict = field(default_factory=dict)
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
     def record(self, market: str, date: str, phase: str, error: Exception | str) -> None:
         message = str(error)
@@ -70,19 +93,133 @@ class CronRunReport:
             subject="Cronjob Report",
         )
 
+    def record_span(
+        self,
+        market: str,
+        date: str,
+        phase: str,
+        seconds: float,
+        counts: Optional[dict] = None,
+    ) -> None:
+        self.spans.append(
+            CronSpan(
+                market=market,
+                date=date,
+                phase=phase,
+                seconds=seconds,
+                counts=dict(counts or {}),
+            )
+        )
+
+    def record_stage_timings(self, market: str, date: str, timings: StageTimings) -> None:
+        for stage, seconds in timings.seconds.items():
+            self.record_span(market, date, stage, seconds, timings.counts.get(stage))
+
+    def record_market_time(self, market: str, seconds: float) -> None:
+        self.market_seconds[market] = seconds
+
+    def market_errors(self, market: str) -> list[CronPhaseError]:
+        return [item for item in self.errors if item.market == market]
+
+    def market_text(self) -> str:
+        lines = ["Market wall time:"]
+        for market, seconds in self.market_seconds.items():
+            lines.append(
+                f"- {market}: {round(seconds, 2)}s,"
+                f" {len(self.market_errors(market))} phase errors"
+            )
+        return "\n".join(lines)
+
+    def record_throttle_stats(self, stats: dict) -> None:
+        self.throttle_stats = dict(stats)
+
+    def record_resource_stats(self, stats: dict) -> None:
+        self.resource_stats = dict(stats)
+
     def has_errors(self) -> bool:
         return bool(self.errors)
 
-    def summary_text(self) -> str:
-        if not self.errors:
-            return "Cron run completed with no recorded phase errors."
-        lines = ["Cron run completed with errors:"]
-        for item in self.errors:
+    def stage_timings_text(self) -> str:
+        lines = ["Stage wall time:"]
+        for item in self.spans:
+            line = f"- {item.market} {item.date} [{item.phase}]: {round(item.seconds, 2)}s"
+            if item.counts:
+                line += " (" + ", ".join(
+                    f"{key}={value}" for key, value in sorted(item.counts.items())
+                ) + ")"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def spans_json(self) -> str:
+        """One JSON document with every span of the run, for log shipping."""
+        return json.dumps(
+            {
+                "run_id": self.run_id,
+                "started_at": self.started_at.isoformat(),
+                "spans": [asdict(item) for item in self.spans],
+            },
+            sort_keys=True,
+        )
+
+    def throttle_stats_text(self) -> str:
+        lines = ["Provider throttling:"]
+        for provider, stats in sorted(self.throttle_stats.items()):
             lines.append(
-                f"- {item.market} {item.date} [{item.phase}]: {item.error}"
+                f"- {provider}: requests={stats['requests']},"
+                f" throttled={stats['throttled']},"
+                f" paused={round(stats['paused_seconds'], 2)}s"
+                f" ({stats['pauses']} pauses),"
+                f" token_wait={round(stats['token_wait_seconds'], 2)}s,"
+                f" in_flight_limit={round(stats['limit_min'], 1)}"
+                f"..{round(stats['limit_max'], 1)}"
+                f" (final {round(stats['limit'], 1)},"
+                f" {stats['concurrency_decreases']} decreases)"
             )
         return "\n".join(lines)
 
+    def resource_stats_text(self) -> str:
+        lines = ["Pool utilisation:"]
+        for resource, stats in sorted(self.resource_stats.items()):
+            parts = []
+            if "max_size" in stats:
+                parts.append(
+                    f"peak={stats.get('peak_in_use', 'n/a')}/{stats['max_size']}"
+                )
+            if "checkouts" in stats:
+                parts.append(f"checkouts={stats['checkouts']}")
+            if "wait_seconds" in stats:
+                parts.append(f"wait={round(stats['wait_seconds'], 2)}s")
+            if "max_wait_seconds" in stats:
+                parts.append(f"max_wait={round(stats['max_wait_seconds'], 3)}s")
+            if "samples" in stats:
+                parts.append(
+                    f"saturated={stats['saturated_samples']}/{stats['samples']} samples"
+                )
+            if "warmup_seconds" in stats:
+                parts.append(f"warmup={round(stats['warmup_seconds'], 2)}s")
+            lines.append(f"- {resource}: " + ", ".join(parts))
+        return "\n".join(lines)
+
+    def summary_text(self) -> str:
+        if not self.errors:
+            summary = "Cron run completed with no recorded phase errors."
+        else:
+            lines = ["Cron run completed with errors:"]
+            for item in self.errors:
+                lines.append(
+                    f"- {item.market} {item.date} [{item.phase}]: {item.error}"
+                )
+            summary = "\n".join(lines)
+        if self.market_seconds:
+            summary += "\n" + self.market_text()
+        if self.spans:
+            summary += "\n" + self.stage_timings_text()
+        if self.throttle_stats:
+            summary += "\n" + self.throttle_stats_text()
+        if self.resource_stats:
+            summary += "\n" + self.resource_stats_text()
+        return summary
+
 
 def reset_cron_failed() -> None:
     global _cron_failed
@@ -128,26 +265,38 @@ async def run_crud_ops(
     market: str,
     pg_pool=None,
     report: Optional[CronRunReport] = None,
+    runtime: Optional[CronRuntime] = None,
 ) -> str:
     market = normalize_market(market)
     report = report or CronRunReport()
     msgs: list[str] = []
     ingest_ok = False
 
-    await connect_mongo()
-    conn = await get_mongo_database()
+    if runtime is not None:
+        conn = runtime.mongo
+        pg_pool = pg_pool if pg_pool is not None else runtime.pg_pool
+        owns_mongo = False
+    else:
+        # standalone calls open a client unless one is already connected
+        owns_mongo = await get_mongo_database() is None
+        if owns_mongo:
+            await connect_mongo()
+        conn = await get_mongo_database()
+    # ingest adds its own stages; the cron phases around it share the spans
+    timings = StageTimings()
     try:
         if pg_pool is not None and await is_session_published(
             pg_pool, date_to_remove, market
         ):
             try:
-                await prune_mongo_session_date(conn, date_to_remove, market)
+                with timings.stage("prune"):
+                    await prune_mongo_session_date(conn, date_to_remove, market)
             except Exception as prune_error:  # pylint: disable=broad-except
                 report.record(market, date_to_insert, "prune", prune_error)
 
         try:
             msg_compute = await analytics_service.ingest_base_analytics_for_market(
-                conn, date_to_insert, market=market
+                conn, date_to_insert, market=market, timings=timings
             )
             msgs.append(msg_compute)
             ingest_ok = True
@@ -156,7 +305,8 @@ async def run_crud_ops(
             return "\n\n".join(msgs)
 
         try:
-            msg_track = await put_top_tickers(conn, date_to_insert, market=market)
+            with timings.stage("track"):
+                msg_track = await put_top_tickers(conn, date_to_insert, market=market)
             msgs.append(msg_track)
         except Exception as track_error:  # pylint: disable=broad-except
             report.record(market, date_to_insert, "track", track_error)
@@ -175,13 +325,17 @@ async def run_crud_ops(
             return "\n\n".join(msgs)
 
         try:
-            publish_result = await publish_service.publish_day(
-                conn,
-                pg_pool,
-                date_to_insert,
-                market=market,
-                include_mentions=False,
-            )
+            with timings.stage("publish"):
+                publish_result = await publish_service.publish_day(
+                    conn,
+                    pg_pool,
+                    date_to_insert,
+                    market=market,
+                    include_mentions=False,
+                )
+            timings.count("publish", "tickers", len(tickers_in_mongo))
+            timings.count("publish", "rows_written", publish_result["tickers_written"])
+            timings.count("publish", "artifacts", publish_result["artifacts_written"])
             for phase_error in publish_result.get("phase_errors") or []:
                 report.record(market, date_to_insert, "market_analytics", phase_error)
             msgs.append(_format_publish_message(publish_result))
@@ -191,17 +345,21 @@ async def run_crud_ops(
 
         return "\n\n".join(msgs)
     finally:
-        await close_mongo()
+        report.record_stage_timings(market, date_to_insert, timings)
+        if owns_mongo:
+            await close_mongo()
 
 
 async def _finalize_cron_run(report: CronRunReport, start_time: float, market_timings: list):
     total_elapsed = round(time() - start_time, 2)
+    report.record_throttle_stats(throttle_stats())
     print(f"\nAnalytics cronjob finished on {total_elapsed} seconds")
     if market_timings:
         print("Per-market summary:")
         for market, elapsed in market_timings:
             print(f"  {market}: {elapsed}s")
     print(report.summary_text())
+    print(f"Cron spans: {report.spans_json()}")
     if report.has_errors():
         notify_developer(
             body=report.summary_text(),
@@ -210,6 +368,90 @@ async def _finalize_cron_run(report: CronRunReport, start_time: float, market_ti
     print("--------------------------------------------------------")
 
 
+async def _persist_spans(pg_pool, report: CronRunReport) -> None:
+    """Append the run's spans to the cron_spans history (failures only logged)."""
+    if not report.spans:
+        return
+    try:
+        await insert_cron_spans(
+            pg_pool,
+            report.run_id,
+            report.started_at,
+            [asdict(item) for item in report.spans],
+        )
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"cronjob.py _persist_spans: {exc}")
+
+
+async def _run_market_dates(
+    market: str, dates: list, runtime: CronRuntime, report: CronRunReport
+) -> float:
+    """Run every session of one market; return its wall time in seconds."""
+    from core.settings import CRON_SESSIONS_PER_MARKET
+
+    market_start = time()
+    semaphore = asyncio.Semaphore(max(CRON_SESSIONS_PER_MARKET, 1))
+
+    async def run_date(curr_date: str):
+        async with semaphore:
+            date_start = time()
+            validate_date_string(curr_date)
+            past_date = get_past_date(MONGO_HOT_WINDOW_DAYS, curr_date)
+            try:
+                msg = await run_crud_ops(
+                    curr_date,
+                    past_date,
+                    market=market,
+                    pg_pool=runtime.pg_pool,
+                    report=report,
+                    runtime=runtime,
+                )
+            except Exception as ops_error:  # pylint: disable=broad-except
+                report.record(market, curr_date, "run_crud_ops", ops_error)
+                print(f"run_crud_ops failed for {market} {curr_date}: {ops_error}")
+            else:
+                print(msg)
+            print(
+                f"Market {market} date {curr_date} finished in "
+                f"{round(time() - date_start, 2)} seconds"
+            )
+
+    await asyncio.gather(*(run_date(curr_date) for curr_date in dates))
+    market_elapsed = round(time() - market_start, 2)
+    report.record_market_time(market, market_elapsed)
+    print(f"Market {market} total: {market_elapsed} seconds")
+    return market_elapsed
+
+
+async def _run_market(
+    market: str, runtime: CronRuntime, report: CronRunReport
+) -> Optional[float]:
+    market = normalize_market(market)
+    tz = MARKETS[market]["timezone"]
+
+    probe_start = perf_counter()
+    try:
+        target_dates = await unpublished_session_dates(runtime.pg_pool, market)
+    except Exception as probe_error:  # pylint: disable=broad-except
+        print(f"cronjob.py: session probe failed for {market} ({tz}): {probe_error}")
+        report.record(market, "n/a", "session_probe", probe_error)
+        return None
+    report.record_span(
+        market,
+        "n/a",
+        "session_probe",
+        perf_counter() - probe_start,
+        {"sessions": len(target_dates)},
+    )
+
+    print(f"Market {market} ({tz}) session dates: {target_dates}")
+    if not target_dates:
+        print(f"Market {market}: all latest sessions already published; skipping")
+        return None
+
+    return await _run_market_dates(market, target_dates, runtime, report)
+
+
 async def cronjob(markets=None, report: Optional[CronRunReport] = None):
     print("\n--------------------------------------------------------")
     print("Running analytics cronjob ...\n")
@@ -218,64 +460,35 @@ async def cronjob(markets=None, report: Optional[CronRunReport] = None):
     clear_ticker_universe_cache()
 
     markets_to_run = markets or list_markets()
-    pg_pool = None
     market_timings = []
 
     try:
-        await connect_postgres()
-        pg_pool = await get_postgres_pool()
-        await mongo_storage_monitor.run_monitor(manage_connections=False)
-        for market in markets_to_run:
-            market_start = time()
-            market = normalize_market(market)
-            tz = MARKETS[market]["timezone"]
-
+        async with open_cron_runtime(len(markets_to_run)) as runtime:
             try:
-                target_dates = await unpublished_session_dates(pg_pool, market)
-            except Exception as probe_error:  # pylint: disable=broad-except
-                print(
-                    f"cronjob.py: session probe failed for {market} ({tz}): {probe_error}"
+                monitor_start = perf_counter()
+                await mongo_storage_monitor.run_monitor(manage_connections=False)
+                report.record_span(
+                    "all", "n/a", "storage_monitor", perf_counter() - monitor_start
                 )
-                report.record(market, "n/a", "session_probe", probe_error)
-                continue
-
-            print(f"Market {market} ({tz}) session dates: {target_dates}")
-            if not target_dates:
-                print(f"Market {market}: all latest sessions already published; skipping")
-                continue
-
-            for curr_date in target_dates:
-                date_start = time()
-                validate_date_string(curr_date)
-                past_date = get_past_date(MONGO_HOT_WINDOW_DAYS, curr_date)
-                try:
-                    msg = await run_crud_ops(
-                        curr_date,
-                        past_date,
-                        market=market,
-                        pg_pool=pg_pool,
-                        report=report,
-                    )
-                except Exception as ops_error:  # pylint: disable=broad-except
-                    report.record(market, curr_date, "run_crud_ops", ops_error)
-                    print(f"run_crud_ops failed for {market} {curr_date}: {ops_error}")
-                else:
-                    print(msg)
-                print(
-                    f"Market {market} date {curr_date} finished in "
-                    f"{round(time() - date_start, 2)} seconds"
+                # markets use different providers, so they share no bottleneck
+                elapsed = await asyncio.gather(
+                    *(_run_market(market, runtime, report) for market in markets_to_run)
                 )
-
-            market_elapsed = round(time() - market_start, 2)
-            market_timings.append((market, market_elapsed))
-            print(f"Market {market} total: {market_elapsed} seconds")
+                market_timings = [
+                    (normalize_market(market), seconds)
+                    for market, seconds in zip(markets_to_run, elapsed)
+                    if seconds is not None
+                ]
+            finally:
+                report.record_resource_stats(runtime.utilisation())
+                await _persist_spans(runtime.pg_pool, report)
 
     except Exception as e:  # pylint: disable=W0703
         print("cronjob.py: Something went wrong.")
         print("Error message:", e)
         _notify_cron_failure(e)
     finally:
-        await close_postgres()
+        shutdown_compute_pool()
 
     await _finalize_cron_run(report, start_time, market_timings)
 
@@ -293,6 +506,11 @@ def _parse_args():
         action="append",
         help="Market code to process (repeatable). Default: all configured markets.",
     )
+    parser.add_argument(
+        "--retry-skipped",
+        action="store_true",
+        help="Retry tickers recorded as having no usable data for the session.",
+    )
     return parser.parse_args()
 
 
@@ -300,40 +518,38 @@ async def run_explicit_dates(dates, markets=None, report: Optional[CronRunReport
     markets_to_run = markets or list_markets()
     report = report or CronRunReport()
     start_time = time()
+    market_timings = []
 
     try:
-        await connect_postgres()
-        pg_pool = await get_postgres_pool()
-        for market in markets_to_run:
-            market = normalize_market(market)
-            for curr_date in dates:
-                validate_date_string(curr_date)
-                past_date = get_past_date(MONGO_HOT_WINDOW_DAYS, curr_date)
-                try:
-                    msg = await run_crud_ops(
-                        curr_date,
-                        past_date,
-                        market=market,
-                        pg_pool=pg_pool,
-                        report=report,
+        async with open_cron_runtime(len(markets_to_run)) as runtime:
+            try:
+                elapsed = await asyncio.gather(
+                    *(
+                        _run_market_dates(normalize_market(market), dates, runtime, report)
+                        for market in markets_to_run
                     )
-                except Exception as ops_error:  # pylint: disable=broad-except
-                    report.record(market, curr_date, "run_crud_ops", ops_error)
-                    print(f"run_crud_ops failed for {market} {curr_date}: {ops_error}")
-                else:
-                    print(msg)
+                )
+                market_timings = [
+                    (normalize_market(market), seconds)
+                    for market, seconds in zip(markets_to_run, elapsed)
+                ]
+            finally:
+                report.record_resource_stats(runtime.utilisation())
+                await _persist_spans(runtime.pg_pool, report)
     except Exception as e:  # pylint: disable=broad-except
         print("cronjob.py: Something went wrong.")
         print("Error message:", e)
         _notify_cron_failure(e)
     finally:
-        await close_postgres()
+        shutdown_compute_pool()
 
-    await _finalize_cron_run(report, start_time, [])
+    await _finalize_cron_run(report, start_time, market_timings)
 
 
 def main():
     args = _parse_args()
+    if args.retry_skipped:
+        settings.CRON_RETRY_SKIPPED_TICKERS = True
 
     try:
         if args.dates:
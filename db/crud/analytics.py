@@ -2,6 +2,7 @@
 Methods to handle CRUD operation with 'analytics' collection in the db
 """
 import asyncio
+from dataclasses import dataclass
 from typing import Awaitable, Callable, Optional, List
 
 from core.markets import DEFAULT_MARKET, market_mongo_filter, normalize_market
@@ -13,6 +14,7 @@ from utils.handle_calculations import get_slope_normalized
 from utils.handle_external_apis import get_tickers
 
 MONGO_COLLECTION_NAME = "analytics"
+DUPLICATE_KEY_ERROR = 11000
 
 cache = RedisCache()
 cache.connect()
@@ -136,36 +138,119 @@ async def get_normalazied_cvi_slope(
         ) from e
 
 
-async def insert_analytics_batch(
-    conn: AsyncIOMotorClient, docs: List[dict], batch_size: int = 500
-) -> int:
+@dataclass
+class AnalyticsWriteResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated
+
+    def __add__(self, other: "AnalyticsWriteResult") -> "AnalyticsWriteResult":
+        return AnalyticsWriteResult(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+        )
+
+
+def _analytics_upserts(docs: List[dict]) -> list:
+    """One ReplaceOne per (market, ticker, date); the last doc for a key wins."""
+    from pymongo import ReplaceOne
+
+    by_key = {}
+    for doc in docs:
+        market = normalize_market(doc.get("market") or DEFAULT_MARKET)
+        replacement = {key: value for key, value in doc.items() if key != "_id"}
+        replacement["market"] = market
+        by_key[(market, doc["ticker"], doc["date"])] = replacement
+    return [
+        ReplaceOne(
+            {"ticker": ticker, "date": date, **market_mongo_filter(market)},
+            replacement,
+            upsert=True,
+        )
+        for (market, ticker, date), replacement in by_key.items()
+    ]
+
+
+def _write_result(details: dict) -> AnalyticsWriteResult:
+    return AnalyticsWriteResult(
+        inserted=details.get("nUpserted", 0),
+        updated=details.get("nModified", 0),
+        unchanged=details.get("nMatched", 0) - details.get("nModified", 0),
+    )
+
+
+async def upsert_analytics_batch(
+    conn: AsyncIOMotorClient,
+    docs: List[dict],
+    batch_size: int = 500,
+    concurrency: Optional[int] = None,
+) -> AnalyticsWriteResult:
+    """
+    Idempotent analytics write keyed by (market, ticker, date) (unique index
+    in db/mongo_indexes): unordered bulk ReplaceOne upserts, up to
+    ``concurrency`` (default CRON_INSERT_CONCURRENCY) batches in flight on
+    the Motor pool. Re-writing a stored doc as is counts
+    as unchanged, so re-dispatching a date is cheap and never duplicates.
+    Ops that lose a duplicate-key race are retried once; any other write
+    error is raised, since every failed op is a lost row.
+    """
     from pymongo.errors import BulkWriteError
+    from core.settings import CRON_INSERT_CONCURRENCY
+
+    operations = _analytics_upserts(docs)
+    collection = conn[MONGO_DB_NAME][MONGO_COLLECTION_NAME]
+    slots = asyncio.Semaphore(max(concurrency or CRON_INSERT_CONCURRENCY, 1))
 
-    inserted = 0
-    for start in range(0, len(docs), batch_size):
-        batch = docs[start : start + batch_size]
+    async def bulk_write(batch: list, retry: bool) -> AnalyticsWriteResult:
         try:
-            response = await conn[MONGO_DB_NAME][MONGO_COLLECTION_NAME].insert_many(
-                batch, ordered=False
+            response = await collection.bulk_write(batch, ordered=False)
+            return _write_result(
+                {
+                    "nUpserted": response.upserted_count,
+                    "nModified": response.modified_count,
+                    "nMatched": response.matched_count,
+                }
             )
-            inserted += len(response.inserted_ids)
         except BulkWriteError as e:
-            batch_inserted = e.details.get("nInserted", 0)
-            inserted += batch_inserted
-            write_errors = e.details.get("writeErrors", [])
-            duplicate_count = sum(
-                1 for err in write_errors if err.get("code") == 11000
-            )
+            details = e.details
+            errors = details.get("writeErrors", [])
+            # two upserts of a new key can race to insert it; the loser
+            # finds the doc on a second try and replaces it
+            if retry and errors and all(
+                error.get("code") == DUPLICATE_KEY_ERROR for error in errors
+            ):
+                return _write_result(details) + await bulk_write(
+                    [batch[error["index"]] for error in errors], retry=False
+                )
             print(
-                "db/crud/analytics.py insert_analytics_batch:"
-                f" BulkWriteError during batch insert;"
-                f" nInserted={batch_inserted}, duplicate_errors={duplicate_count},"
-                f" total_write_errors={len(write_errors)}"
+                "db/crud/analytics.py upsert_analytics_batch:"
+                f" BulkWriteError during batch upsert;"
+                f" nUpserted={details.get('nUpserted', 0)},"
+                f" nModified={details.get('nModified', 0)},"
+                f" write_errors={len(errors)}"
             )
-        except Exception as e:
-            print("Error message:", e)
             raise
-    return inserted
+
+    async def write(batch: list) -> AnalyticsWriteResult:
+        async with slots:
+            return await bulk_write(batch, retry=True)
+
+    try:
+        results = await asyncio.gather(
+            *[
+                write(operations[start : start + batch_size])
+                for start in range(0, len(operations), max(batch_size, 1))
+            ]
+        )
+    except Exception as e:
+        print("Error message:", e)
+        raise
+    return sum(results, AnalyticsWriteResult())
 
 
 async def compute_base_analytics_and_insert(
@@ -0,0 +1,87 @@
+"""CRUD helpers for the PostgreSQL cron performance history (per-phase spans)."""
+
+import json
+from datetime import date as date_type, datetime
+from typing import Optional
+
+import asyncpg
+
+
+def _to_session_date(value) -> Optional[date_type]:
+    try:
+        return date_type.fromisoformat(str(value))
+    except ValueError:
+        # run-level phases (probe, storage monitor) carry "n/a"
+        return None
+
+
+async def insert_cron_spans(
+    pool: asyncpg.Pool, run_id: str, run_started_at: datetime, spans: list[dict]
+) -> int:
+    """Append spans (market, date, phase, seconds, counts) for one run; return rows."""
+    if not spans:
+        return 0
+    async with pool.acquire() as conn:
+        await conn.executemany(
+            """
+            INSERT INTO cron_spans(
+                run_id, run_started_at, market, session_date, phase, seconds, counts
+            )
+            VALUES($1, $2, $3, $4, $5, $6, $7::jsonb)
+            """,
+            [
+                (
+                    run_id,
+                    run_started_at,
+                    span["market"],
+                    _to_session_date(span["date"]),
+                    span["phase"],
+                    float(span["seconds"]),
+                    json.dumps(span.get("counts") or {}),
+                )
+                for span in spans
+            ],
+        )
+    return len(spans)
+
+
+async def get_phase_history(
+    pool: asyncpg.Pool, phase: str, market: Optional[str] = None, limit: int = 30
+) -> list[dict]:
+    """
+    Latest ``limit`` runs of ``phase``, newest first: run_id, run_started_at,
+    summed seconds and tickers, and tickers per second.
+    """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT
+                run_id,
+                run_started_at,
+                SUM(seconds) AS seconds,
+                SUM(COALESCE((counts->>'tickers')::bigint, 0)) AS tickers
+            FROM cron_spans
+            WHERE phase = $1
+              AND ($2::text IS NULL OR market = $2)
+            GROUP BY run_id, run_started_at
+            ORDER BY run_started_at DESC
+            LIMIT $3
+            """,
+            phase,
+            market,
+            limit,
+        )
+    history = []
+    for row in rows:
+        seconds = float(row["seconds"] or 0.0)
+        tickers = int(row["tickers"] or 0)
+        history.append(
+            {
+                "run_id": row["run_id"],
+                "run_started_at": row["run_started_at"],
+                "seconds": seconds,
+                "tickers": tickers,
+                "tickers_per_second": tickers / seconds if seconds > 0 else None,
+            }
+        )
+    return history
@@ -0,0 +1,176 @@
+"""Sync CRUD for incremental base-analytics state (one row per ticker)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date as date_type
+
+import numpy as np
+
+from db.crud.ohlcv_bars import BarArrays
+from db.ohlcv_sync import get_ohlcv_sync_pool
+
+FETCH_STATES_CHUNK_SIZE = 2000
+SAVE_STATES_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class IndicatorState:
+    """
+    ``window_dates`` are the sessions of the current analytics window; per
+    EMA period, ``terms`` holds one value per window session and ``prefix``
+    the discounted close sum at the last session (see services/indicator_state).
+    ``tail`` holds the last bars (ascending).
+    """
+
+    window_dates: np.ndarray  # datetime64[D]
+    terms: dict  # period -> np.ndarray aligned with window_dates
+    prefix: dict  # period -> float
+    tail: BarArrays
+
+    @property
+    def session_date(self) -> np.datetime64:
+        return self.window_dates[-1]
+
+
+def _to_date(value) -> date_type:
+    if isinstance(value, date_type):
+        return value
+    return date_type.fromisoformat(str(value))
+
+
+def _row_to_state(row: tuple) -> IndicatorState:
+    (
+        window_dates,
+        ema12_terms,
+        ema26_terms,
+        ema12_prefix,
+        ema26_prefix,
+        tail_open,
+        tail_high,
+        tail_low,
+        tail_close,
+        tail_volume,
+    ) = row
+    dates = np.array(window_dates, dtype="datetime64[D]")
+    return IndicatorState(
+        window_dates=dates,
+        terms={
+            12: np.array(ema12_terms, dtype=np.float64),
+            26: np.array(ema26_terms, dtype=np.float64),
+        },
+        prefix={12: float(ema12_prefix), 26: float(ema26_prefix)},
+        tail=BarArrays(
+            session_date=dates[-len(tail_close) :],
+            open=np.array(tail_open, dtype=np.float64),
+            high=np.array(tail_high, dtype=np.float64),
+            low=np.array(tail_low, dtype=np.float64),
+            close=np.array(tail_close, dtype=np.float64),
+            volume=np.array(tail_volume, dtype=np.int64),
+        ),
+    )
+
+
+def fetch_indicator_states(
+    market: str, tickers: list[str], session_date
+) -> dict[str, IndicatorState]:
+    """States of ``tickers`` that end exactly on ``session_date``; {} on error."""
+    unique_tickers = sorted(set(tickers))
+    if not unique_tickers:
+        return {}
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return {}
+        target = _to_date(session_date)
+        states = {}
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                for offset in range(0, len(unique_tickers), FETCH_STATES_CHUNK_SIZE):
+                    chunk = unique_tickers[offset : offset + FETCH_STATES_CHUNK_SIZE]
+                    cur.execute(
+                        """
+                        SELECT ticker, window_dates, ema12_terms, ema26_terms,
+                               ema12_prefix, ema26_prefix, tail_open, tail_high,
+                               tail_low, tail_close, tail_volume
+                        FROM indicator_state
+                        WHERE market = %s
+                          AND ticker = ANY(%s)
+                          AND session_date = %s
+                        """,
+                        (market, chunk, target),
+                    )
+                    for row in cur.fetchall():
+                        states[row[0]] = _row_to_state(row[1:])
+        return states
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/indicator_state.py fetch_indicator_states: {exc}")
+        return {}
+
+
+def save_indicator_states(market: str, states: dict[str, IndicatorState]) -> int:
+    """
+    Upsert ticker -> state; a stored state on a later session is kept (a
+    backfill or catch-up of an older session runs after it). Return rows
+    written (0 on error).
+    """
+    if not states:
+        return 0
+    rows = [
+        (
+            market,
+            ticker,
+            state.session_date.astype(object),
+            state.window_dates.astype(object).tolist(),
+            state.terms[12].tolist(),
+            state.terms[26].tolist(),
+            state.prefix[12],
+            state.prefix[26],
+            state.tail.open.tolist(),
+            state.tail.high.tolist(),
+            state.tail.low.tolist(),
+            state.tail.close.tolist(),
+            state.tail.volume.tolist(),
+        )
+        for ticker, state in states.items()
+    ]
+    written = 0
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return 0
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                for offset in range(0, len(rows), SAVE_STATES_CHUNK_SIZE):
+                    cur.executemany(
+                        """
+                        INSERT INTO indicator_state (
+                            market, ticker, session_date, window_dates,
+                            ema12_terms, ema26_terms, ema12_prefix, ema26_prefix,
+                            tail_open, tail_high, tail_low, tail_close, tail_volume
+                        )
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (market, ticker)
+                        DO UPDATE SET
+                            session_date = EXCLUDED.session_date,
+                            window_dates = EXCLUDED.window_dates,
+                            ema12_terms = EXCLUDED.ema12_terms,
+                            ema26_terms = EXCLUDED.ema26_terms,
+                            ema12_prefix = EXCLUDED.ema12_prefix,
+                            ema26_prefix = EXCLUDED.ema26_prefix,
+                            tail_open = EXCLUDED.tail_open,
+                            tail_high = EXCLUDED.tail_high,
+                            tail_low = EXCLUDED.tail_low,
+                            tail_close = EXCLUDED.tail_close,
+                            tail_volume = EXCLUDED.tail_volume,
+                            updated_at = NOW()
+                        WHERE indicator_state.session_date <= EXCLUDED.session_date
+                        """,
+                        rows[offset : offset + SAVE_STATES_CHUNK_SIZE],
+                    )
+                    written += max(cur.rowcount, 0)
+            conn.commit()
+        return written
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/indicator_state.py save_indicator_states: {exc}")
+        return 0
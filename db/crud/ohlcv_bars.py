@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from datetime import date as date_type
 from typing import Optional
 
+import numpy as np
+
 from db.ohlcv_sync import get_ohlcv_sync_pool
 
+FETCH_BARS_MANY_CHUNK_SIZE = 2000
+BULK_WRITE_BATCH_SIZE = 50_000
+
 
 @dataclass(frozen=True)
 class BarRow:
@@ -19,6 +25,21 @@ class BarRow:
     volume: int
 
 
+@dataclass(frozen=True)
+class BarArrays:
+    """Contiguous per-ticker bar columns in ascending session order."""
+
+    session_date: np.ndarray  # datetime64[D]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray  # int64
+
+    def __len__(self) -> int:
+        return len(self.session_date)
+
+
 def _to_date(value) -> date_type:
     if isinstance(value, date_type):
         return value
@@ -69,50 +90,295 @@ def fetch_bars(
         return []
 
 
+def _rows_to_bar_arrays(rows: list[tuple]) -> dict[str, BarArrays]:
+    """Split (ticker, session_date, o, h, l, c, v) rows ordered by ticker, date."""
+    if not rows:
+        return {}
+    tickers, dates, opens, highs, lows, closes, volumes = zip(*rows)
+    columns = {
+        "session_date": np.array(dates, dtype="datetime64[D]"),
+        "open": np.array(opens, dtype=np.float64),
+        "high": np.array(highs, dtype=np.float64),
+        "low": np.array(lows, dtype=np.float64),
+        "close": np.array(closes, dtype=np.float64),
+        "volume": np.array(volumes, dtype=np.int64),
+    }
+    ticker_column = np.array(tickers)
+    boundaries = np.flatnonzero(ticker_column[1:] != ticker_column[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(ticker_column)]))
+    return {
+        str(ticker_column[start]): BarArrays(
+            **{name: values[start:stop] for name, values in columns.items()}
+        )
+        for start, stop in zip(starts, stops)
+    }
+
+
+def fetch_bars_many(
+    market: str,
+    tickers: list[str],
+    start_date,
+    end_date,
+) -> dict[str, BarArrays]:
+    """
+    Return bars in [start_date, end_date] for many tickers as per-ticker
+    column slices, one ``ticker = ANY(...)`` query per chunk of tickers.
+    Tickers without bars are absent; empty dict on error.
+    """
+    unique_tickers = sorted(set(tickers))
+    if not unique_tickers:
+        return {}
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return {}
+        start = _to_date(start_date)
+        end = _to_date(end_date)
+        rows: list[tuple] = []
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                for offset in range(0, len(unique_tickers), FETCH_BARS_MANY_CHUNK_SIZE):
+                    chunk = unique_tickers[offset : offset + FETCH_BARS_MANY_CHUNK_SIZE]
+                    cur.execute(
+                        """
+                        SELECT ticker, session_date, open, high, low, close, volume
+                        FROM ohlcv_bars
+                        WHERE market = %s
+                          AND ticker = ANY(%s)
+                          AND session_date >= %s
+                          AND session_date <= %s
+                        ORDER BY ticker, session_date ASC
+                        """,
+                        (market, chunk, start, end),
+                    )
+                    rows.extend(cur.fetchall())
+        return _rows_to_bar_arrays(rows)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ohlcv_bars.py fetch_bars_many: {exc}")
+        return {}
+
+
+_STAGING_DDL = """
+CREATE TEMP TABLE ohlcv_bars_staging (
+    market TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    session_date DATE NOT NULL,
+    open DOUBLE PRECISION NOT NULL,
+    high DOUBLE PRECISION NOT NULL,
+    low DOUBLE PRECISION NOT NULL,
+    close DOUBLE PRECISION NOT NULL,
+    volume BIGINT NOT NULL
+) ON COMMIT DROP
+"""
+
+_STAGING_COPY = """
+COPY ohlcv_bars_staging (
+    market, ticker, session_date, open, high, low, close, volume
+) FROM STDIN (FORMAT BINARY)
+"""
+
+_STAGING_TYPES = [
+    "text",
+    "text",
+    "date",
+    "float8",
+    "float8",
+    "float8",
+    "float8",
+    "int8",
+]
+
+_STAGING_MERGE = """
+INSERT INTO ohlcv_bars (
+    market, ticker, session_date,
+    open, high, low, close, volume
+)
+SELECT market, ticker, session_date, open, high, low, close, volume
+FROM ohlcv_bars_staging
+ON CONFLICT (market, ticker, session_date)
+DO UPDATE SET
+    open = EXCLUDED.open,
+    high = EXCLUDED.high,
+    low = EXCLUDED.low,
+    close = EXCLUDED.close,
+    volume = EXCLUDED.volume,
+    fetched_at = NOW()
+"""
+
+
+def _last_per_session(rows: list[BarRow]) -> list[BarRow]:
+    """One bar per session_date, the last one given winning."""
+    return list({row.session_date: row for row in rows}.values())
+
+
+def _copy_upsert(market: str, bars_by_ticker: dict[str, list[BarRow]]) -> int:
+    """
+    Binary COPY into a transaction-scoped staging table, then one merge.
+    A session staged twice for a ticker keeps its last bar (as row-by-row
+    upserts would), so the merge sees each key once; return rows merged.
+    """
+    pool = get_ohlcv_sync_pool()
+    if pool is None:
+        return 0
+    written = 0
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(_STAGING_DDL)
+            with cur.copy(_STAGING_COPY) as copy:
+                copy.set_types(_STAGING_TYPES)
+                for ticker, rows in bars_by_ticker.items():
+                    for row in _last_per_session(rows):
+                        copy.write_row(
+                            (
+                                market,
+                                ticker,
+                                row.session_date,
+                                row.open,
+                                row.high,
+                                row.low,
+                                row.close,
+                                row.volume,
+                            )
+                        )
+                        written += 1
+            cur.execute(_STAGING_MERGE)
+        conn.commit()
+    return written
+
+
 def upsert_bars(market: str, ticker: str, rows: list[BarRow]) -> None:
     """Batch upsert bars; no-op on error."""
     if not rows:
         return
+    try:
+        _copy_upsert(market, {ticker: rows})
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ohlcv_bars.py upsert_bars: {exc}")
+
+
+def upsert_market_bars(market: str, bars_by_ticker: dict[str, list[BarRow]]) -> int:
+    """Batch upsert bars for many tickers; return rows written (0 on error)."""
+    if not any(bars_by_ticker.values()):
+        return 0
+    try:
+        return _copy_upsert(market, bars_by_ticker)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ohlcv_bars.py upsert_market_bars: {exc}")
+        return 0
+
+
+class BulkBarWriter:
+    """
+    Thread-safe accumulator of bars across tickers for one market; flushes
+    through upsert_market_bars once ``batch_size`` rows are pending (unless
+    ``auto_flush`` is off) and on context exit. A session added twice for a
+    ticker keeps the last bar; ``written`` counts rows merged.
+    """
+
+    def __init__(
+        self,
+        market: str,
+        batch_size: int = BULK_WRITE_BATCH_SIZE,
+        auto_flush: bool = True,
+    ):
+        self.market = market
+        self.batch_size = batch_size
+        self.auto_flush = auto_flush
+        self.written = 0
+        # ticker -> session_date -> bar: a session added again replaces its bar
+        self._pending: dict[str, dict] = {}
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending_rows(self) -> int:
+        return self._pending_rows
+
+    def add(self, ticker: str, rows: list[BarRow]) -> None:
+        if not rows:
+            return
+        with self._lock:
+            sessions = self._pending.setdefault(ticker, {})
+            before = len(sessions)
+            sessions.update((row.session_date, row) for row in rows)
+            self._pending_rows += len(sessions) - before
+            should_flush = self.auto_flush and self._pending_rows >= self.batch_size
+        if should_flush:
+            self.flush()
+
+    def add_many(self, bars_by_ticker: dict[str, list[BarRow]]) -> None:
+        for ticker, rows in bars_by_ticker.items():
+            self.add(ticker, rows)
+
+    def flush(self) -> int:
+        """Write pending rows; return rows written by this flush (0 on error)."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._pending_rows = 0
+        if not batch:
+            return 0
+        written = upsert_market_bars(
+            self.market, {ticker: list(rows.values()) for ticker, rows in batch.items()}
+        )
+        with self._lock:
+            self.written += written
+        return written
+
+    def __enter__(self) -> "BulkBarWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.flush()
+
+
+def fetch_grouped_session_dates(market: str, start_date, end_date) -> set[date_type]:
+    """Return sessions already filled by a whole-market grouped fetch."""
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return set()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT session_date
+                    FROM ohlcv_grouped_sessions
+                    WHERE market = %s
+                      AND session_date >= %s
+                      AND session_date <= %s
+                    """,
+                    (market, _to_date(start_date), _to_date(end_date)),
+                )
+                rows = cur.fetchall()
+        return {row[0] for row in rows}
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ohlcv_bars.py fetch_grouped_session_dates: {exc}")
+        return set()
+
+
+def mark_grouped_session(market: str, session_date, ticker_count: int) -> None:
+    """Record a grouped fetch (ticker_count=0 marks a market holiday); no-op on error."""
     try:
         pool = get_ohlcv_sync_pool()
         if pool is None:
             return
-        values = [
-            (
-                market,
-                ticker,
-                row.session_date,
-                row.open,
-                row.high,
-                row.low,
-                row.close,
-                row.volume,
-            )
-            for row in rows
-        ]
         with pool.connection() as conn:
             with conn.cursor() as cur:
-                cur.executemany(
+                cur.execute(
                     """
-                    INSERT INTO ohlcv_bars (
-                        market, ticker, session_date,
-                        open, high, low, close, volume
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (market, ticker, session_date)
+                    INSERT INTO ohlcv_grouped_sessions (market, session_date, ticker_count)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (market, session_date)
                     DO UPDATE SET
-                        open = EXCLUDED.open,
-                        high = EXCLUDED.high,
-                        low = EXCLUDED.low,
-                        close = EXCLUDED.close,
-                        volume = EXCLUDED.volume,
+                        ticker_count = EXCLUDED.ticker_count,
                         fetched_at = NOW()
                     """,
-                    values,
+                    (market, _to_date(session_date), ticker_count),
                 )
             conn.commit()
     except Exception as exc:  # pylint: disable=broad-except
-        print(f"db/crud/ohlcv_bars.py upsert_bars: {exc}")
+        print(f"db/crud/ohlcv_bars.py mark_grouped_session: {exc}")
 
 
 def delete_bars_for_session_date(session_date) -> int:
@@ -129,6 +395,10 @@ def delete_bars_for_session_date(session_date) -> int:
                     (target,),
                 )
                 deleted = cur.rowcount
+                cur.execute(
+                    "DELETE FROM ohlcv_grouped_sessions WHERE session_date = %s",
+                    (target,),
+                )
             conn.commit()
         return deleted
     except Exception as exc:  # pylint: disable=broad-except
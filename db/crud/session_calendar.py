@@ -0,0 +1,125 @@
+"""Sync CRUD for the per-market trading-session calendar."""
+
+from __future__ import annotations
+
+from datetime import date as date_type
+from typing import Optional
+
+from db.ohlcv_sync import get_ohlcv_sync_pool
+
+
+def _to_date(value) -> date_type:
+    if isinstance(value, date_type):
+        return value
+    return date_type.fromisoformat(str(value))
+
+
+def fetch_session_calendar(
+    market: str,
+) -> Optional[tuple[list[date_type], date_type, date_type]]:
+    """
+    Return (ascending sessions, complete_from, checked_through) for the
+    market's complete range; None when unknown or on error.
+    """
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return None
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT complete_from, checked_through
+                    FROM session_calendar_state
+                    WHERE market = %s
+                    """,
+                    (market,),
+                )
+                state = cur.fetchone()
+                if state is None:
+                    return None
+                cur.execute(
+                    """
+                    SELECT session_date
+                    FROM market_sessions
+                    WHERE market = %s
+                      AND session_date >= %s
+                      AND session_date <= %s
+                    ORDER BY session_date ASC
+                    """,
+                    (market, state[0], state[1]),
+                )
+                rows = cur.fetchall()
+        return [row[0] for row in rows], state[0], state[1]
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/session_calendar.py fetch_session_calendar: {exc}")
+        return None
+
+
+def record_session_calendar(
+    market: str,
+    sessions: list,
+    complete_from,
+    checked_through,
+) -> int:
+    """
+    Insert sessions and move the complete range to [complete_from,
+    checked_through]; return sessions written (0 on error).
+    """
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return 0
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                if sessions:
+                    cur.executemany(
+                        """
+                        INSERT INTO market_sessions (market, session_date)
+                        VALUES (%s, %s)
+                        ON CONFLICT (market, session_date) DO NOTHING
+                        """,
+                        [(market, _to_date(session)) for session in sessions],
+                    )
+                cur.execute(
+                    """
+                    INSERT INTO session_calendar_state (market, complete_from, checked_through)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (market)
+                    DO UPDATE SET
+                        complete_from = EXCLUDED.complete_from,
+                        checked_through = EXCLUDED.checked_through,
+                        refreshed_at = NOW()
+                    """,
+                    (market, _to_date(complete_from), _to_date(checked_through)),
+                )
+            conn.commit()
+        return len(sessions)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/session_calendar.py record_session_calendar: {exc}")
+        return 0
+
+
+def fetch_probe_bar_dates(market: str, ticker: str) -> list[date_type]:
+    """Ascending session dates cached in ohlcv_bars for one ticker; [] on error."""
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return []
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT session_date
+                    FROM ohlcv_bars
+                    WHERE market = %s
+                      AND ticker = %s
+                    ORDER BY session_date ASC
+                    """,
+                    (market, ticker),
+                )
+                rows = cur.fetchall()
+        return [row[0] for row in rows]
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/session_calendar.py fetch_probe_bar_dates: {exc}")
+        return []
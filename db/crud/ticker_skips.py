@@ -0,0 +1,106 @@
+"""Sync CRUD for the ingest negative-result cache (tickers without usable data)."""
+
+from __future__ import annotations
+
+from datetime import date as date_type
+
+from db.ohlcv_sync import get_ohlcv_sync_pool
+
+SKIP_NOT_ENOUGH_BARS = "not_enough_bars"
+SKIP_DATE_MISMATCH = "date_mismatch"
+
+
+def _to_date(value) -> date_type:
+    if isinstance(value, date_type):
+        return value
+    return date_type.fromisoformat(str(value))
+
+
+def fetch_skipped_tickers(
+    market: str, session_date, mismatch_retry_minutes: int = 0
+) -> dict[str, str]:
+    """
+    Tickers known to yield no analytics for the session -> reason; {} on error.
+    Date mismatches older than ``mismatch_retry_minutes`` (when > 0) are left
+    out, since the provider may publish the session bar late.
+    """
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return {}
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT ticker, reason
+                    FROM ticker_skips
+                    WHERE market = %s
+                      AND session_date = %s
+                      AND (
+                        reason <> %s
+                        OR %s <= 0
+                        OR recorded_at > NOW() - make_interval(mins => %s)
+                      )
+                    """,
+                    (
+                        market,
+                        _to_date(session_date),
+                        SKIP_DATE_MISMATCH,
+                        mismatch_retry_minutes,
+                        mismatch_retry_minutes,
+                    ),
+                )
+                rows = cur.fetchall()
+        return {row[0]: row[1] for row in rows}
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ticker_skips.py fetch_skipped_tickers: {exc}")
+        return {}
+
+
+def record_skipped_tickers(market: str, session_date, reasons: dict[str, str]) -> int:
+    """Upsert ticker -> reason for the session; return rows written (0 on error)."""
+    if not reasons:
+        return 0
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return 0
+        target = _to_date(session_date)
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO ticker_skips (market, ticker, session_date, reason)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (market, session_date, ticker)
+                    DO UPDATE SET
+                        reason = EXCLUDED.reason,
+                        recorded_at = NOW()
+                    """,
+                    [(market, ticker, target, reason) for ticker, reason in reasons.items()],
+                )
+            conn.commit()
+        return len(reasons)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ticker_skips.py record_skipped_tickers: {exc}")
+        return 0
+
+
+def clear_skipped_tickers(market: str, session_date) -> int:
+    """Forget the session's negative results; return rows deleted (0 on error)."""
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return 0
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM ticker_skips WHERE market = %s AND session_date = %s",
+                    (market, _to_date(session_date)),
+                )
+                deleted = cur.rowcount
+            conn.commit()
+        return deleted
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ticker_skips.py clear_skipped_tickers: {exc}")
+        return 0
@@ -0,0 +1,152 @@
+"""Sync CRUD for the per-session ticker universe (Postgres source of truth)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date as date_type
+from typing import Optional
+
+from db.ohlcv_sync import get_ohlcv_sync_pool
+
+
+@dataclass(frozen=True)
+class UniverseEntry:
+    ticker: str
+    asset_type: Optional[str] = None
+    active: bool = True
+
+
+@dataclass
+class UniverseDiff:
+    market: str
+    session_date: date_type
+    ticker_count: int
+    previous_session_date: Optional[date_type] = None
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+def _to_date(value) -> date_type:
+    if isinstance(value, date_type):
+        return value
+    return date_type.fromisoformat(str(value))
+
+
+def fetch_universe(market: str, session_date) -> Optional[list[UniverseEntry]]:
+    """Stored universe for the session; None when it was never refreshed (or on error)."""
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return None
+        target = _to_date(session_date)
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT 1 FROM ticker_universe_refreshes
+                    WHERE market = %s AND session_date = %s
+                    """,
+                    (market, target),
+                )
+                if cur.fetchone() is None:
+                    return None
+                cur.execute(
+                    """
+                    SELECT ticker, asset_type, active
+                    FROM ticker_universe
+                    WHERE market = %s AND session_date = %s
+                    ORDER BY ticker
+                    """,
+                    (market, target),
+                )
+                rows = cur.fetchall()
+        return [
+            UniverseEntry(ticker=row[0], asset_type=row[1], active=bool(row[2]))
+            for row in rows
+        ]
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ticker_universe.py fetch_universe: {exc}")
+        return None
+
+
+def store_universe(
+    market: str, session_date, entries: list[UniverseEntry]
+) -> Optional[UniverseDiff]:
+    """
+    Replace the session's universe and record the diff against the closest
+    earlier stored session, in one transaction. None on error.
+    """
+    try:
+        pool = get_ohlcv_sync_pool()
+        if pool is None:
+            return None
+        target = _to_date(session_date)
+        unique = {entry.ticker: entry for entry in entries}
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT MAX(session_date) FROM ticker_universe_refreshes
+                    WHERE market = %s AND session_date < %s
+                    """,
+                    (market, target),
+                )
+                previous_date = cur.fetchone()[0]
+                previous: set[str] = set()
+                if previous_date is not None:
+                    cur.execute(
+                        """
+                        SELECT ticker FROM ticker_universe
+                        WHERE market = %s AND session_date = %s
+                        """,
+                        (market, previous_date),
+                    )
+                    previous = {row[0] for row in cur.fetchall()}
+
+                diff = UniverseDiff(
+                    market=market,
+                    session_date=target,
+                    ticker_count=len(unique),
+                    previous_session_date=previous_date,
+                    added=sorted(set(unique) - previous) if previous_date else [],
+                    removed=sorted(previous - set(unique)),
+                )
+                cur.execute(
+                    "DELETE FROM ticker_universe WHERE market = %s AND session_date = %s",
+                    (market, target),
+                )
+                with cur.copy(
+                    "COPY ticker_universe (market, session_date, ticker, asset_type, active)"
+                    " FROM STDIN"
+                ) as copy:
+                    for entry in unique.values():
+                        copy.write_row(
+                            (market, target, entry.ticker, entry.asset_type, entry.active)
+                        )
+                cur.execute(
+                    """
+                    INSERT INTO ticker_universe_refreshes
+                        (market, session_date, ticker_count, previous_session_date, added, removed)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (market, session_date)
+                    DO UPDATE SET
+                        ticker_count = EXCLUDED.ticker_count,
+                        previous_session_date = EXCLUDED.previous_session_date,
+                        added = EXCLUDED.added,
+                        removed = EXCLUDED.removed,
+                        fetched_at = NOW()
+                    """,
+                    (
+                        market,
+                        target,
+                        diff.ticker_count,
+                        previous_date,
+                        diff.added,
+                        diff.removed,
+                    ),
+                )
+            conn.commit()
+        return diff
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/ticker_universe.py store_universe: {exc}")
+        return None
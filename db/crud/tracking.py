@@ -4,9 +4,24 @@ with regard to stock tracking procedure
 """
 import asyncio
 from typing import Optional
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from pymongo import UpdateOne
 
 from core.markets import DEFAULT_MARKET, market_mongo_filter, normalize_market
 from core.settings import MONGO_DB_NAME
+from db.crud.tracking_appearances import (
+    APPEARANCE_SESSIONS,
+    advance_appearances,
+    decode_frequencies,
+    fetch_appearance_session,
+    fetch_appearance_sessions,
+    fetch_appearances,
+    forget_appearances,
+    prune_appearances,
+    replace_appearances,
+)
 from db.mongodb import AsyncIOMotorClient
 from utils.handle_datetimes import get_epoch, get_past_date
 from utils.handle_external_apis import cache_quaterly_free_cash_flow
@@ -21,6 +36,8 @@ CRITERIA = [
     "three_day_avg_volume",
     "macd",
 ]
+# event loop -> market -> lock over its appearance session lists
+_APPEARANCE_LOCKS: WeakKeyDictionary = WeakKeyDictionary()
 
 
 def _format_db_error(context: str, exc: Exception) -> str:
@@ -30,6 +47,97 @@ def _format_db_error(context: str, exc: Exception) -> str:
     return message
 
 
+def _appearance_lock(market: str) -> asyncio.Lock:
+    """Lock over the market's session lists, bound to the running event loop."""
+    locks = _APPEARANCE_LOCKS.setdefault(asyncio.get_running_loop(), {})
+    return locks.setdefault(market, asyncio.Lock())
+
+
+async def update_tracking_appearances(
+    conn: AsyncIOMotorClient, market: str, epoch_date, lists: dict
+) -> None:
+    """
+    Keep the appearance bitsets in step with tracking lists just written
+    ((criterion, price_band) -> tickers): a session newer than every stored
+    one shifts them; a first run, re-run or backfill rebuilds those lists
+    from tracking. On error the market's bitsets are dropped, so reads scan
+    tracking until the next rebuild. Sessions of one market tracked at once
+    (CRON_SESSIONS_PER_MARKET > 1) take turns, as each reads and rewrites
+    the market's session lists.
+    """
+    from core.settings import TRACKING_APPEARANCES_DISABLED
+
+    if TRACKING_APPEARANCES_DISABLED or not lists:
+        return
+    async with _appearance_lock(market):
+        try:
+            sessions = await fetch_appearance_sessions(conn, market)
+            fresh = {
+                key: tickers
+                for key, tickers in lists.items()
+                if key in sessions
+                and sessions[key].dates
+                and epoch_date > sessions[key].dates[-1]
+            }
+            if fresh:
+                await advance_appearances(conn, market, epoch_date, fresh, sessions)
+            for criterion, price_band in sorted(lists.keys() - fresh.keys(), key=str):
+                cursor = (
+                    conn[MONGO_DB_NAME][MONGO_TRACKING_COLLECTION]
+                    .find(
+                        {
+                            "criterion": criterion,
+                            **market_mongo_filter(market),
+                            "price_band": price_band,
+                        },
+                        {"_id": False, "date": True, "tickers": True},
+                    )
+                    .sort("date", -1)
+                    .limit(APPEARANCE_SESSIONS)
+                )
+                docs = await cursor.to_list(length=APPEARANCE_SESSIONS)
+                await replace_appearances(
+                    conn,
+                    market,
+                    criterion,
+                    price_band,
+                    [(doc["date"], doc["tickers"]) for doc in reversed(docs)],
+                )
+            await prune_appearances(conn, market, sessions)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"db/crud/tracking.py update_tracking_appearances: {exc}")
+            try:
+                await forget_appearances(conn, market)
+            except Exception as forget_exc:  # pylint: disable=broad-except
+                print(f"db/crud/tracking.py update_tracking_appearances: {forget_exc}")
+
+
+async def _frequencies_from_appearances(
+    conn: AsyncIOMotorClient,
+    market: str,
+    criterion: str,
+    price_band: Optional[str],
+    tickers: list[str],
+    epoch_past_date,
+    epoch_date,
+    period: int,
+) -> Optional[dict[str, str]]:
+    """Frequencies decoded from the bitsets; None to fall back to the tracking scan."""
+    try:
+        sessions = await fetch_appearance_session(conn, market, criterion, price_band)
+        if sessions is None:
+            return None
+        appearances = await fetch_appearances(
+            conn, market, tickers, criterion=criterion, price_band=price_band
+        )
+        return decode_frequencies(
+            sessions, appearances, tickers, epoch_past_date, epoch_date, period
+        )
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"db/crud/tracking.py _frequencies_from_appearances: {exc}")
+        return None
+
+
 async def put_top_tickers_by_criterion(
     conn: AsyncIOMotorClient,
     date: str,
@@ -81,6 +189,9 @@ async def put_top_tickers_by_criterion(
                 },
                 upsert=True,
             )
+            await update_tracking_appearances(
+                conn, market, epoch_date, {(criterion, price_band): tickers}
+            )
 
         return tickers
     except Exception as e:  # pylint: disable=W0703
@@ -92,53 +203,139 @@ async def put_top_tickers_by_criterion(
         ) from e
 
 
-async def put_top_tickers(conn: AsyncIOMotorClient, date: str, market: str = DEFAULT_MARKET):
-    try:
-        bands: list[Optional[str]] = [None, *PRICE_BANDS.keys()]
-        await asyncio.gather(
-            *[
-                put_top_tickers_by_criterion(
-                    conn, date, criterion, market=market, price_band=band
+def rank_top_tickers(rows: list[dict], lim: int = 20) -> dict:
+    """
+    Top ``lim`` tickers per (criterion, price band) from one day of rows,
+    best first, as ``put_top_tickers_by_criterion`` would list them: rows
+    without a value rank last, banded lists need a close inside the band.
+    Band None is the unbanded list.
+    """
+    if not rows:
+        return {}
+    tickers = np.array([row["ticker"] for row in rows], dtype=object)
+    close = np.array(
+        [np.nan if row.get("close") is None else row["close"] for row in rows],
+        dtype=np.float64,
+    )
+    masks: dict[Optional[str], np.ndarray] = {None: np.ones(len(rows), dtype=bool)}
+    for band in PRICE_BANDS:
+        min_close, max_close = resolve_price_band(band)
+        mask = ~np.isnan(close)
+        if min_close is not None:
+            mask &= close >= min_close
+        if max_close is not None:
+            mask &= close <= max_close
+        masks[band] = mask
+
+    top = {}
+    for criterion in CRITERIA:
+        values = np.array(
+            [np.nan if row.get(criterion) is None else row[criterion] for row in rows],
+            dtype=np.float64,
+        )
+        # descending with missing values last; ties keep read order
+        keys = np.where(np.isnan(values), np.inf, -values)
+        for band, mask in masks.items():
+            candidates = np.flatnonzero(mask)
+            if len(candidates) > lim:
+                candidates = np.sort(
+                    candidates[np.argpartition(keys[candidates], lim - 1)[:lim]]
                 )
-                for criterion in CRITERIA
-                for band in bands
-            ]
+            ranked = candidates[np.argsort(keys[candidates], kind="stable")]
+            top[(criterion, band)] = tickers[ranked].tolist()
+    return top
+
+
+async def put_top_tickers(
+    conn: AsyncIOMotorClient,
+    date: str,
+    market: str = DEFAULT_MARKET,
+    lim: Optional[int] = 20,
+):
+    """
+    Set up every tracking list (criterion x unbanded + price bands) for the
+    day from one read of the day's analytics and one unordered bulk upsert,
+    then move the listed tickers' appearance bitsets to the day.
+    """
+    try:
+        market = normalize_market(market)
+        epoch_date = get_epoch(date)
+        cursor = conn[MONGO_DB_NAME][MONGO_ANALYTICS_COLLECTION].find(
+            {"date": epoch_date, **market_mongo_filter(market)},
+            {
+                "_id": False,
+                "ticker": True,
+                "close": True,
+                **{criterion: True for criterion in CRITERIA},
+            },
         )
+        rows = await cursor.to_list(length=None)
+
+        operations = []
+        lists = {
+            key: tickers for key, tickers in rank_top_tickers(rows, lim).items() if tickers
+        }
+        for (criterion, price_band), tickers in lists.items():
+            key = {
+                "date": epoch_date,
+                "criterion": criterion,
+                "market": market,
+                "price_band": price_band,
+            }
+            operations.append(
+                UpdateOne(key, {"$set": {"tickers": tickers, **key}}, upsert=True)
+            )
+        if operations:
+            await conn[MONGO_DB_NAME][MONGO_TRACKING_COLLECTION].bulk_write(
+                operations, ordered=False
+            )
+        await update_tracking_appearances(conn, market, epoch_date, lists)
         return (
             "db/crud/tracking.py, def put_top_tickers:"
             + f" tickers were retrieved and set up for tracking ({market})"
         )
     except Exception as e:  # pylint: disable=W0703
-        print("Error message:", e)
         raise Exception(
             _format_db_error("db/crud/tracking.py, def put_top_tickers", e)
         ) from e
 
 
-async def get_analytics_frequencies(
+async def get_analytics_frequencies_many(
     conn: AsyncIOMotorClient,
     date: str,
     criterion: str,
-    ticker: str,
-    period: Optional[int] = 25,
+    tickers: list[str],
     market: str = DEFAULT_MARKET,
     price_band: Optional[str] = None,
-):
+    period: Optional[int] = 25,
+) -> dict[str, str]:
+    """
+    ``T-N`` frequency string per ticker (sessions before ``date`` on which it
+    was in the tracking list), decoded from the appearance bitsets or, when
+    they do not cover the window, from one read of the ``period`` tracking docs.
+    """
+    from core.settings import TRACKING_APPEARANCES_DISABLED
+
     try:
         market = normalize_market(market)
         past_date = get_past_date(period, date)
         epoch_past_date = get_epoch(past_date)
         epoch_date = get_epoch(date)
-        band_filter = (
-            {"price_band": price_band}
-            if price_band is not None
-            else {
-                "$or": [
-                    {"price_band": None},
-                    {"price_band": {"$exists": False}},
-                ]
-            }
-        )
+        if not TRACKING_APPEARANCES_DISABLED:
+            frequencies = await _frequencies_from_appearances(
+                conn,
+                market,
+                criterion,
+                price_band,
+                tickers,
+                epoch_past_date,
+                epoch_date,
+                period,
+            )
+            if frequencies is not None:
+                return frequencies
+        # None also matches legacy rows without price_band
+        band_filter = {"price_band": price_band}
         pipeline = [
             {
                 "$match": {
@@ -156,21 +353,44 @@ async def get_analytics_frequencies(
                 }
             },
             {"$sort": {"date": -1}},
+            {"$project": {"_id": False, "tickers": True}},
         ]
         cursor = conn[MONGO_DB_NAME][MONGO_TRACKING_COLLECTION].aggregate(pipeline)
         result = await cursor.to_list(length=period)
 
-        frequencies_str = ""
+        wanted = set(tickers)
+        appearances: dict[str, list[str]] = {ticker: [] for ticker in wanted}
         for idx, item in enumerate(result):
-            if ticker in item["tickers"]:
-                frequencies_str += f"T-{idx+1}, "
+            for ticker in wanted.intersection(item["tickers"]):
+                appearances[ticker].append(f"T-{idx+1}")
 
-        return frequencies_str[:-2]
+        return {ticker: ", ".join(found) for ticker, found in appearances.items()}
     except Exception as e:
         print("Error message:", e)
         raise Exception(
             _format_db_error(
-                "db/crud/tracking.py, def get_analytics_frequencies",
+                "db/crud/tracking.py, def get_analytics_frequencies_many",
                 e,
             )
         ) from e
+
+
+async def get_analytics_frequencies(
+    conn: AsyncIOMotorClient,
+    date: str,
+    criterion: str,
+    ticker: str,
+    period: Optional[int] = 25,
+    market: str = DEFAULT_MARKET,
+    price_band: Optional[str] = None,
+):
+    frequencies = await get_analytics_frequencies_many(
+        conn,
+        date,
+        criterion,
+        [ticker],
+        market=market,
+        price_band=price_band,
+        period=period,
+    )
+    return frequencies[ticker]
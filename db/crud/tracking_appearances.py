@@ -0,0 +1,262 @@
+"""
+Per-ticker appearance bitsets for the tracking lists.
+
+Per (market, criterion, price band), 'tracking_sessions' keeps the dates of
+the last APPEARANCE_SESSIONS tracking lists (ascending) and ``complete_from``,
+the date from which that list holds every tracking list (0 when it holds
+all of them). Per ticker, 'tracking_appearances' keeps ``bits`` anchored at
+``date``: bit k set means the ticker was listed k sessions before ``date``.
+
+A new session shifts a listed ticker's bits by the sessions since its
+anchor, so put_top_tickers touches only the listed tickers, and a frequency
+string is decoded from one doc per ticker instead of a tracking scan.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from core.settings import MONGO_DB_NAME
+from db.mongodb import AsyncIOMotorClient
+
+MONGO_SESSIONS_COLLECTION = "tracking_sessions"
+MONGO_APPEARANCES_COLLECTION = "tracking_appearances"
+# bits of a positive int64
+APPEARANCE_SESSIONS = 63
+APPEARANCE_MASK = (1 << APPEARANCE_SESSIONS) - 1
+
+
+@dataclass(frozen=True)
+class AppearanceSessions:
+    dates: tuple  # ascending tracking dates (epochs)
+    complete_from: float
+
+
+def shift_appearance(bits: int, anchor, date, dates) -> int:
+    """``bits`` anchored at ``anchor`` moved to ``date`` (the later session) with it set."""
+    if anchor not in dates:
+        return 1
+    shift = dates.index(date) - dates.index(anchor)
+    return ((bits << shift) | 1) & APPEARANCE_MASK
+
+
+def appearances_from_lists(lists: list) -> dict:
+    """ticker -> (anchor, bits) from ascending (date, tickers) tracking lists."""
+    dates = [date for date, _ in lists]
+    appearances = {}
+    for date, tickers in lists:
+        for ticker in tickers:
+            previous = appearances.get(ticker)
+            bits = (
+                1 if previous is None else shift_appearance(previous[1], previous[0], date, dates)
+            )
+            appearances[ticker] = (date, bits)
+    return appearances
+
+
+def decode_frequencies(
+    sessions: AppearanceSessions,
+    appearances: dict,
+    tickers: list[str],
+    epoch_past_date,
+    epoch_date,
+    period: int,
+) -> Optional[dict[str, str]]:
+    """
+    ``T-N`` string per ticker over the ``period`` latest lists in
+    (epoch_past_date, epoch_date), as the tracking scan lists them; None
+    when lists in that window may be older than the session list.
+    """
+    window = [
+        date for date in reversed(sessions.dates) if epoch_past_date < date < epoch_date
+    ][:period]
+    if len(window) < period and sessions.complete_from > epoch_past_date:
+        return None
+    positions = {date: idx for idx, date in enumerate(sessions.dates)}
+    frequencies = {}
+    for ticker in tickers:
+        anchor, bits = appearances.get(ticker, (None, 0))
+        found = []
+        if anchor in positions:
+            for idx, date in enumerate(window):
+                offset = positions[anchor] - positions[date]
+                if offset >= 0 and (bits >> offset) & 1:
+                    found.append(f"T-{idx+1}")
+        frequencies[ticker] = ", ".join(found)
+    return frequencies
+
+
+def _key(market: str, criterion: str, price_band: Optional[str]) -> dict:
+    return {"market": market, "criterion": criterion, "price_band": price_band}
+
+
+async def fetch_appearance_sessions(conn: AsyncIOMotorClient, market: str) -> dict:
+    """(criterion, price_band) -> AppearanceSessions for the market."""
+    cursor = conn[MONGO_DB_NAME][MONGO_SESSIONS_COLLECTION].find(
+        {"market": market},
+        {
+            "_id": False,
+            "criterion": True,
+            "price_band": True,
+            "dates": True,
+            "complete_from": True,
+        },
+    )
+    return {
+        (doc["criterion"], doc["price_band"]): AppearanceSessions(
+            tuple(doc["dates"]), doc["complete_from"]
+        )
+        for doc in await cursor.to_list(length=None)
+    }
+
+
+async def fetch_appearance_session(
+    conn: AsyncIOMotorClient, market: str, criterion: str, price_band: Optional[str]
+) -> Optional[AppearanceSessions]:
+    doc = await conn[MONGO_DB_NAME][MONGO_SESSIONS_COLLECTION].find_one(
+        _key(market, criterion, price_band),
+        {"_id": False, "dates": True, "complete_from": True},
+    )
+    if doc is None:
+        return None
+    return AppearanceSessions(tuple(doc["dates"]), doc["complete_from"])
+
+
+async def fetch_appearances(
+    conn: AsyncIOMotorClient,
+    market: str,
+    tickers: list[str],
+    criterion: Optional[str] = None,
+    price_band: Optional[str] = None,
+    any_list: bool = False,
+) -> dict:
+    """
+    ticker -> (anchor, bits) for one list, or (criterion, price_band, ticker)
+    -> (anchor, bits) across every list of the market when ``any_list``.
+    """
+    query = {"market": market} if any_list else _key(market, criterion, price_band)
+    cursor = conn[MONGO_DB_NAME][MONGO_APPEARANCES_COLLECTION].find(
+        {**query, "ticker": {"$in": sorted(set(tickers))}},
+        {
+            "_id": False,
+            "criterion": True,
+            "price_band": True,
+            "ticker": True,
+            "date": True,
+            "bits": True,
+        },
+    )
+    appearances = {}
+    for doc in await cursor.to_list(length=None):
+        key = (doc["criterion"], doc["price_band"], doc["ticker"]) if any_list else doc["ticker"]
+        appearances[key] = (doc["date"], doc["bits"])
+    return appearances
+
+
+async def advance_appearances(
+    conn: AsyncIOMotorClient,
+    market: str,
+    epoch_date,
+    lists: dict,
+    sessions: dict,
+) -> int:
+    """
+    Append ``epoch_date`` (later than every stored session) to each stored
+    (criterion, price_band) session list in ``lists`` and shift its listed
+    tickers; return the appearance docs written.
+    """
+    from pymongo import UpdateOne
+
+    previous = await fetch_appearances(
+        conn,
+        market,
+        [ticker for tickers in lists.values() for ticker in tickers],
+        any_list=True,
+    )
+    session_updates, appearance_updates = [], []
+    for (criterion, price_band), tickers in lists.items():
+        current = sessions[(criterion, price_band)]
+        dates = (*current.dates, epoch_date)[-APPEARANCE_SESSIONS:]
+        complete_from = (
+            current.complete_from
+            if len(current.dates) < APPEARANCE_SESSIONS
+            else max(current.complete_from, dates[0])
+        )
+        key = _key(market, criterion, price_band)
+        session_updates.append(
+            UpdateOne(
+                key,
+                {"$set": {**key, "dates": list(dates), "complete_from": complete_from}},
+                upsert=True,
+            )
+        )
+        for ticker in tickers:
+            anchor, bits = previous.get((criterion, price_band, ticker), (None, 0))
+            appearance_updates.append(
+                UpdateOne(
+                    {**key, "ticker": ticker},
+                    {
+                        "$set": {
+                            "date": epoch_date,
+                            "bits": shift_appearance(bits, anchor, epoch_date, dates),
+                        }
+                    },
+                    upsert=True,
+                )
+            )
+    # sessions first: a failure in between loses today's bits, not the offsets
+    if session_updates:
+        await conn[MONGO_DB_NAME][MONGO_SESSIONS_COLLECTION].bulk_write(
+            session_updates, ordered=False
+        )
+    if appearance_updates:
+        await conn[MONGO_DB_NAME][MONGO_APPEARANCES_COLLECTION].bulk_write(
+            appearance_updates, ordered=False
+        )
+    return len(appearance_updates)
+
+
+async def replace_appearances(
+    conn: AsyncIOMotorClient,
+    market: str,
+    criterion: str,
+    price_band: Optional[str],
+    lists: list,
+) -> int:
+    """
+    Rebuild one list's bitsets from its latest tracking lists (ascending
+    (date, tickers), at most APPEARANCE_SESSIONS); return docs written.
+    """
+    key = _key(market, criterion, price_band)
+    dates = [date for date, _ in lists]
+    complete_from = 0 if len(lists) < APPEARANCE_SESSIONS else dates[0]
+    appearances = appearances_from_lists(lists)
+    await conn[MONGO_DB_NAME][MONGO_APPEARANCES_COLLECTION].delete_many(key)
+    if appearances:
+        await conn[MONGO_DB_NAME][MONGO_APPEARANCES_COLLECTION].insert_many(
+            [
+                {**key, "ticker": ticker, "date": anchor, "bits": bits}
+                for ticker, (anchor, bits) in appearances.items()
+            ]
+        )
+    await conn[MONGO_DB_NAME][MONGO_SESSIONS_COLLECTION].update_one(
+        key,
+        {"$set": {**key, "dates": dates, "complete_from": complete_from}},
+        upsert=True,
+    )
+    return len(appearances)
+
+
+async def forget_appearances(conn: AsyncIOMotorClient, market: str) -> None:
+    """Drop the market's session lists so reads scan tracking until rebuilt."""
+    await conn[MONGO_DB_NAME][MONGO_SESSIONS_COLLECTION].delete_many({"market": market})
+
+
+async def prune_appearances(conn: AsyncIOMotorClient, market: str, sessions: dict) -> int:
+    """Drop bitsets anchored before every list's oldest session."""
+    oldest = [current.dates[0] for current in sessions.values() if current.dates]
+    if not oldest:
+        return 0
+    deleted = await conn[MONGO_DB_NAME][MONGO_APPEARANCES_COLLECTION].delete_many(
+        {"market": market, "date": {"$lt": min(oldest)}}
+    )
+    return deleted.deleted_count
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS ohlcv_grouped_sessions (
+    market TEXT NOT NULL,
+    session_date DATE NOT NULL,
+    ticker_count INTEGER NOT NULL,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (market, session_date)
+);
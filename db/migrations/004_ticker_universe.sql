@@ -0,0 +1,19 @@
+CREATE TABLE IF NOT EXISTS ticker_universe (
+    market TEXT NOT NULL,
+    session_date DATE NOT NULL,
+    ticker TEXT NOT NULL,
+    asset_type TEXT,
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    PRIMARY KEY (market, session_date, ticker)
+);
+
+CREATE TABLE IF NOT EXISTS ticker_universe_refreshes (
+    market TEXT NOT NULL,
+    session_date DATE NOT NULL,
+    ticker_count INTEGER NOT NULL,
+    previous_session_date DATE,
+    added TEXT[] NOT NULL DEFAULT '{}',
+    removed TEXT[] NOT NULL DEFAULT '{}',
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (market, session_date)
+);
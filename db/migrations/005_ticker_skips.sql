@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS ticker_skips (
+    market TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    session_date DATE NOT NULL,
+    reason TEXT NOT NULL,
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (market, session_date, ticker)
+);
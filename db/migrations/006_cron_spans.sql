@@ -0,0 +1,16 @@
+CREATE TABLE IF NOT EXISTS cron_spans (
+    id BIGSERIAL PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    run_started_at TIMESTAMPTZ NOT NULL,
+    market TEXT NOT NULL,
+    session_date DATE,
+    phase TEXT NOT NULL,
+    seconds DOUBLE PRECISION NOT NULL,
+    counts JSONB NOT NULL DEFAULT '{}'::jsonb
+);
+
+CREATE INDEX IF NOT EXISTS cron_spans_phase_started_idx
+    ON cron_spans (phase, run_started_at);
+
+CREATE INDEX IF NOT EXISTS cron_spans_run_idx
+    ON cron_spans (run_id);
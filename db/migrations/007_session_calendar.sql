@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS market_sessions (
+    market TEXT NOT NULL,
+    session_date DATE NOT NULL,
+    PRIMARY KEY (market, session_date)
+);
+
+-- Sessions are complete for [complete_from, checked_through]: every trading
+-- day in that range has a market_sessions row and no other day does.
+CREATE TABLE IF NOT EXISTS session_calendar_state (
+    market TEXT PRIMARY KEY,
+    complete_from DATE NOT NULL,
+    checked_through DATE NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,22 @@
+-- Incremental base-analytics state per ticker (services/indicator_state.py):
+-- per-session EMA terms of the current window and the last bars for bounce.
+CREATE TABLE IF NOT EXISTS indicator_state (
+    market TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    session_date DATE NOT NULL,
+    window_dates DATE[] NOT NULL,
+    ema12_terms DOUBLE PRECISION[] NOT NULL,
+    ema26_terms DOUBLE PRECISION[] NOT NULL,
+    ema12_prefix DOUBLE PRECISION NOT NULL,
+    ema26_prefix DOUBLE PRECISION NOT NULL,
+    tail_open DOUBLE PRECISION[] NOT NULL,
+    tail_high DOUBLE PRECISION[] NOT NULL,
+    tail_low DOUBLE PRECISION[] NOT NULL,
+    tail_close DOUBLE PRECISION[] NOT NULL,
+    tail_volume BIGINT[] NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (market, ticker)
+);
+
+CREATE INDEX IF NOT EXISTS idx_indicator_state_session
+    ON indicator_state (market, session_date);
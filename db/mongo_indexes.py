@@ -0,0 +1,161 @@
+"""
+Declared MongoDB indexes for the hot queries.
+
+Every read and upsert on analytics, tracking (with its appearance bitsets)
+and scrapes is served by one of these without a collection scan or an
+in-memory sort:
+
+- analytics: one (market, date, <criterion> desc, close) index per sortable
+  criterion for the sorted lists and top-N (close range checked from the
+  index), whose (market, date) prefix also serves the latest-date lookup,
+  and the unique (market, ticker, date) key the upsert writer relies on
+- tracking: (criterion, market, price_band, date desc) for the frequencies
+  look-back and the top-N upsert
+- tracking_sessions / tracking_appearances: the list key (plus ticker) for
+  the frequency point reads, (market, ticker) for the daily bitset shift and
+  (market, date) for pruning
+- scrapes: (date, ticker) for mentions
+
+ensure_mongo_indexes is idempotent (create_index on an existing identical
+index is a no-op) and runs at app and cron start and from
+scripts/apply_mongo_indexes.py, which can first drop analytics duplicates
+left by the former insert_many writer (dedupe_analytics_keys).
+"""
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from core.settings import MONGO_DB_NAME
+from db.crud.analytics import MONGO_COLLECTION_NAME as MONGO_ANALYTICS_COLLECTION
+from db.crud.scrapes import MONGO_COLLECTION_NAME as MONGO_SCRAPES_COLLECTION
+from db.crud.tracking import CRITERIA, MONGO_TRACKING_COLLECTION
+from db.crud.tracking_appearances import (
+    MONGO_APPEARANCES_COLLECTION,
+    MONGO_SESSIONS_COLLECTION,
+)
+from db.mongodb import AsyncIOMotorClient
+
+ANALYTICS_KEY_INDEX_NAME = "market_ticker_date_unique"
+
+MONGO_INDEXES: dict[str, list[IndexModel]] = {
+    MONGO_ANALYTICS_COLLECTION: [
+        IndexModel(
+            [("market", ASCENDING), ("ticker", ASCENDING), ("date", ASCENDING)],
+            unique=True,
+            name=ANALYTICS_KEY_INDEX_NAME,
+        ),
+        *[
+            IndexModel(
+                [
+                    ("market", ASCENDING),
+                    ("date", ASCENDING),
+                    (criterion, DESCENDING),
+                    ("close", ASCENDING),
+                ],
+                name=f"market_date_{criterion}_close",
+            )
+            for criterion in CRITERIA
+        ],
+    ],
+    MONGO_TRACKING_COLLECTION: [
+        IndexModel(
+            [
+                ("criterion", ASCENDING),
+                ("market", ASCENDING),
+                ("price_band", ASCENDING),
+                ("date", DESCENDING),
+            ],
+            name="criterion_market_price_band_date",
+        ),
+    ],
+    MONGO_SESSIONS_COLLECTION: [
+        IndexModel(
+            [("market", ASCENDING), ("criterion", ASCENDING), ("price_band", ASCENDING)],
+            unique=True,
+            name="market_criterion_price_band_unique",
+        ),
+    ],
+    MONGO_APPEARANCES_COLLECTION: [
+        IndexModel(
+            [
+                ("market", ASCENDING),
+                ("criterion", ASCENDING),
+                ("price_band", ASCENDING),
+                ("ticker", ASCENDING),
+            ],
+            unique=True,
+            name="market_criterion_price_band_ticker_unique",
+        ),
+        IndexModel([("market", ASCENDING), ("ticker", ASCENDING)], name="market_ticker"),
+        IndexModel([("market", ASCENDING), ("date", ASCENDING)], name="market_date"),
+    ],
+    MONGO_SCRAPES_COLLECTION: [
+        IndexModel([("date", ASCENDING), ("ticker", ASCENDING)], name="date_ticker"),
+    ],
+}
+
+
+DEDUPE_DELETE_CHUNK_SIZE = 1000
+
+
+async def ensure_mongo_indexes(conn: AsyncIOMotorClient) -> list[str]:
+    """
+    Create every declared index that is missing; return the names in place.
+    An index that cannot be built (e.g. the unique analytics key over
+    duplicates left by the former insert_many writer) is reported and skipped.
+    """
+    ensured = []
+    for collection_name, indexes in MONGO_INDEXES.items():
+        collection = conn[MONGO_DB_NAME][collection_name]
+        for index in indexes:
+            try:
+                ensured += await collection.create_indexes([index])
+            except Exception as exc:  # pylint: disable=broad-except
+                print(
+                    "db/mongo_indexes.py ensure_mongo_indexes:"
+                    f" {collection_name}.{index.document['name']}: {exc}"
+                )
+    if ANALYTICS_KEY_INDEX_NAME not in ensured:
+        print(
+            "db/mongo_indexes.py ensure_mongo_indexes: ERROR the unique analytics key"
+            f" {ANALYTICS_KEY_INDEX_NAME} is missing, so re-running a date can"
+            " duplicate rows; run scripts/apply_mongo_indexes.py --dedupe-analytics"
+        )
+    return ensured
+
+
+async def dedupe_analytics_keys(
+    conn: AsyncIOMotorClient, collection_name: str = MONGO_ANALYTICS_COLLECTION
+) -> int:
+    """
+    Delete all but the newest doc (highest ObjectId) per (market, ticker,
+    date) so the unique analytics key can be built; return docs deleted.
+    A missing market groups with null, as it does in the unique index.
+    """
+    collection = conn[MONGO_DB_NAME][collection_name]
+    cursor = collection.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {"market": "$market", "ticker": "$ticker", "date": "$date"},
+                    "newest": {"$max": "$_id"},
+                    "ids": {"$push": "$_id"},
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$match": {"count": {"$gt": 1}}},
+        ],
+        allowDiskUse=True,
+    )
+    stale = [
+        doc_id
+        for group in await cursor.to_list(length=None)
+        for doc_id in group["ids"]
+        if doc_id != group["newest"]
+    ]
+    deleted = 0
+    for start in range(0, len(stale), DEDUPE_DELETE_CHUNK_SIZE):
+        result = await collection.delete_many(
+            {"_id": {"$in": stale[start : start + DEDUPE_DELETE_CHUNK_SIZE]}}
+        )
+        deleted += result.deleted_count
+    return deleted
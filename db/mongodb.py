@@ -1,6 +1,8 @@
 """
 Methods to handle connection to MongoDB
 """
+from typing import Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from core.settings import MONGO_URI, MONGO_MAX_CONNECTIONS, MONGO_MIN_CONNECTIONS
@@ -25,18 +27,26 @@ async def get_database() -> AsyncIOMotorClient:
     return db.client
 
 
-async def connect():
-    """Connect to MongoDB"""
+async def connect(max_pool_size: Optional[int] = None, event_listeners: Optional[list] = None):
+    """
+    Connect to MongoDB (``max_pool_size`` defaults to MONGO_MAX_CONNECTIONS;
+    ``event_listeners`` are pymongo monitoring listeners)
+    """
     print("Connecting to MongoDB...")
+    max_pool_size = max_pool_size or MONGO_MAX_CONNECTIONS
     db.client = AsyncIOMotorClient(
         str(MONGO_URI),
-        maxPoolSize=MONGO_MAX_CONNECTIONS,
-        minPoolSize=MONGO_MIN_CONNECTIONS,
+        maxPoolSize=max_pool_size,
+        minPoolSize=min(MONGO_MIN_CONNECTIONS, max_pool_size),
+        event_listeners=event_listeners or [],
     )
     print("Connected to MongoDB")
 
 
 async def close():
     """Close MongoDB Connection"""
+    if db.client is None:
+        return
     db.client.close()
+    db.client = None
     print("Closed connection with MongoDB")
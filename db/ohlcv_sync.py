@@ -7,17 +7,18 @@ from typing import Optional
 
 from psycopg_pool import ConnectionPool
 
-from core.settings import DATABASE_URL
+from core.settings import DATABASE_URL, OHLCV_SYNC_POOL_MAX_SIZE
 from db.postgres import normalize_database_url
 
 _pool: Optional[ConnectionPool] = None
 _pool_lock = threading.Lock()
 
-OHLCV_SYNC_POOL_MAX_SIZE = 5
 
-
-def get_ohlcv_sync_pool() -> Optional[ConnectionPool]:
-    """Return lazy sync pool; None when DATABASE_URL is unset."""
+def get_ohlcv_sync_pool(max_size: Optional[int] = None) -> Optional[ConnectionPool]:
+    """
+    Return lazy sync pool; None when DATABASE_URL is unset. ``max_size``
+    (default OHLCV_SYNC_POOL_MAX_SIZE) only applies when the pool is created.
+    """
     global _pool
     if not DATABASE_URL:
         return None
@@ -32,7 +33,7 @@ def get_ohlcv_sync_pool() -> Optional[ConnectionPool]:
         _pool = ConnectionPool(
             conninfo=dsn,
             min_size=1,
-            max_size=OHLCV_SYNC_POOL_MAX_SIZE,
+            max_size=max_size or OHLCV_SYNC_POOL_MAX_SIZE,
             open=True,
         )
         return _pool
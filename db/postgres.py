@@ -1,10 +1,11 @@
 """Async PostgreSQL pool management."""
 
+from typing import Optional
 from urllib.parse import urlsplit, urlunsplit
 
 import asyncpg
 
-from core.settings import DATABASE_URL
+from core.settings import DATABASE_URL, PG_POOL_MAX_SIZE
 
 
 class PostgresDatabase:  # pylint: disable=R0903
@@ -26,8 +27,8 @@ def normalize_database_url(database_url: str) -> str:
     return database_url
 
 
-async def connect():
-    """Create global asyncpg pool if not initialized."""
+async def connect(max_size: Optional[int] = None):
+    """Create global asyncpg pool if not initialized (``max_size`` defaults to PG_POOL_MAX_SIZE)."""
     if db.pool is not None:
         return db.pool
 
@@ -35,7 +36,9 @@ async def connect():
         raise RuntimeError("DATABASE_URL is not configured")
 
     dsn = normalize_database_url(DATABASE_URL)
-    db.pool = await asyncpg.create_pool(dsn=dsn, min_size=1, max_size=10)
+    db.pool = await asyncpg.create_pool(
+        dsn=dsn, min_size=1, max_size=max_size or PG_POOL_MAX_SIZE
+    )
     return db.pool
 
 
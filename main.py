@@ -11,9 +11,11 @@ from core.settings import DEFAULT_ROUTE_STR
 from core.build_info import APP_VERSION
 from api import router as endpoint_router
 from api.endpoints.health import health_router
-from db.mongodb import connect as connect_mongo, close as close_mongo
+from db.mongo_indexes import ensure_mongo_indexes
+from db.mongodb import connect as connect_mongo, close as close_mongo, get_database
 from db.postgres import close as close_postgres, connect as connect_postgres
 from db.redis import RedisCache
+from providers.http_transport import close_http_client, shutdown_sync_transport
 
 VERSION = APP_VERSION
 
@@ -74,6 +76,7 @@ app.include_router(endpoint_router, prefix=DEFAULT_ROUTE_STR)
 async def on_app_start():
     """Anything that needs to be done while app starts"""
     await connect_mongo()
+    await ensure_mongo_indexes(await get_database())
     await connect_postgres()
     cache = RedisCache()
     cache.connect()
@@ -84,6 +87,8 @@ async def on_app_shutdown():
     """Anything that needs to be done while app shutdown"""
     await close_mongo()
     await close_postgres()
+    await close_http_client()
+    shutdown_sync_transport()
 
 
 @app.get("/", tags=["Home"], response_class=HTMLResponse)
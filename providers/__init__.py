@@ -1,8 +1,12 @@
 """Market data provider registry."""
 
+from pathlib import Path
+
+from core.settings import MARKET_DATA_REPLAY_DIR
 from providers.base import MarketDataProvider
 from providers.eodhd_to import EodhdTOProvider
 from providers.polygon_us import PolygonUSProvider
+from providers.replay import ReplayProvider
 
 _DEFAULT_US_PROVIDER = PolygonUSProvider()
 _DEFAULT_TO_PROVIDER = EodhdTOProvider()
@@ -13,6 +17,28 @@ _PROVIDERS: dict[str, MarketDataProvider] = {
 }
 
 
+def set_market_data_provider(market: str, provider: MarketDataProvider) -> MarketDataProvider:
+    """Serve ``market`` from ``provider`` (replay, benchmarks); return the previous one."""
+    code = market.upper()
+    previous = _PROVIDERS.get(code)
+    _PROVIDERS[code] = provider
+    return previous
+
+
+def use_replay_providers(root) -> list[str]:
+    """Replay every market with a directory under ``root``; return their codes."""
+    replayed = []
+    for code in list(_PROVIDERS):
+        if (Path(root) / code).is_dir():
+            set_market_data_provider(code, ReplayProvider(code, root))
+            replayed.append(code)
+    return replayed
+
+
+if MARKET_DATA_REPLAY_DIR:
+    use_replay_providers(MARKET_DATA_REPLAY_DIR)
+
+
 def get_market_data_provider(market: str = "US") -> MarketDataProvider:
     code = market.upper()
     provider = _PROVIDERS.get(code)
@@ -4,6 +4,8 @@ from typing import Optional, Protocol
 
 import pandas as pd
 
+from db.crud.ticker_universe import UniverseEntry
+
 
 class MarketDataProvider(Protocol):
     market: str
@@ -39,6 +41,9 @@ class MarketDataProvider(Protocol):
     def fetch_ticker_universe(self, date: str) -> list[str]:
         """All tickers available for the market on the given date."""
 
+    def fetch_ticker_universe_entries(self, date: str) -> list[UniverseEntry]:
+        """fetch_ticker_universe with per-symbol metadata (asset type, active)."""
+
     def fetch_ticker_extra_analytics(
         self,
         ticker: str,
@@ -56,3 +61,47 @@ class MarketDataProvider(Protocol):
         self, date: str
     ) -> tuple[Optional[str], Optional[str]]:
         """Return (LastCompletedSession, PriorCompletedSession) for the market."""
+
+    async def fetch_ohlcv_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        """fetch_ohlcv on the running loop's pooled HTTP client."""
+
+    async def fetch_ticker_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        """Awaitable fetch_ticker_analytics."""
+
+    async def fetch_ticker_base_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        """Awaitable fetch_ticker_base_analytics."""
+
+    async def fetch_ticker_universe_async(self, date: str) -> list[str]:
+        """Awaitable fetch_ticker_universe."""
+
+    async def fetch_ticker_extra_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        """Awaitable fetch_ticker_extra_analytics."""
+
+    async def resolve_session_dates_async(
+        self, date: str
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Awaitable resolve_session_dates."""
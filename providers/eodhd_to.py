@@ -1,40 +1,28 @@
 """Toronto Stock Exchange (TO) market data via EODHD."""
 
-import threading
-import time
 from typing import Optional
 
 import pandas as pd
-import requests
 
-from core.settings import EODHD_API_KEY, PROBE_TICKER_TO
+from core.settings import EODHD_API_KEY, EODHD_BASE_URL, PROBE_TICKER_TO
+from db.crud.ticker_universe import UniverseEntry
 from providers.analytics_mixin import (
     analytics_from_ohlcv,
     base_analytics_from_ohlcv_utc,
     extra_analytics_from_ohlcv,
 )
+from providers.http_transport import get_json, run_sync
 from providers.ohlcv_cache_mixin import OhlcvCacheMixin
-from services.session_dates import session_dates_from_ohlcv
+from providers.rate_limiter import get_throttle
 
-EODHD_BASE_URL = "https://eodhd.com/api"
-
-_thread_local = threading.local()
+# EODHD throttles per minute; rate-limit pauses get more attempts than errors.
+EODHD_MAX_ATTEMPTS = 8
 
 
 class EodhdTOProvider(OhlcvCacheMixin):
     market = "TO"
     probe_ticker = PROBE_TICKER_TO
 
-    def _http_session(self) -> requests.Session:
-        session = getattr(_thread_local, "eodhd_session", None)
-        if session is None:
-            session = requests.Session()
-            _thread_local.eodhd_session = session
-        return session
-
-    def _http_get(self, url: str, **kwargs) -> requests.Response:
-        return self._http_session().get(url, **kwargs)
-
     def _eod_symbol(self, ticker: str) -> str:
         return f"{ticker.upper()}.TO"
 
@@ -47,7 +35,7 @@ class EodhdTOProvider(OhlcvCacheMixin):
             f"&period=d&fmt=json&api_token={EODHD_API_KEY}"
         )
 
-    def _fetch_ohlcv_from_api(
+    async def _fetch_ohlcv_from_api_async(
         self,
         ticker: str,
         date: str,
@@ -59,21 +47,12 @@ class EodhdTOProvider(OhlcvCacheMixin):
         start_date = end_date - pd.Timedelta(days=offset_n_days)
         url = self._eod_url(ticker, start_date, end_date)
 
-        backoff = 1
-        while True:
-            response = self._http_get(url)
-            if response.status_code == 429:
-                print(
-                    f"providers/eodhd_to.py: rate limit hit for {ticker}, "
-                    f"sleeping {backoff}s"
-                )
-                time.sleep(backoff)
-                backoff = min(backoff * 2, 60)
-                continue
-            response.raise_for_status()
-            break
-
-        results = response.json()
+        results = await get_json(
+            url,
+            f"providers/eodhd_to.py {ticker}",
+            max_attempts=EODHD_MAX_ATTEMPTS,
+            throttle=get_throttle("eodhd"),
+        )
         if not isinstance(results, list):
             results = []
 
@@ -103,22 +82,90 @@ class EodhdTOProvider(OhlcvCacheMixin):
         df["ticker"] = ticker.upper()
         return df
 
-    def _fetch_eod_dataframe(
+    async def fetch_ohlcv_async(
         self,
         ticker: str,
         date: str,
-        offset_n_days: int,
-        actual_offset_n_days: int,
-        utc_dates: bool,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
     ) -> pd.DataFrame:
-        return self._load_ohlcv_window(
-            ticker,
-            date,
-            offset_n_days,
-            actual_offset_n_days,
-            utc_dates=utc_dates,
+        return await self._load_ohlcv_window_async(
+            ticker, date, offset_n_days, actual_offset_n_days, utc_dates=False
+        )
+
+    async def fetch_ohlcv_utc_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        return await self._load_ohlcv_window_async(
+            ticker, date, offset_n_days, actual_offset_n_days, utc_dates=True
         )
 
+    async def fetch_ticker_extra_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_async(ticker, date, offset_n_days, actual_offset_n_days)
+        return extra_analytics_from_ohlcv(df)
+
+    async def fetch_ticker_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_async(ticker, date, offset_n_days, actual_offset_n_days)
+        return analytics_from_ohlcv(df)
+
+    async def fetch_ticker_base_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_utc_async(
+            ticker, date, offset_n_days, actual_offset_n_days
+        )
+        return base_analytics_from_ohlcv_utc(df)
+
+    async def fetch_ticker_universe_entries_async(self, date: str) -> list[UniverseEntry]:
+        del date
+        url = (
+            f"{EODHD_BASE_URL}/exchange-symbol-list/TO"
+            f"?api_token={EODHD_API_KEY}&fmt=json"
+        )
+        data = await get_json(
+            url,
+            "providers/eodhd_to.py fetch_ticker_universe",
+            max_attempts=EODHD_MAX_ATTEMPTS,
+            throttle=get_throttle("eodhd"),
+        )
+        entries = []
+        for item in data:
+            code = item.get("Code") or item.get("code")
+            asset_type = item.get("Type") or item.get("type") or ""
+            if not code:
+                continue
+            if asset_type and asset_type.lower() not in ("common stock", "stock"):
+                continue
+            # the exchange symbol list only carries current listings
+            entries.append(UniverseEntry(ticker=code.upper(), asset_type=asset_type or None))
+        return entries
+
+    async def fetch_ticker_universe_async(self, date: str) -> list[str]:
+        entries = await self.fetch_ticker_universe_entries_async(date)
+        return [entry.ticker for entry in entries]
+
+    # sync adapters (thread callers: services, scripts, routes)
+
     def fetch_ohlcv(
         self,
         ticker: str,
@@ -126,7 +173,7 @@ class EodhdTOProvider(OhlcvCacheMixin):
         offset_n_days: Optional[int] = 85,
         actual_offset_n_days: Optional[int] = 50,
     ) -> pd.DataFrame:
-        return self._fetch_eod_dataframe(
+        return self._load_ohlcv_window(
             ticker, date, offset_n_days, actual_offset_n_days, utc_dates=False
         )
 
@@ -137,7 +184,7 @@ class EodhdTOProvider(OhlcvCacheMixin):
         offset_n_days: Optional[int] = 85,
         actual_offset_n_days: Optional[int] = 50,
     ) -> pd.DataFrame:
-        return self._fetch_eod_dataframe(
+        return self._load_ohlcv_window(
             ticker, date, offset_n_days, actual_offset_n_days, utc_dates=True
         )
 
@@ -176,39 +223,10 @@ class EodhdTOProvider(OhlcvCacheMixin):
     def resolve_session_dates(
         self, date: str
     ) -> tuple[Optional[str], Optional[str]]:
-        df = self.fetch_ohlcv(
-            self.probe_ticker, date, offset_n_days=10, actual_offset_n_days=2
-        )
-        return session_dates_from_ohlcv(df)
+        return run_sync(self.resolve_session_dates_async(date))
 
     def fetch_ticker_universe(self, date: str) -> list[str]:
-        del date
-        url = (
-            f"{EODHD_BASE_URL}/exchange-symbol-list/TO"
-            f"?api_token={EODHD_API_KEY}&fmt=json"
-        )
-        backoff = 1
-        while True:
-            response = self._http_get(url)
-            if response.status_code == 429:
-                print(
-                    f"providers/eodhd_to.py fetch_ticker_universe: "
-                    f"rate limit hit, sleeping {backoff}s"
-                )
-                time.sleep(backoff)
-                backoff = min(backoff * 2, 60)
-                continue
-            response.raise_for_status()
-            break
+        return run_sync(self.fetch_ticker_universe_async(date))
 
-        data = response.json()
-        tickers = []
-        for item in data:
-            code = item.get("Code") or item.get("code")
-            asset_type = (item.get("Type") or item.get("type") or "").lower()
-            if not code:
-                continue
-            if asset_type and asset_type not in ("common stock", "stock"):
-                continue
-            tickers.append(code.upper())
-        return tickers
+    def fetch_ticker_universe_entries(self, date: str) -> list[UniverseEntry]:
+        return run_sync(self.fetch_ticker_universe_entries_async(date))
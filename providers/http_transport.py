@@ -0,0 +1,189 @@
+"""
+Pooled asyncio HTTP transport shared by market data providers.
+
+Each event loop gets one keep-alive ``httpx.AsyncClient``. Sync provider
+methods are thin adapters: ``run_sync`` executes the provider coroutine on a
+shared background loop, so every worker thread multiplexes its requests over
+the same connection pool and backoff waits do not hold a thread.
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from time import monotonic
+from typing import Optional
+
+import httpx
+
+from core.settings import PROVIDER_HTTP_MAX_CONNECTIONS, PROVIDER_HTTP_TIMEOUT_SECONDS
+from providers.rate_limiter import ProviderThrottle
+
+_clients: dict = {}
+_sync_lock = threading.Lock()
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_thread: Optional[threading.Thread] = None
+_request_counter: ContextVar = ContextVar("provider_http_requests", default=None)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Keep-alive client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=PROVIDER_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=PROVIDER_HTTP_MAX_CONNECTIONS,
+            ),
+            timeout=PROVIDER_HTTP_TIMEOUT_SECONDS,
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's client (app/cron shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class RequestCounter:  # pylint: disable=R0903
+    requests: int = 0
+
+
+@contextmanager
+def count_http_requests():
+    """
+    Count ``get_json`` attempts made by the current task (and tasks it
+    starts) while the block runs; yields a ``RequestCounter``.
+    """
+    counter = RequestCounter()
+    token = _request_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_counter.reset(token)
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Retry-After header as seconds (delta or HTTP-date); None when absent."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+async def get_json(
+    url: str,
+    label: str,
+    max_attempts: int = 3,
+    throttle: Optional[ProviderThrottle] = None,
+):
+    """
+    GET a JSON payload, retrying transient failures with exponential backoff.
+    Rate-limited (429) responses count as an attempt and wait Retry-After (or
+    a doubling backoff). With a ``throttle`` the wait becomes a pause shared
+    by every caller of the provider, and each request takes a token and an
+    in-flight slot first.
+
+    Raises:
+        httpx.HTTPError | ValueError: last failure once attempts are exhausted
+    """
+    backoff = 1
+    last_error: Optional[Exception] = None
+    for attempt in range(max_attempts):
+        if throttle is not None:
+            await throttle.acquire()
+        started = monotonic()
+        throttled = False
+        wait = 0
+        counter = _request_counter.get()
+        if counter is not None:
+            counter.requests += 1
+        try:
+            response = await get_http_client().get(url)
+            if response.status_code == 429:
+                throttled = True
+                last_error = httpx.HTTPStatusError(
+                    "429 Too Many Requests", request=response.request, response=response
+                )
+                pause = retry_after_seconds(response)
+                pause = backoff if pause is None else pause
+                backoff = min(backoff * 2, 60)
+                print(f"{label}: rate limit hit, pausing {round(pause, 2)}s")
+                if throttle is not None:
+                    throttle.pause(pause)
+                else:
+                    wait = pause
+            else:
+                response.raise_for_status()
+                return response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            last_error = exc
+            if attempt == max_attempts - 1:
+                break
+            wait = min(backoff * (2**attempt), 30)
+            print(
+                f"{label}: request failed ({exc}), "
+                f"retry {attempt + 1}/{max_attempts - 1} in {wait}s"
+            )
+        finally:
+            if throttle is not None:
+                throttle.release(monotonic() - started, throttled)
+        if wait:
+            await asyncio.sleep(wait)
+    raise last_error
+
+
+def _sync_event_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop, _sync_thread  # pylint: disable=global-statement
+    with _sync_lock:
+        if _sync_loop is None or _sync_loop.is_closed():
+            _sync_loop = asyncio.new_event_loop()
+            _sync_thread = threading.Thread(
+                target=_sync_loop.run_forever, name="provider-http", daemon=True
+            )
+            _sync_thread.start()
+        return _sync_loop
+
+
+def run_sync(coro):
+    """Run a provider coroutine from sync code and return its result."""
+    if threading.current_thread() is _sync_thread:
+        coro.close()
+        raise RuntimeError(
+            "providers/http_transport.py: sync adapter called from the transport loop"
+        )
+    loop = _sync_event_loop()
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def shutdown_sync_transport() -> None:
+    """Close the background loop's client and stop the loop thread."""
+    global _sync_loop, _sync_thread  # pylint: disable=global-statement
+    with _sync_lock:
+        loop, thread = _sync_loop, _sync_thread
+        _sync_loop, _sync_thread = None, None
+    if loop is None or loop.is_closed():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(close_http_client(), loop).result()
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
@@ -2,23 +2,53 @@
 
 from __future__ import annotations
 
+import asyncio
+from contextlib import contextmanager
+from datetime import date as date_type, timedelta
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from core import settings
-from db.crud.ohlcv_bars import BarRow, fetch_bars, upsert_bars
+from db.crud.ohlcv_bars import (
+    BULK_WRITE_BATCH_SIZE,
+    BarArrays,
+    BarRow,
+    BulkBarWriter,
+    fetch_bars,
+    fetch_bars_many,
+    fetch_grouped_session_dates,
+    mark_grouped_session,
+    upsert_bars,
+)
+from providers.http_transport import run_sync
+from services.session_calendar import (
+    MAX_SESSION_GAP_DAYS,
+    cached_session_calendar,
+    calendar_from_window,
+    remember_sessions,
+    session_calendar_for,
+)
+from services.session_dates import session_dates_from_ohlcv
+
+# More missing ranges than this and a single full-window fetch is cheaper.
+MAX_DELTA_RANGES = 2
+# Calendar days fetched for the probe ticker when the session calendar misses.
+PROBE_WINDOW_DAYS = 10
 
 
 class OhlcvCacheMixin:
     """Mixin: PG-first window load with fail-open HTTP fallback."""
 
     market: str
+    supports_grouped_daily: bool = False
+    bar_writer: Optional[BulkBarWriter] = None
 
     def _normalize_cache_ticker(self, ticker: str) -> str:
         return ticker.upper()
 
-    def _fetch_ohlcv_from_api(
+    async def _fetch_ohlcv_from_api_async(
         self,
         ticker: str,
         date: str,
@@ -28,6 +58,51 @@ class OhlcvCacheMixin:
     ) -> pd.DataFrame:
         raise NotImplementedError
 
+    def _fetch_grouped_bars_from_api(self, session_date: str) -> dict[str, list[BarRow]]:
+        """Return one session's bars for the whole market keyed by cache ticker."""
+        raise NotImplementedError
+
+    def _window_end_session(self, end_date: date_type) -> date_type:
+        """Newest bar a complete window needs: the last session on or before ``end_date``."""
+        calendar = cached_session_calendar(self.market)
+        if calendar is not None:
+            last_session = calendar.session_n_before(end_date, 0)
+            if last_session is not None:
+                return last_session
+        return end_date
+
+    async def resolve_session_dates_async(
+        self, date: str
+    ) -> tuple[Optional[str], Optional[str]]:
+        """
+        (LastCompletedSession, PriorCompletedSession) from the session
+        calendar; the probe ticker is fetched (and its sessions learned) only
+        when the calendar does not cover ``date``.
+        """
+        probe_key = self._normalize_cache_ticker(self.probe_ticker)
+        calendar = await asyncio.to_thread(session_calendar_for, self.market, date, probe_key)
+        window = calendar.sessions_before(date, 2) if calendar is not None else None
+        if window is not None:
+            return window[1].isoformat(), window[0].isoformat()
+
+        df = await self.fetch_ohlcv_async(
+            self.probe_ticker, date, offset_n_days=PROBE_WINDOW_DAYS, actual_offset_n_days=2
+        )
+        if not df.empty and not settings.SESSION_CALENDAR_DISABLED:
+            end_date = pd.to_datetime(date).date()
+            learned = calendar_from_window(
+                self.market,
+                pd.to_datetime(df["date"]).dt.date.tolist(),
+                end_date - timedelta(days=PROBE_WINDOW_DAYS),
+                end_date,
+            )
+            if learned is not None:
+                try:
+                    await asyncio.to_thread(remember_sessions, learned)
+                except Exception as exc:  # pylint: disable=broad-except
+                    print(f"providers/ohlcv_cache_mixin.py session calendar write failed: {exc}")
+        return session_dates_from_ohlcv(df)
+
     def _bars_to_dataframe(
         self, bars: list[BarRow], ticker: str, utc_dates: bool
     ) -> pd.DataFrame:
@@ -50,29 +125,73 @@ class OhlcvCacheMixin:
         df["ticker"] = ticker.upper()
         return df
 
+    def _bar_arrays_to_dataframe(
+        self, arrays: BarArrays, ticker: str, utc_dates: bool
+    ) -> pd.DataFrame:
+        """Frame over the loaded column arrays (ascending dates), no per-row objects."""
+        if utc_dates:
+            dates = pd.DatetimeIndex(arrays.session_date).tz_localize("UTC")
+        else:
+            dates = np.datetime_as_string(arrays.session_date, unit="D").astype(object)
+        df = pd.DataFrame(
+            {
+                "date": dates,
+                "open": arrays.open,
+                "high": arrays.high,
+                "low": arrays.low,
+                "close": arrays.close,
+                "volume": arrays.volume,
+            },
+            copy=False,
+        )
+        df["ticker"] = ticker.upper()
+        return df
+
     def _dataframe_to_bar_rows(self, df: pd.DataFrame) -> list[BarRow]:
         if df.empty:
             return []
-        rows = []
-        for _, row in df.iterrows():
-            date_value = row["date"]
-            if hasattr(date_value, "date"):
-                session_date = date_value.date()
-            else:
-                session_date = pd.to_datetime(date_value).date()
-            rows.append(
-                BarRow(
-                    session_date=session_date,
-                    open=float(row["open"]),
-                    high=float(row["high"]),
-                    low=float(row["low"]),
-                    close=float(row["close"]),
-                    volume=int(row["volume"]),
-                )
+        dates = df["date"]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates)
+        return [
+            BarRow(
+                session_date=session_date,
+                open=open_,
+                high=high,
+                low=low,
+                close=close,
+                volume=volume,
             )
-        return rows
+            for session_date, open_, high, low, close, volume in zip(
+                dates.dt.date.tolist(),
+                df["open"].astype("float64").tolist(),
+                df["high"].astype("float64").tolist(),
+                df["low"].astype("float64").tolist(),
+                df["close"].astype("float64").tolist(),
+                df["volume"].astype("int64").tolist(),
+            )
+        ]
 
-    def _load_ohlcv_window(
+    def _write_through(self, cache_ticker: str, rows: list[BarRow]) -> None:
+        """Upsert fetched bars, or queue them on the active bulk writer."""
+        writer = getattr(self, "bar_writer", None)
+        if writer is not None:
+            writer.add(cache_ticker, rows)
+            return
+        upsert_bars(self.market, cache_ticker, rows)
+
+    @contextmanager
+    def buffered_bar_writes(self, batch_size: int = BULK_WRITE_BATCH_SIZE):
+        """Batch write-through bars from all threads into COPY flushes."""
+        writer = BulkBarWriter(self.market, batch_size=batch_size)
+        self.bar_writer = writer
+        try:
+            yield writer
+        finally:
+            self.bar_writer = None
+            writer.flush()
+
+    async def _load_ohlcv_window_async(
         self,
         ticker: str,
         date: str,
@@ -87,8 +206,10 @@ class OhlcvCacheMixin:
         cache_ticker = self._normalize_cache_ticker(ticker)
 
         if not settings.OHLCV_CACHE_DISABLED:
+            bars: list[BarRow] = []
             try:
-                bars = fetch_bars(
+                bars = await asyncio.to_thread(
+                    fetch_bars,
                     self.market,
                     cache_ticker,
                     start_date.date(),
@@ -96,12 +217,25 @@ class OhlcvCacheMixin:
                 )
                 if len(bars) >= actual_offset_n_days:
                     max_session = max(bar.session_date for bar in bars)
-                    if max_session >= end_date.date():
+                    if max_session >= self._window_end_session(end_date.date()):
                         return self._bars_to_dataframe(bars, ticker, utc_dates)
             except Exception as exc:  # pylint: disable=broad-except
                 print(f"providers/ohlcv_cache_mixin.py PG read failed: {exc}")
 
-        df = self._fetch_ohlcv_from_api(
+            missing_ranges = self._missing_session_ranges(
+                bars, start_date.date(), end_date.date(), actual_offset_n_days
+            )
+            if missing_ranges is not None:
+                return await self._load_missing_ranges_async(
+                    ticker,
+                    cache_ticker,
+                    bars,
+                    missing_ranges,
+                    actual_offset_n_days,
+                    utc_dates,
+                )
+
+        df = await self._fetch_ohlcv_from_api_async(
             ticker,
             date,
             offset_n_days,
@@ -112,12 +246,263 @@ class OhlcvCacheMixin:
             return df
 
         try:
-            upsert_bars(
-                self.market,
-                cache_ticker,
-                self._dataframe_to_bar_rows(df),
+            await asyncio.to_thread(
+                self._write_through, cache_ticker, self._dataframe_to_bar_rows(df)
             )
         except Exception as exc:  # pylint: disable=broad-except
             print(f"providers/ohlcv_cache_mixin.py PG write failed: {exc}")
 
         return df
+
+    def _load_ohlcv_window(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+        utc_dates: bool = False,
+    ) -> pd.DataFrame:
+        """Sync adapter over _load_ohlcv_window_async."""
+        return run_sync(
+            self._load_ohlcv_window_async(
+                ticker, date, offset_n_days, actual_offset_n_days, utc_dates
+            )
+        )
+
+    def load_cached_window_arrays(
+        self,
+        tickers: list[str],
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict[str, BarArrays]:
+        """
+        Bulk PG read of full analytics windows keyed by requested ticker.
+        Only tickers whose cached window would be a cache hit in
+        _load_ohlcv_window are returned; the rest need the per-ticker path.
+        """
+        if settings.OHLCV_CACHE_DISABLED or not tickers:
+            return {}
+        offset_n_days = offset_n_days or 85
+        actual_offset_n_days = actual_offset_n_days or 50
+        end_date = pd.to_datetime(date).date()
+        start_date = end_date - timedelta(days=offset_n_days)
+        cache_keys = {ticker: self._normalize_cache_ticker(ticker) for ticker in tickers}
+        arrays_by_key = fetch_bars_many(
+            self.market, list(cache_keys.values()), start_date, end_date
+        )
+        end_day = np.datetime64(self._window_end_session(end_date), "D")
+        windows = {}
+        for ticker, cache_key in cache_keys.items():
+            arrays = arrays_by_key.get(cache_key)
+            if arrays is None or len(arrays) < actual_offset_n_days:
+                continue
+            if arrays.session_date[-1] < end_day:
+                continue
+            windows[ticker] = arrays
+        return windows
+
+    def load_ohlcv_windows(
+        self,
+        tickers: list[str],
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+        utc_dates: bool = True,
+    ) -> dict[str, pd.DataFrame]:
+        """Cache-hit windows for many tickers as frames (see load_cached_window_arrays)."""
+        windows = self.load_cached_window_arrays(
+            tickers, date, offset_n_days, actual_offset_n_days
+        )
+        return {
+            ticker: self._bar_arrays_to_dataframe(arrays, ticker, utc_dates)
+            for ticker, arrays in windows.items()
+        }
+
+    def fetch_ohlcv_window_arrays(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> Optional[BarArrays]:
+        """
+        Single-ticker window (bar store first, HTTP fallback) as ascending
+        column arrays; None when the provider has too few bars.
+        """
+        return run_sync(
+            self.fetch_ohlcv_window_arrays_async(
+                ticker, date, offset_n_days, actual_offset_n_days
+            )
+        )
+
+    async def fetch_ohlcv_window_arrays_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> Optional[BarArrays]:
+        df = await self._load_ohlcv_window_async(
+            ticker, date, offset_n_days, actual_offset_n_days, utc_dates=True
+        )
+        rows = sorted(self._dataframe_to_bar_rows(df), key=lambda bar: bar.session_date)
+        if not rows:
+            return None
+        return BarArrays(
+            session_date=np.array([bar.session_date for bar in rows], dtype="datetime64[D]"),
+            open=np.array([bar.open for bar in rows], dtype=np.float64),
+            high=np.array([bar.high for bar in rows], dtype=np.float64),
+            low=np.array([bar.low for bar in rows], dtype=np.float64),
+            close=np.array([bar.close for bar in rows], dtype=np.float64),
+            volume=np.array([bar.volume for bar in rows], dtype=np.int64),
+        )
+
+    def _missing_session_ranges(
+        self,
+        bars: list[BarRow],
+        start_date: date_type,
+        end_date: date_type,
+        actual_offset_n_days: int,
+    ) -> Optional[list[tuple[date_type, date_type]]]:
+        """
+        Return inclusive (start, end) calendar ranges absent from cached bars:
+        the tail after the newest bar, interior gaps, and the head only when
+        the cache holds too few bars. Gaps are exact sessions when the session
+        calendar covers the window, else gaps longer than a long weekend.
+        None means the full window should be fetched instead.
+        """
+        if not bars:
+            return None
+        sessions = sorted(bar.session_date for bar in bars)
+        calendar = cached_session_calendar(self.market)
+        ranges = (
+            calendar.missing_ranges(sessions, start_date, end_date)
+            if calendar is not None
+            else None
+        )
+        if ranges is not None:
+            if len(sessions) >= actual_offset_n_days:
+                # listed after the window start: there are no older bars to fetch
+                ranges = [item for item in ranges if item[1] > sessions[0]]
+            return ranges if len(ranges) <= MAX_DELTA_RANGES else None
+
+        ranges = []
+        if (
+            len(sessions) < actual_offset_n_days
+            and (sessions[0] - start_date).days > MAX_SESSION_GAP_DAYS
+        ):
+            ranges.append((start_date, sessions[0] - timedelta(days=1)))
+        for prev, curr in zip(sessions, sessions[1:]):
+            if (curr - prev).days > MAX_SESSION_GAP_DAYS:
+                ranges.append((prev + timedelta(days=1), curr - timedelta(days=1)))
+        if sessions[-1] < end_date:
+            ranges.append((sessions[-1] + timedelta(days=1), end_date))
+        if len(ranges) > MAX_DELTA_RANGES:
+            return None
+        return ranges
+
+    async def _load_missing_ranges_async(
+        self,
+        ticker: str,
+        cache_ticker: str,
+        bars: list[BarRow],
+        missing_ranges: list[tuple[date_type, date_type]],
+        actual_offset_n_days: int,
+        utc_dates: bool,
+    ) -> pd.DataFrame:
+        """Fetch only the missing ranges, write them through and merge with cache."""
+        merged = {bar.session_date: bar for bar in bars}
+        fetched: list[BarRow] = []
+        frames = await asyncio.gather(
+            *[
+                self._fetch_ohlcv_from_api_async(
+                    ticker,
+                    range_end.isoformat(),
+                    (range_end - range_start).days,
+                    1,
+                    utc_dates,
+                )
+                for range_start, range_end in missing_ranges
+            ]
+        )
+        for (range_start, range_end), df in zip(missing_ranges, frames):
+            for row in self._dataframe_to_bar_rows(df):
+                if range_start <= row.session_date <= range_end:
+                    fetched.append(row)
+                    merged[row.session_date] = row
+
+        if fetched:
+            try:
+                await asyncio.to_thread(self._write_through, cache_ticker, fetched)
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"providers/ohlcv_cache_mixin.py PG write failed: {exc}")
+
+        if len(merged) < actual_offset_n_days:
+            print(
+                f"providers/ohlcv_cache_mixin.py: not enough EOD records "
+                f"({len(merged)}) for ticker {ticker}"
+            )
+            return pd.DataFrame()
+
+        ordered = sorted(merged.values(), key=lambda bar: bar.session_date, reverse=True)
+        return self._bars_to_dataframe(ordered, ticker, utc_dates)
+
+    def sync_grouped_window(self, date: str, offset_n_days: Optional[int] = 85) -> dict:
+        """
+        Fill ohlcv_bars for the whole market one session at a time so per-ticker
+        window loads are served from PG. Weekdays already synced (including
+        recorded holidays) are skipped; failures are logged and left to the
+        per-ticker HTTP fallback.
+        """
+        summary = {"requests": 0, "sessions": 0, "bars": 0}
+        if settings.OHLCV_CACHE_DISABLED or not self.supports_grouped_daily:
+            return summary
+
+        offset_n_days = offset_n_days or 85
+        end_date = pd.to_datetime(date).date()
+        start_date = end_date - timedelta(days=offset_n_days)
+        synced = fetch_grouped_session_dates(self.market, start_date, end_date)
+
+        pending_sessions: list[tuple[date_type, int]] = []
+
+        def flush_sessions(writer: BulkBarWriter) -> None:
+            written = writer.flush()
+            if written:
+                for session_date, ticker_count in pending_sessions:
+                    mark_grouped_session(self.market, session_date, ticker_count)
+                summary["sessions"] += len(pending_sessions)
+                summary["bars"] += written
+            pending_sessions.clear()
+
+        # Sessions are marked synced only after their bars are merged.
+        writer = BulkBarWriter(self.market, auto_flush=False)
+        for session in pd.bdate_range(start_date, end_date):
+            session_date = session.date()
+            if session_date in synced:
+                continue
+            summary["requests"] += 1
+            try:
+                bars_by_ticker = self._fetch_grouped_bars_from_api(
+                    session_date.isoformat()
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                print(
+                    f"providers/ohlcv_cache_mixin.py grouped fetch failed "
+                    f"for {self.market} {session_date}: {exc}"
+                )
+                continue
+
+            if not bars_by_ticker:
+                # Empty past session is a holiday; the target session may be unpublished.
+                if session_date < end_date:
+                    mark_grouped_session(self.market, session_date, 0)
+                continue
+
+            writer.add_many(bars_by_ticker)
+            pending_sessions.append((session_date, len(bars_by_ticker)))
+            if writer.pending_rows >= writer.batch_size:
+                flush_sessions(writer)
+
+        flush_sessions(writer)
+        return summary
@@ -1,41 +1,31 @@
 """US equities market data via Polygon.io."""
 
-import threading
-import time
+from datetime import date as date_type
 from typing import Optional
 
 import pandas as pd
-import requests
 
-from core.settings import POLYGON_API_KEY, PROBE_TICKER_US
+from core.settings import POLYGON_API_KEY, POLYGON_BASE_URL, PROBE_TICKER_US
 from providers.analytics_mixin import (
     analytics_from_ohlcv,
     base_analytics_from_ohlcv_utc,
     extra_analytics_from_ohlcv,
 )
+from db.crud.ohlcv_bars import BarRow
+from db.crud.ticker_universe import UniverseEntry
+from providers.http_transport import get_json, run_sync
 from providers.ohlcv_cache_mixin import OhlcvCacheMixin
-from services.session_dates import session_dates_from_ohlcv
+from providers.rate_limiter import get_throttle
 
 POLYGON_SYMBOL_ALIASES = {
     "GOOG": "GOOGL",
 }
 
-_thread_local = threading.local()
-
 
 class PolygonUSProvider(OhlcvCacheMixin):
     market = "US"
     probe_ticker = PROBE_TICKER_US
-
-    def _http_session(self) -> requests.Session:
-        session = getattr(_thread_local, "polygon_session", None)
-        if session is None:
-            session = requests.Session()
-            _thread_local.polygon_session = session
-        return session
-
-    def _http_get(self, url: str, **kwargs) -> requests.Response:
-        return self._http_session().get(url, **kwargs)
+    supports_grouped_daily = True
 
     def _polygon_symbol(self, ticker: str) -> str:
         return POLYGON_SYMBOL_ALIASES.get(ticker.upper(), ticker.upper())
@@ -48,39 +38,27 @@ class PolygonUSProvider(OhlcvCacheMixin):
     ) -> str:
         polygon_symbol = self._polygon_symbol(ticker)
         return (
-            f"https://api.polygon.io/v2/aggs/ticker/{polygon_symbol}/range/1/day/"
+            f"{POLYGON_BASE_URL}/v2/aggs/ticker/{polygon_symbol}/range/1/day/"
             f"{start_date.strftime('%Y-%m-%d')}/{end_date.strftime('%Y-%m-%d')}"
             f"?adjusted=true&sort=desc&limit=50000&apiKey={POLYGON_API_KEY}"
         )
 
+    def _polygon_grouped_url(self, session_date: str) -> str:
+        return (
+            f"{POLYGON_BASE_URL}/v2/aggs/grouped/locale/us/market/stocks/"
+            f"{session_date}?adjusted=true&apiKey={POLYGON_API_KEY}"
+        )
+
+    async def _request_json_async(self, url: str, max_attempts: int = 3) -> dict:
+        return await get_json(
+            url, "providers/polygon_us.py", max_attempts, throttle=get_throttle("polygon")
+        )
+
     def _request_json(self, url: str, max_attempts: int = 3) -> dict:
-        backoff = 1
-        last_error = None
-        for attempt in range(max_attempts):
-            try:
-                response = self._http_get(url, timeout=60)
-                if response.status_code == 429:
-                    print(
-                        f"providers/polygon_us.py: rate limit hit, sleeping {backoff}s"
-                    )
-                    time.sleep(backoff)
-                    backoff = min(backoff * 2, 60)
-                    continue
-                response.raise_for_status()
-                return response.json()
-            except (requests.RequestException, ValueError) as exc:
-                last_error = exc
-                if attempt == max_attempts - 1:
-                    break
-                wait = min(backoff * (2**attempt), 30)
-                print(
-                    f"providers/polygon_us.py: request failed ({exc}), "
-                    f"retry {attempt + 1}/{max_attempts - 1} in {wait}s"
-                )
-                time.sleep(wait)
-        raise last_error
+        """Sync adapter over _request_json_async."""
+        return run_sync(self._request_json_async(url, max_attempts))
 
-    def _fetch_ohlcv_from_api(
+    async def _fetch_ohlcv_from_api_async(
         self,
         ticker: str,
         date: str,
@@ -92,7 +70,7 @@ class PolygonUSProvider(OhlcvCacheMixin):
         start_date = end_date - pd.Timedelta(days=offset_n_days)
         url = self._polygon_aggs_url(ticker, start_date, end_date)
 
-        data = self._request_json(url)
+        data = await self._request_json_async(url)
 
         results = data.get("results", [])
         if not results or len(results) < actual_offset_n_days:
@@ -130,6 +108,125 @@ class PolygonUSProvider(OhlcvCacheMixin):
         df["ticker"] = ticker.upper()
         return df
 
+    def _fetch_grouped_bars_from_api(self, session_date: str) -> dict[str, list[BarRow]]:
+        data = self._request_json(self._polygon_grouped_url(session_date))
+        session = date_type.fromisoformat(session_date)
+        bars_by_ticker: dict[str, list[BarRow]] = {}
+        for item in data.get("results") or []:
+            ticker = item.get("T")
+            if not ticker:
+                continue
+            try:
+                bar = BarRow(
+                    session_date=session,
+                    open=float(item["o"]),
+                    high=float(item["h"]),
+                    low=float(item["l"]),
+                    close=float(item["c"]),
+                    volume=int(item["v"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+            bars_by_ticker[ticker.upper()] = [bar]
+        return bars_by_ticker
+
+    async def fetch_ohlcv_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        return await self._load_ohlcv_window_async(
+            ticker,
+            date,
+            offset_n_days,
+            actual_offset_n_days,
+            utc_dates=False,
+        )
+
+    async def fetch_ohlcv_utc_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        """OHLCV with UTC-aware timestamps (pipeline insert path)."""
+        return await self._load_ohlcv_window_async(
+            ticker,
+            date,
+            offset_n_days,
+            actual_offset_n_days,
+            utc_dates=True,
+        )
+
+    async def fetch_ticker_extra_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_async(ticker, date, offset_n_days, actual_offset_n_days)
+        return extra_analytics_from_ohlcv(df)
+
+    async def fetch_ticker_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_async(ticker, date, offset_n_days, actual_offset_n_days)
+        return analytics_from_ohlcv(df)
+
+    async def fetch_ticker_base_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_utc_async(
+            ticker, date, offset_n_days, actual_offset_n_days
+        )
+        return base_analytics_from_ohlcv_utc(df)
+
+    async def fetch_ticker_universe_entries_async(self, date: str) -> list[UniverseEntry]:
+        url = (
+            f"{POLYGON_BASE_URL}/v3/reference/tickers?market=stocks&active=true"
+            f"&apiKey={POLYGON_API_KEY}&limit=1000&date={date}"
+        )
+        entries = []
+        while url:
+            data = await get_json(
+                url,
+                "providers/polygon_us.py fetch_ticker_universe",
+                max_attempts=8,
+                throttle=get_throttle("polygon"),
+            )
+            entries.extend(
+                UniverseEntry(
+                    ticker=item["ticker"],
+                    asset_type=item.get("type"),
+                    active=bool(item.get("active", True)),
+                )
+                for item in data.get("results", [])
+            )
+
+            url = data.get("next_url")
+            if url:
+                url += f"&apiKey={POLYGON_API_KEY}"
+
+        return entries
+
+    async def fetch_ticker_universe_async(self, date: str) -> list[str]:
+        entries = await self.fetch_ticker_universe_entries_async(date)
+        return [entry.ticker for entry in entries]
+
+    # sync adapters (thread callers: services, scripts, routes)
+
     def fetch_ohlcv(
         self,
         ticker: str,
@@ -196,37 +293,10 @@ class PolygonUSProvider(OhlcvCacheMixin):
     def resolve_session_dates(
         self, date: str
     ) -> tuple[Optional[str], Optional[str]]:
-        df = self.fetch_ohlcv(
-            self.probe_ticker, date, offset_n_days=10, actual_offset_n_days=2
-        )
-        return session_dates_from_ohlcv(df)
+        return run_sync(self.resolve_session_dates_async(date))
 
     def fetch_ticker_universe(self, date: str) -> list[str]:
-        url = (
-            f"https://api.polygon.io/v3/reference/tickers?market=stocks&active=true"
-            f"&apiKey={POLYGON_API_KEY}&limit=1000&date={date}"
-        )
-        tickers = []
-        backoff = 1
-
-        while url:
-            response = self._http_get(url)
-            if response.status_code == 429:
-                print(
-                    f"providers/polygon_us.py fetch_ticker_universe: "
-                    f"rate limit hit, sleeping {backoff}s"
-                )
-                time.sleep(backoff)
-                backoff = min(backoff * 2, 60)
-                continue
-            response.raise_for_status()
-
-            data = response.json()
-            tickers.extend(item["ticker"] for item in data.get("results", []))
-
-            url = data.get("next_url")
-            if url:
-                url += f"&apiKey={POLYGON_API_KEY}"
-            backoff = 1
+        return run_sync(self.fetch_ticker_universe_async(date))
 
-        return tickers
+    def fetch_ticker_universe_entries(self, date: str) -> list[UniverseEntry]:
+        return run_sync(self.fetch_ticker_universe_entries_async(date))
@@ -0,0 +1,210 @@
+"""
+Process-wide request throttling for market data providers.
+
+One ``ProviderThrottle`` per vendor combines a token bucket sized to the plan
+quota, a global pause that every caller honours after a 429 / Retry-After,
+and an AIMD controller for the number of requests in flight: it grows by one
+slot per window of fast responses and halves on throttling or slow
+responses. State is guarded by a thread lock so the cron loop and the sync
+adapter loop share the same budget.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from time import monotonic
+from typing import Optional
+
+
+@dataclass
+class ThrottleStats:
+    requests: int = 0
+    throttled: int = 0
+    pauses: int = 0
+    paused_seconds: float = 0.0
+    token_wait_seconds: float = 0.0
+    concurrency_decreases: int = 0
+    limit_min: float = 0.0
+    limit_max: float = 0.0
+    limit: float = 0.0
+
+
+class ProviderThrottle:
+    """Token bucket + global pause + AIMD in-flight limit for one provider."""
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        min_concurrency: int,
+        max_concurrency: int,
+        target_latency_seconds: float,
+        initial_concurrency: Optional[int] = None,
+        burst: Optional[float] = None,
+    ):
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.burst = burst if burst is not None else max(rate_per_second, 1.0)
+        self.min_concurrency = max(min_concurrency, 1)
+        self.max_concurrency = max(max_concurrency, self.min_concurrency)
+        self.target_latency_seconds = target_latency_seconds
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._refilled_at = monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._in_flight = 0
+        self._waiters: deque = deque()
+        initial = initial_concurrency or self.min_concurrency
+        self.limit = float(min(max(initial, self.min_concurrency), self.max_concurrency))
+        self.stats = ThrottleStats(
+            limit_min=self.limit, limit_max=self.limit, limit=self.limit
+        )
+
+    async def acquire(self) -> None:
+        """Wait for an in-flight slot, then for a token outside any pause."""
+        await self._acquire_slot()
+        try:
+            await self._acquire_token()
+        except BaseException:
+            self._release_slot()
+            raise
+
+    def release(self, latency_seconds: float, throttled: bool = False) -> None:
+        """Return the slot and feed the response outcome to the AIMD controller."""
+        with self._lock:
+            now = monotonic()
+            if throttled or latency_seconds > self.target_latency_seconds:
+                # one decrease per latency window, not per response in flight
+                if now - self._last_decrease >= self.target_latency_seconds:
+                    self.limit = max(float(self.min_concurrency), self.limit / 2)
+                    self._last_decrease = now
+                    self.stats.concurrency_decreases += 1
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self.stats.limit = self.limit
+            self.stats.limit_min = min(self.stats.limit_min, self.limit)
+            self.stats.limit_max = max(self.stats.limit_max, self.limit)
+        self._release_slot()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller of this provider for ``seconds`` (429 / Retry-After)."""
+        with self._lock:
+            self.stats.throttled += 1
+            now = monotonic()
+            until = now + max(seconds, 0.0)
+            if until > self._paused_until:
+                self.stats.pauses += 1
+                self.stats.paused_seconds += until - max(self._paused_until, now)
+                self._paused_until = until
+            self._tokens = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return asdict(self.stats)
+
+    async def _acquire_slot(self) -> None:
+        while True:
+            with self._lock:
+                if self._in_flight < int(self.limit):
+                    self._in_flight += 1
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                self._wake_waiters()
+                raise
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        with self._lock:
+            free = int(self.limit) - self._in_flight
+            woken = [self._waiters.popleft() for _ in range(min(free, len(self._waiters)))]
+        for waiter in woken:
+            loop = waiter.get_loop()
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, waiter)
+
+    async def _acquire_token(self) -> None:
+        while True:
+            with self._lock:
+                now = monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.rate_per_second <= 0:
+                    self.stats.requests += 1
+                    return
+                else:
+                    self._tokens = min(
+                        self.burst,
+                        self._tokens + (now - self._refilled_at) * self.rate_per_second,
+                    )
+                    self._refilled_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.stats.requests += 1
+                        return
+                    wait = (1 - self._tokens) / self.rate_per_second
+                    self.stats.token_wait_seconds += wait
+            await asyncio.sleep(wait)
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_throttles: dict = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle(provider: str) -> ProviderThrottle:
+    """Shared throttle for ``provider`` ("polygon" | "eodhd"), sized from settings."""
+    from core.settings import (
+        CRON_MAX_WORKERS,
+        EODHD_REQUESTS_PER_SECOND,
+        POLYGON_REQUESTS_PER_SECOND,
+        PROVIDER_MAX_CONCURRENCY,
+        PROVIDER_MIN_CONCURRENCY,
+        PROVIDER_TARGET_LATENCY_SECONDS,
+    )
+
+    quotas = {
+        "polygon": POLYGON_REQUESTS_PER_SECOND,
+        "eodhd": EODHD_REQUESTS_PER_SECOND,
+    }
+    with _throttles_lock:
+        throttle = _throttles.get(provider)
+        if throttle is None:
+            throttle = ProviderThrottle(
+                provider,
+                rate_per_second=quotas.get(provider, 0.0),
+                min_concurrency=PROVIDER_MIN_CONCURRENCY,
+                max_concurrency=PROVIDER_MAX_CONCURRENCY,
+                target_latency_seconds=PROVIDER_TARGET_LATENCY_SECONDS,
+                initial_concurrency=CRON_MAX_WORKERS,
+            )
+            _throttles[provider] = throttle
+        return throttle
+
+
+def throttle_stats() -> dict:
+    """Provider name -> ThrottleStats fields for every throttle used so far."""
+    with _throttles_lock:
+        throttles = list(_throttles.values())
+    return {throttle.name: throttle.snapshot() for throttle in throttles}
+
+
+def reset_throttles() -> None:
+    with _throttles_lock:
+        _throttles.clear()
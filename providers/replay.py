@@ -0,0 +1,374 @@
+"""
+Recorded market data replayed from local column files.
+
+A replay dataset holds one directory per market::
+
+    <root>/<MARKET>/manifest.json     tickers (row order), asset types
+    <root>/<MARKET>/session_date.npy  datetime64[D], shape (sessions,)
+    <root>/<MARKET>/{open,high,low,close}.npy  float64, shape (tickers, sessions)
+    <root>/<MARKET>/volume.npy        int64, shape (tickers, sessions)
+
+A NaN close marks a session without a bar. Columns are memory-mapped, so a
+universe of thousands of tickers opens instantly and a window read only
+touches the pages of one ticker row. ``ReplayProvider`` serves the
+``MarketDataProvider`` protocol from such a directory without network calls,
+keeping the bar-store write-through of the HTTP providers.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core import settings
+from db.crud.ohlcv_bars import BarArrays
+from db.crud.ticker_universe import UniverseEntry
+from providers.analytics_mixin import (
+    analytics_from_ohlcv,
+    base_analytics_from_ohlcv_utc,
+    extra_analytics_from_ohlcv,
+)
+from providers.ohlcv_cache_mixin import OhlcvCacheMixin
+from providers.http_transport import run_sync
+from services.session_dates import session_dates_from_ohlcv
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+MANIFEST_FILE = "manifest.json"
+REPLAY_FORMAT_VERSION = 1
+
+
+class ReplayDataset:  # pylint: disable=R0903
+    """Memory-mapped columns of one market directory."""
+
+    def __init__(self, market_dir: Path):
+        manifest = json.loads((market_dir / MANIFEST_FILE).read_text(encoding="utf-8"))
+        self.market = manifest["market"]
+        self.tickers: list[str] = manifest["tickers"]
+        self.asset_types: dict = manifest.get("asset_types") or {}
+        self.index = {ticker: row for row, ticker in enumerate(self.tickers)}
+        self.session_date = np.load(market_dir / "session_date.npy")
+        self.columns = {
+            name: np.load(market_dir / f"{name}.npy", mmap_mode="r")
+            for name in (*PRICE_COLUMNS, "volume")
+        }
+
+    def window(self, ticker: str, start: np.datetime64, end: np.datetime64) -> Optional[BarArrays]:
+        """Bars of ``ticker`` within [start, end] (ascending); None if unknown."""
+        row = self.index.get(ticker.upper())
+        if row is None:
+            return None
+        lo = int(np.searchsorted(self.session_date, start, side="left"))
+        hi = int(np.searchsorted(self.session_date, end, side="right"))
+        close = np.asarray(self.columns["close"][row, lo:hi])
+        present = ~np.isnan(close)
+        return BarArrays(
+            session_date=self.session_date[lo:hi][present],
+            open=np.asarray(self.columns["open"][row, lo:hi])[present],
+            high=np.asarray(self.columns["high"][row, lo:hi])[present],
+            low=np.asarray(self.columns["low"][row, lo:hi])[present],
+            close=close[present],
+            volume=np.asarray(self.columns["volume"][row, lo:hi])[present],
+        )
+
+
+def write_replay_dataset(
+    root,
+    market: str,
+    tickers: list[str],
+    session_date: np.ndarray,
+    columns: dict,
+    asset_types: Optional[dict] = None,
+) -> Path:
+    """
+    Write a market directory. ``columns`` maps open/high/low/close/volume to
+    (tickers, sessions) arrays aligned with ``tickers`` and ``session_date``.
+    """
+    market_dir = Path(root) / market.upper()
+    market_dir.mkdir(parents=True, exist_ok=True)
+    shape = (len(tickers), len(session_date))
+    np.save(market_dir / "session_date.npy", np.asarray(session_date, dtype="datetime64[D]"))
+    for name in PRICE_COLUMNS:
+        values = np.asarray(columns[name], dtype=np.float64)
+        if values.shape != shape:
+            raise ValueError(f"providers/replay.py: {name} has shape {values.shape}, want {shape}")
+        np.save(market_dir / f"{name}.npy", values)
+    np.save(market_dir / "volume.npy", np.asarray(columns["volume"], dtype=np.int64))
+    manifest = {
+        "format": REPLAY_FORMAT_VERSION,
+        "market": market.upper(),
+        "tickers": [ticker.upper() for ticker in tickers],
+        "asset_types": asset_types or {},
+    }
+    (market_dir / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+    return market_dir
+
+
+def synthetic_replay_dataset(
+    root,
+    market: str,
+    n_tickers: int,
+    end_date: str,
+    n_sessions: int = 120,
+    seed: int = 0,
+    extra_tickers: Optional[list[str]] = None,
+    gap_ratio: float = 0.002,
+    short_history_ratio: float = 0.01,
+) -> Path:
+    """
+    Random-walk universe of ``n_tickers`` (plus ``extra_tickers``, e.g. the
+    probe ticker) over ``n_sessions`` weekdays ending on ``end_date``. A few
+    random bars are dropped (``gap_ratio``) and a few tickers only list
+    recently (``short_history_ratio``), like a real universe.
+    """
+    rng = np.random.default_rng(seed)
+    end = np.datetime64(end_date, "D")
+    session_date = np.busday_offset(end, np.arange(-n_sessions + 1, 1), roll="backward")
+    tickers = list(extra_tickers or []) + [f"R{index:05d}" for index in range(n_tickers)]
+    shape = (len(tickers), n_sessions)
+
+    start_price = rng.uniform(2.0, 400.0, size=(len(tickers), 1))
+    returns = rng.normal(0.0003, 0.02, size=shape)
+    close = start_price * np.exp(np.cumsum(returns, axis=1))
+    spread = np.abs(rng.normal(0.0, 0.01, size=shape))
+    open_ = close * (1 + rng.normal(0.0, 0.005, size=shape))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.integers(10_000, 5_000_000, size=shape, dtype=np.int64)
+
+    # never drop the session itself or bars of the leading (probe) tickers
+    gaps = rng.random(size=shape) < gap_ratio
+    gaps[:, -1] = False
+    gaps[: len(extra_tickers or [])] = False
+    close[gaps] = np.nan
+    n_short = int(n_tickers * short_history_ratio)
+    if n_short:
+        short_rows = rng.choice(np.arange(len(extra_tickers or []), len(tickers)), n_short, replace=False)
+        close[short_rows, : n_sessions - 20] = np.nan
+
+    return write_replay_dataset(
+        root,
+        market,
+        tickers,
+        session_date,
+        {"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+    )
+
+
+class ReplayProvider(OhlcvCacheMixin):
+    """MarketDataProvider over a replay dataset directory (see module docstring)."""
+
+    def __init__(self, market: str, root, probe_ticker: Optional[str] = None):
+        self.market = market.upper()
+        self.market_dir = Path(root) / self.market
+        self._probe_ticker = probe_ticker
+        self._dataset: Optional[ReplayDataset] = None
+        self._lock = threading.Lock()
+
+    @property
+    def dataset(self) -> ReplayDataset:
+        if self._dataset is None:
+            with self._lock:
+                if self._dataset is None:
+                    self._dataset = ReplayDataset(self.market_dir)
+        return self._dataset
+
+    @property
+    def probe_ticker(self) -> str:
+        if self._probe_ticker:
+            return self._probe_ticker
+        configured = {"US": settings.PROBE_TICKER_US, "TO": settings.PROBE_TICKER_TO}.get(
+            self.market
+        )
+        if configured and configured.upper() in self.dataset.index:
+            return configured
+        return self.dataset.tickers[0]
+
+    def _window(self, ticker: str, date: str, offset_n_days: int) -> Optional[BarArrays]:
+        end = np.datetime64(str(date)[:10], "D")
+        return self.dataset.window(ticker, end - offset_n_days, end)
+
+    async def _fetch_ohlcv_from_api_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: int,
+        actual_offset_n_days: int,
+        utc_dates: bool,
+    ) -> pd.DataFrame:
+        arrays = self._window(ticker, date, offset_n_days)
+        if arrays is None or len(arrays) < actual_offset_n_days:
+            print(
+                f"providers/replay.py: not enough recorded bars "
+                f"({0 if arrays is None else len(arrays)}) for ticker {ticker}"
+            )
+            return pd.DataFrame()
+        return self._bar_arrays_to_dataframe(arrays, ticker, utc_dates)
+
+    async def fetch_ohlcv_window_arrays_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> Optional[BarArrays]:
+        if not settings.OHLCV_CACHE_DISABLED:
+            return await super().fetch_ohlcv_window_arrays_async(
+                ticker, date, offset_n_days, actual_offset_n_days
+            )
+        # no bar store to fill: slice the mapped columns directly
+        arrays = self._window(ticker, date, offset_n_days or 85)
+        if arrays is None or len(arrays) < (actual_offset_n_days or 50):
+            return None
+        return arrays
+
+    async def fetch_ohlcv_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        return await self._load_ohlcv_window_async(
+            ticker, date, offset_n_days, actual_offset_n_days, utc_dates=False
+        )
+
+    async def fetch_ohlcv_utc_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        return await self._load_ohlcv_window_async(
+            ticker, date, offset_n_days, actual_offset_n_days, utc_dates=True
+        )
+
+    async def fetch_ticker_extra_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_async(ticker, date, offset_n_days, actual_offset_n_days)
+        return extra_analytics_from_ohlcv(df)
+
+    async def fetch_ticker_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_async(ticker, date, offset_n_days, actual_offset_n_days)
+        return analytics_from_ohlcv(df)
+
+    async def fetch_ticker_base_analytics_async(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = await self.fetch_ohlcv_utc_async(
+            ticker, date, offset_n_days, actual_offset_n_days
+        )
+        return base_analytics_from_ohlcv_utc(df)
+
+    async def resolve_session_dates_async(
+        self, date: str
+    ) -> tuple[Optional[str], Optional[str]]:
+        df = await self.fetch_ohlcv_async(
+            self.probe_ticker, date, offset_n_days=10, actual_offset_n_days=2
+        )
+        return session_dates_from_ohlcv(df)
+
+    async def fetch_ticker_universe_entries_async(self, date: str) -> list[UniverseEntry]:
+        # listed on ``date``: the ticker has a bar on or before it
+        end = np.datetime64(str(date)[:10], "D")
+        upto = int(np.searchsorted(self.dataset.session_date, end, side="right"))
+        if upto == 0:
+            return []
+        close = self.dataset.columns["close"]
+        listed = ~np.all(np.isnan(np.asarray(close[:, :upto])), axis=1)
+        return [
+            UniverseEntry(ticker=ticker, asset_type=self.dataset.asset_types.get(ticker))
+            for ticker, is_listed in zip(self.dataset.tickers, listed)
+            if is_listed
+        ]
+
+    async def fetch_ticker_universe_async(self, date: str) -> list[str]:
+        entries = await self.fetch_ticker_universe_entries_async(date)
+        return [entry.ticker for entry in entries]
+
+    # sync adapters (thread callers: services, scripts, routes)
+
+    def fetch_ohlcv(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        return self._load_ohlcv_window(
+            ticker, date, offset_n_days, actual_offset_n_days, utc_dates=False
+        )
+
+    def fetch_ohlcv_utc(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        return self._load_ohlcv_window(
+            ticker, date, offset_n_days, actual_offset_n_days, utc_dates=True
+        )
+
+    def fetch_ticker_extra_analytics(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = self.fetch_ohlcv(ticker, date, offset_n_days, actual_offset_n_days)
+        return extra_analytics_from_ohlcv(df)
+
+    def fetch_ticker_analytics(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+        test_offset: Optional[bool] = False,
+    ) -> dict:
+        del test_offset
+        df = self.fetch_ohlcv(ticker, date, offset_n_days, actual_offset_n_days)
+        return analytics_from_ohlcv(df)
+
+    def fetch_ticker_base_analytics(
+        self,
+        ticker: str,
+        date: str,
+        offset_n_days: Optional[int] = 85,
+        actual_offset_n_days: Optional[int] = 50,
+    ) -> dict:
+        df = self.fetch_ohlcv_utc(ticker, date, offset_n_days, actual_offset_n_days)
+        return base_analytics_from_ohlcv_utc(df)
+
+    def resolve_session_dates(
+        self, date: str
+    ) -> tuple[Optional[str], Optional[str]]:
+        return run_sync(self.resolve_session_dates_async(date))
+
+    def fetch_ticker_universe(self, date: str) -> list[str]:
+        return run_sync(self.fetch_ticker_universe_async(date))
+
+    def fetch_ticker_universe_entries(self, date: str) -> list[UniverseEntry]:
+        return run_sync(self.fetch_ticker_universe_entries_async(date))
@@ -8,7 +8,7 @@ from utils.handle_datetimes import (
     get_past_date,
     get_today_utc_date_in_timezone,
 )
-from utils.handle_external_apis import get_quandl_tickers
+from utils.handle_external_apis import get_tickers
 
 MONGO_COLLECTION_NAME = "scrapes"
 
@@ -23,7 +23,7 @@ class MongoPipeline:
         if DATE_TO_SCRAPE
         else get_today_utc_date_in_timezone("America/New_York")
     )
-    quandl_tickers = []
+    universe_tickers = set()
 
     def __init__(self):
         self.client = pymongo.MongoClient(MONGO_URI)
@@ -36,9 +36,9 @@ class MongoPipeline:
 
         curr_date = self.date
         while True:
-            self.quandl_tickers = get_quandl_tickers(curr_date)
+            self.universe_tickers = set(get_tickers(curr_date, market="US"))
 
-            if len(self.quandl_tickers) > 0:
+            if len(self.universe_tickers) > 0:
                 break
 
             curr_date = get_past_date(1, curr_date)
@@ -57,7 +57,7 @@ class MongoPipeline:
 
         try:
             for ticker in item["tickers"]:
-                if ticker in self.quandl_tickers:
+                if ticker in self.universe_tickers:
                     self.db[MONGO_COLLECTION_NAME].update_one(
                         {
                             "ticker": ticker,
@@ -0,0 +1,67 @@
+"""
+Create the declared MongoDB indexes (db/mongo_indexes.py) once.
+
+Exits 1 when the unique analytics key is still missing; --dedupe-analytics
+first deletes all but the newest doc per (market, ticker, date), which the
+key needs when the former insert_many writer left duplicates.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+from typing import Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from db.mongo_indexes import (
+    ANALYTICS_KEY_INDEX_NAME,
+    dedupe_analytics_keys,
+    ensure_mongo_indexes,
+)
+from db.mongodb import close as close_mongo, connect as connect_mongo, db
+
+
+async def apply_mongo_indexes(dedupe_analytics: bool = False) -> int:
+    await connect_mongo()
+    try:
+        if dedupe_analytics:
+            deleted = await dedupe_analytics_keys(db.client)
+            print(f"Deleted duplicate analytics docs: {deleted}")
+        ensured = await ensure_mongo_indexes(db.client)
+    finally:
+        await close_mongo()
+    for name in ensured:
+        print(f"Index in place: {name}")
+    if ANALYTICS_KEY_INDEX_NAME not in ensured:
+        print(
+            f"ERROR: unique analytics key {ANALYTICS_KEY_INDEX_NAME} is missing;"
+            " re-run with --dedupe-analytics to drop duplicate analytics docs",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Create the declared MongoDB indexes (db/mongo_indexes.py).",
+        epilog="Required env: MONGO_URI. Optional: MONGO_DB_NAME.",
+    )
+    parser.add_argument(
+        "--dedupe-analytics",
+        action="store_true",
+        help="Keep only the newest analytics doc per (market, ticker, date) first",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return asyncio.run(apply_mongo_indexes(dedupe_analytics=args.dedupe_analytics))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -41,7 +41,7 @@ from db.crud.published_archive import (
     get_published_dates,
     upsert_artifact,
 )
-from db.crud.tracking import CRITERIA, get_analytics_frequencies, put_top_tickers
+from db.crud.tracking import CRITERIA, get_analytics_frequencies_many, put_top_tickers
 from db.mongodb import close as close_mongo
 from db.mongodb import connect as connect_mongo
 from db.mongodb import get_database as get_mongo_database
@@ -87,21 +87,26 @@ async def _patch_rows_frequencies(
     price_band: Optional[str],
     freq_cache: dict[tuple[str, Optional[str], str], str],
 ) -> None:
+    tickers = {row["ticker"] for row in rows if row.get("ticker")}
+    missing = sorted(
+        ticker for ticker in tickers if (criterion, price_band, ticker) not in freq_cache
+    )
+    if missing:
+        frequencies = await get_analytics_frequencies_many(
+            conn,
+            date,
+            criterion,
+            missing,
+            market=market,
+            price_band=price_band,
+        )
+        for ticker in missing:
+            freq_cache[(criterion, price_band, ticker)] = frequencies[ticker]
     for row in rows:
         ticker = row.get("ticker")
         if not ticker:
             continue
-        cache_key = (criterion, price_band, ticker)
-        if cache_key not in freq_cache:
-            freq_cache[cache_key] = await get_analytics_frequencies(
-                conn,
-                date,
-                criterion,
-                ticker,
-                market=market,
-                price_band=price_band,
-            )
-        row["frequencies"] = freq_cache[cache_key]
+        row["frequencies"] = freq_cache[(criterion, price_band, ticker)]
 
 
 async def patch_day_frequencies(conn, pool, date: str, market: str = "US") -> int:
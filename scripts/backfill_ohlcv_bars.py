@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Bulk-fill the OHLCV bar store from grouped daily bars.
+
+Requests one whole-market grouped response per missing session and merges
+the bars into ``ohlcv_bars`` with COPY batches. Sessions already recorded in
+``ohlcv_grouped_sessions`` are skipped, so reruns are cheap.
+
+Required env:
+  DATABASE_URL      PostgreSQL DSN for the bar store
+  POLYGON_API_KEY   US grouped daily bars
+
+Examples:
+  python scripts/backfill_ohlcv_bars.py --market US
+  python scripts/backfill_ohlcv_bars.py --market US --date 2024-06-03 --days 155
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.markets import MARKETS, normalize_market
+from core.settings import OHLCV_LOOKBACK_BUFFER_DAYS
+from db.ohlcv_sync import close_ohlcv_sync_pool
+from providers import get_market_data_provider
+from utils.handle_datetimes import get_today_utc_date_in_timezone
+from utils.handle_validation import validate_date_string
+
+
+def run_backfill(market: str, date: str, days: int) -> dict:
+    market = normalize_market(market)
+    provider = get_market_data_provider(market)
+    if not getattr(provider, "supports_grouped_daily", False):
+        raise SystemExit(f"market {market} has no grouped daily endpoint")
+    try:
+        return provider.sync_grouped_window(date, days)
+    finally:
+        close_ohlcv_sync_pool()
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Bulk-fill OHLCV bar store")
+    parser.add_argument("--market", default="US", help="Market code (default: US)")
+    parser.add_argument(
+        "--date",
+        help="Window end date YYYY-MM-DD (default: today in market timezone)",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=OHLCV_LOOKBACK_BUFFER_DAYS,
+        help=f"Calendar days to cover (default: {OHLCV_LOOKBACK_BUFFER_DAYS})",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    market_code = normalize_market(args.market)
+    end_date = args.date or get_today_utc_date_in_timezone(
+        MARKETS[market_code]["timezone"]
+    )
+    validate_date_string(end_date)
+    summary = run_backfill(market_code, end_date, args.days)
+    print(f"backfill_ohlcv_bars: {market_code} through {end_date}: {summary}")
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+End-to-end cron throughput benchmark.
+
+Runs ``run_crud_ops`` (ingest -> track -> publish) for one market session
+against the local Mongo/Postgres/Redis of docker-compose.test.yml, with the
+market served by a synthetic replay universe (providers/replay.py) and the
+US market-wide quotes (SP500/VIX) stubbed, so no vendor is called.
+
+Reports tickers/s per phase (phase seconds are wall time from the first
+start to the last end of that phase), end-to-end tickers/s, peak RSS and DB
+round trips, writes them as JSON and optionally compares them with a stored
+baseline; a regression beyond ``--tolerance`` exits with status 1.
+
+    python scripts/benchmark_cron.py --tickers 5000 --out bench.json \
+        --baseline benchmarks/cron_5000.json
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from pymongo import monitoring  # noqa: E402
+
+import core.settings as settings  # noqa: E402
+import cronjob  # noqa: E402
+import services.analytics_service as analytics_service  # noqa: E402
+from db.crud.mongo_storage import prune_mongo_session_date  # noqa: E402
+from db.crud.ticker_skips import clear_skipped_tickers  # noqa: E402
+from db.postgres import normalize_database_url  # noqa: E402
+from providers import set_market_data_provider  # noqa: E402
+from providers.replay import ReplayProvider, synthetic_replay_dataset  # noqa: E402
+from services.compute_pool import shutdown_compute_pool  # noqa: E402
+from services.cron_runtime import open_cron_runtime  # noqa: E402
+from utils.handle_datetimes import get_past_date  # noqa: E402
+from utils.handle_external_apis import clear_ticker_universe_cache  # noqa: E402
+
+BENCHMARK_NAME = "cron_e2e"
+DEFAULT_TOLERANCE = 0.2
+# phase -> span counter holding the tickers it handled
+TICKER_COUNTERS = ("tickers", "rows_written", "rows")
+
+
+class MongoCommandCounter(monitoring.CommandListener):
+    """Counts Mongo commands (round trips) by name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def started(self, event):
+        with self._lock:
+            self.counts[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def phase_throughput(spans: list[dict], tickers: int) -> dict:
+    """
+    Phase -> seconds, tickers handled and tickers/s, summed over spans.
+    Phases without a ticker counter (track) are credited with ``tickers``.
+    """
+    phases: dict = {}
+    for span in spans:
+        phase = phases.setdefault(span["phase"], {"seconds": 0.0, "tickers": 0})
+        phase["seconds"] += span["seconds"]
+        counts = span.get("counts") or {}
+        handled = next((counts[key] for key in TICKER_COUNTERS if key in counts), None)
+        phase["tickers"] += tickers if handled is None else handled
+    for phase in phases.values():
+        seconds = phase["seconds"]
+        phase["tickers_per_second"] = phase["tickers"] / seconds if seconds > 0 else None
+    return phases
+
+
+def compare_with_baseline(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Regressions of ``result`` against ``baseline``: throughput (overall and
+    per phase) lower, or peak RSS / DB round trips higher, by more than
+    ``tolerance`` (a fraction).
+    """
+    regressions = []
+
+    def slower(label: str, current, previous) -> None:
+        if current is None or not previous:
+            return
+        if current < previous * (1 - tolerance):
+            regressions.append(
+                f"{label}: {round(current, 2)} tickers/s vs baseline {round(previous, 2)}"
+            )
+
+    def larger(label: str, current, previous) -> None:
+        if current is None or not previous:
+            return
+        if current > previous * (1 + tolerance):
+            regressions.append(f"{label}: {current} vs baseline {previous}")
+
+    slower("overall", result.get("tickers_per_second"), baseline.get("tickers_per_second"))
+    for phase, stats in (baseline.get("phases") or {}).items():
+        current = (result.get("phases") or {}).get(phase)
+        if current is not None:
+            slower(
+                f"phase {phase}",
+                current.get("tickers_per_second"),
+                stats.get("tickers_per_second"),
+            )
+    larger("peak_rss_mb", result.get("peak_rss_mb"), baseline.get("peak_rss_mb"))
+    for store, count in (baseline.get("db_round_trips") or {}).items():
+        larger(
+            f"{store} round trips",
+            (result.get("db_round_trips") or {}).get(store),
+            count,
+        )
+    return regressions
+
+
+def _peak_rss_mb() -> tuple[float, float]:
+    """Peak RSS of this process and of its largest child (compute pool), in MB."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return own / scale, children / scale
+
+
+async def _pg_transactions() -> Optional[int]:
+    """Committed + rolled back transactions of the database (all clients)."""
+    import asyncpg
+
+    if not settings.DATABASE_URL:
+        return None
+    conn = await asyncpg.connect(normalize_database_url(settings.DATABASE_URL))
+    try:
+        return await conn.fetchval(
+            """
+            SELECT xact_commit + xact_rollback
+            FROM pg_stat_database
+            WHERE datname = current_database()
+            """
+        )
+    finally:
+        await conn.close()
+
+
+def _redis_commands() -> Optional[int]:
+    from db.redis import RedisCache, db as redis_db
+
+    if redis_db.client is None:
+        RedisCache().connect()
+    try:
+        return int(redis_db.client.info("stats")["total_commands_processed"])
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"scripts/benchmark_cron.py _redis_commands: {exc}")
+        return None
+
+
+def _offline_market(market: str, dataset_dir: Path) -> None:
+    """Serve ``market`` from the replay dataset and keep the run off the network."""
+    set_market_data_provider(market, ReplayProvider(market, dataset_dir))
+    analytics_service.get_market_sp500 = lambda date: 5000.0
+    analytics_service.get_market_vixs = lambda date: {
+        "VIX": 13.2,
+        "VIX1": 14.1,
+        "VIX2": 15.0,
+        "VIX_50days_EMA": 16.5,
+    }
+    cronjob.notify_developer = lambda **kwargs: None
+    # every run starts from the same replay universe and an empty skip list
+    settings.TICKER_UNIVERSE_STORE_DISABLED = True
+    settings.OHLCV_GROUPED_INGEST = False
+
+
+async def run_benchmark(
+    n_tickers: int,
+    market: str = "US",
+    date: str = "2024-06-03",
+    dataset_dir: Optional[str] = None,
+    bar_store: bool = False,
+    seed: int = 0,
+) -> dict:
+    """Run one session end to end and return the result document."""
+    market = market.upper()
+    root = Path(dataset_dir or tempfile.mkdtemp(prefix="replay-"))
+    if not (root / market / "manifest.json").exists():
+        synthetic_replay_dataset(
+            root,
+            market,
+            n_tickers,
+            date,
+            seed=seed,
+            extra_tickers=[settings.PROBE_TICKER_US if market == "US" else settings.PROBE_TICKER_TO],
+        )
+    _offline_market(market, root)
+    settings.OHLCV_CACHE_DISABLED = not bar_store
+    clear_ticker_universe_cache()
+
+    commands = MongoCommandCounter()
+    report = cronjob.CronRunReport()
+    pg_before = await _pg_transactions()
+    redis_before = _redis_commands()
+    try:
+        async with open_cron_runtime(1, mongo_listeners=[commands]) as runtime:
+            await prune_mongo_session_date(runtime.mongo, date, market)
+            await asyncio.to_thread(clear_skipped_tickers, market, date)
+            commands.reset()
+            started = perf_counter()
+            await cronjob.run_crud_ops(
+                date,
+                get_past_date(settings.MONGO_HOT_WINDOW_DAYS, date),
+                market,
+                report=report,
+                runtime=runtime,
+            )
+            wall_seconds = perf_counter() - started
+            report.record_resource_stats(runtime.utilisation())
+    finally:
+        shutdown_compute_pool()
+    # closed backends have flushed their statistics by now
+    await asyncio.sleep(1)
+    pg_after = await _pg_transactions()
+    redis_after = _redis_commands()
+
+    spans = [
+        {"phase": span.phase, "seconds": span.seconds, "counts": span.counts}
+        for span in report.spans
+    ]
+    universe = next(
+        (span["counts"].get("tickers", 0) for span in spans if span["phase"] == "universe"),
+        n_tickers,
+    )
+    peak_rss, children_rss = _peak_rss_mb()
+    mongo_commands = commands.snapshot()
+    return {
+        "benchmark": BENCHMARK_NAME,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "market": market,
+        "date": date,
+        "tickers": n_tickers,
+        "universe_tickers": universe,
+        "bar_store": bar_store,
+        "wall_seconds": wall_seconds,
+        "tickers_per_second": universe / wall_seconds if wall_seconds > 0 else None,
+        "phases": phase_throughput(spans, universe),
+        "peak_rss_mb": round(peak_rss, 1),
+        "children_peak_rss_mb": round(children_rss, 1),
+        "db_round_trips": {
+            "mongo": sum(mongo_commands.values()),
+            # transactions also count the two stat reads and pool warm-up
+            "postgres": None if pg_before is None else pg_after - pg_before,
+            "redis": None if redis_before is None else redis_after - redis_before - 1,
+        },
+        "mongo_commands": mongo_commands,
+        "resource_stats": report.resource_stats,
+        "phase_errors": [
+            {"phase": item.phase, "error": item.error} for item in report.errors
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the cron path end to end")
+    parser.add_argument(
+        "--tickers", type=int, default=1000, help="Synthetic universe size (e.g. 1000, 5000, 10000)"
+    )
+    parser.add_argument("--market", default="US", help="Market code (default: US)")
+    parser.add_argument("--date", default="2024-06-03", help="Session date (YYYY-MM-DD)")
+    parser.add_argument("--dataset-dir", help="Reuse (or create) a replay dataset here")
+    parser.add_argument(
+        "--bar-store",
+        action="store_true",
+        help="Keep the Postgres OHLCV bar store on (write-through, later runs read it)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Result file (default: cron_benchmark_<tickers>.json)")
+    parser.add_argument("--baseline", help="Baseline result file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative regression before failing (default: 0.2)",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Also write the result to --baseline"
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run_benchmark(
+            args.tickers,
+            market=args.market,
+            date=args.date,
+            dataset_dir=args.dataset_dir,
+            bar_store=args.bar_store,
+            seed=args.seed,
+        )
+    )
+    out = Path(args.out or f"cron_benchmark_{args.tickers}.json")
+    out.write_text(json.dumps(result, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"wrote {out}")
+    for phase, stats in sorted(result["phases"].items()):
+        rate = stats["tickers_per_second"]
+        print(
+            f"  {phase}: {round(stats['seconds'], 2)}s,"
+            f" {'n/a' if rate is None else round(rate, 1)} tickers/s"
+        )
+    print(
+        f"  overall: {round(result['tickers_per_second'] or 0, 1)} tickers/s,"
+        f" peak RSS {result['peak_rss_mb']} MB, round trips {result['db_round_trips']}"
+    )
+
+    if not args.baseline:
+        return
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, indent=2, sort_keys=True), encoding="utf-8")
+        print(f"saved baseline {baseline_path}")
+        return
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = compare_with_baseline(result, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Build a replay dataset for providers/replay.py.
+
+Either converts recorded Polygon aggregate JSON (tests/fixtures/ohlcv, as
+written by scripts/capture_ohlcv_fixtures.py) or generates a synthetic
+universe of N tickers. Point MARKET_DATA_REPLAY_DIR at the output to run the
+cron offline.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.settings import PROBE_TICKER_TO, PROBE_TICKER_US  # noqa: E402
+from providers.replay import synthetic_replay_dataset, write_replay_dataset  # noqa: E402
+
+FIXTURES_DIR = PROJECT_ROOT / "tests" / "fixtures" / "ohlcv"
+PROBE_TICKERS = {"US": PROBE_TICKER_US, "TO": PROBE_TICKER_TO}
+
+
+def dataset_from_polygon_payloads(root, market: str, payloads: dict) -> Path:
+    """Align ticker -> Polygon aggs payload on the union of their sessions."""
+    bars = {}
+    for ticker, payload in payloads.items():
+        rows = payload.get("results") or []
+        bars[ticker.upper()] = {
+            np.datetime64(int(row["t"]), "ms").astype("datetime64[D]"): row for row in rows
+        }
+    session_date = np.array(
+        sorted({day for rows in bars.values() for day in rows}), dtype="datetime64[D]"
+    )
+    tickers = sorted(bars)
+    shape = (len(tickers), len(session_date))
+    columns = {name: np.full(shape, np.nan) for name in ("open", "high", "low", "close")}
+    columns["volume"] = np.zeros(shape, dtype=np.int64)
+    position = {day: col for col, day in enumerate(session_date)}
+    for row_index, ticker in enumerate(tickers):
+        for day, row in bars[ticker].items():
+            col = position[day]
+            columns["open"][row_index, col] = row["o"]
+            columns["high"][row_index, col] = row["h"]
+            columns["low"][row_index, col] = row["l"]
+            columns["close"][row_index, col] = row["c"]
+            columns["volume"][row_index, col] = int(row["v"])
+    return write_replay_dataset(root, market, tickers, session_date, columns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build a replay market data dataset")
+    parser.add_argument("--out", required=True, help="Dataset root directory")
+    parser.add_argument("--market", default="US", help="Market code (default: US)")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="Generate N synthetic tickers instead of converting fixtures",
+    )
+    parser.add_argument("--end-date", default="2024-06-03", help="Last session (YYYY-MM-DD)")
+    parser.add_argument("--sessions", type=int, default=120, help="Synthetic history length")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    market = args.market.upper()
+
+    if args.synthetic:
+        market_dir = synthetic_replay_dataset(
+            args.out,
+            market,
+            args.synthetic,
+            args.end_date,
+            n_sessions=args.sessions,
+            seed=args.seed,
+            extra_tickers=[PROBE_TICKERS.get(market, "SPY")],
+        )
+    else:
+        payloads = {
+            path.stem: json.loads(path.read_text(encoding="utf-8"))
+            for path in sorted(FIXTURES_DIR.glob("*.json"))
+        }
+        market_dir = dataset_from_polygon_payloads(args.out, market, payloads)
+    print(f"market={market} wrote replay dataset to {market_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -141,15 +141,11 @@ def fetch_polygon_payload(ticker: str, end_date: str) -> dict:
     return synthetic_polygon_payload(ticker, end_date)
 
 
-def mock_get(url, *args, **kwargs):
+async def mock_get_json(url, *args, **kwargs):
     for ticker in CALC_TICKERS:
         polygon_symbol = POLYGON_SYMBOL_ALIASES.get(ticker.upper(), ticker.upper())
         if f"/ticker/{polygon_symbol}/" in url or f"/ticker/{ticker.upper()}/" in url:
-            payload = json.loads((OHLCV_DIR / f"{ticker}.json").read_text())
-            mock_response = requests.Response()
-            mock_response.status_code = 200
-            mock_response._content = json.dumps(payload).encode("utf-8")
-            return mock_response
+            return json.loads((OHLCV_DIR / f"{ticker}.json").read_text())
     raise AssertionError(f"unexpected URL in tests: {url}")
 
 
@@ -180,7 +176,7 @@ def main() -> None:
             json.dumps(payload, indent=2), encoding="utf-8"
         )
 
-    with patch("providers.polygon_us.requests.get", side_effect=mock_get):
+    with patch("providers.polygon_us.get_json", side_effect=mock_get_json):
         for ticker in tickers:
             golden = build_golden(ticker)
             (GOLDEN_DIR / f"{ticker.lower()}_{FIXTURE_DATE}.json").write_text(
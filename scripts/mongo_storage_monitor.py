@@ -35,7 +35,7 @@ async def run_monitor(check_only: bool = False, manage_connections: bool = True)
     """
     if manage_connections:
         await connect_postgres()
-    await connect_mongo()
+        await connect_mongo()
     pool = await get_postgres_pool()
     conn = await get_mongo_database()
     try:
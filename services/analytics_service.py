@@ -1,7 +1,6 @@
 """Analytics orchestration — routes and cron delegate here."""
 
 import asyncio
-from functools import partial
 from typing import Optional
 
 from db.mongodb import AsyncIOMotorClient
@@ -9,10 +8,10 @@ from db.crud.analytics import (
     get_analytics_sorted_by as crud_get_analytics_sorted_by,
     get_missing_tickers,
     get_normalazied_cvi_slope,
-    insert_analytics_batch,
+    upsert_analytics_batch,
 )
 from db.crud.scrapes import get_mentions
-from db.crud.tracking import get_analytics_frequencies
+from db.crud.tracking import get_analytics_frequencies_many
 from db.postgres import get_pool as get_postgres_pool
 from core.markets import DEFAULT_MARKET, normalize_market
 from utils.handle_datetimes import get_last_quater_date, get_date_string
@@ -24,9 +23,23 @@ from utils.handle_external_apis import (
     get_ticker_analytics as external_get_ticker_analytics,
     get_ticker_extra_analytics as external_get_ticker_extra_analytics,
     get_ticker_base_analytics as external_get_ticker_base_analytics,
+    get_ticker_ohlcv_window_arrays_async as external_get_ticker_ohlcv_window_arrays_async,
     get_tickers as external_get_tickers,
+    load_cached_ohlcv_window_arrays as external_load_cached_ohlcv_window_arrays,
+    supports_ohlcv_window_arrays as external_supports_ohlcv_window_arrays,
+    sync_grouped_daily_bars as external_sync_grouped_daily_bars,
 )
 import services.read_router as read_router
+from db.crud.ticker_skips import (
+    SKIP_DATE_MISMATCH,
+    SKIP_NOT_ENOUGH_BARS,
+    fetch_skipped_tickers,
+    record_skipped_tickers,
+)
+from providers.http_transport import count_http_requests
+from services.compute_pool import compute_base_analytics_in_pool
+from services.indicator_state import save_window_states, update_indicator_states
+from services.stage_timings import StageTimings
 
 
 def _to_stub_mentions() -> dict:
@@ -44,6 +57,11 @@ async def _get_postgres_pool_or_none():
         return None
 
 
+async def _as_is(conn: AsyncIOMotorClient, base_row: dict, criterion: str, **kwargs) -> dict:
+    del conn, criterion, kwargs
+    return base_row
+
+
 async def enrich_ticker_row(
     conn: AsyncIOMotorClient,
     base_row: dict,
@@ -51,10 +69,18 @@ async def enrich_ticker_row(
     market: str = DEFAULT_MARKET,
     include_mentions: bool = True,
     price_band: Optional[str] = None,
+    frequencies: Optional[str] = None,
 ) -> dict:
+    """``frequencies`` is read from tracking when not given (batched by callers)."""
     market = normalize_market(market)
     ticker = base_row["ticker"]
     date = get_date_string(base_row["date"])
+    if frequencies is None:
+        frequencies = (
+            await get_analytics_frequencies_many(
+                conn, date, criterion, [ticker], market=market, price_band=price_band
+            )
+        )[ticker]
 
     if market == "US":
         mentions = (
@@ -67,9 +93,7 @@ async def enrich_ticker_row(
             **external_get_ticker_extra_analytics(ticker, date, market=market),
             **mentions,
             "fcf": get_quarterly_free_cash_flow_polygon(ticker, get_last_quater_date(date)),
-            "frequencies": await get_analytics_frequencies(
-                conn, date, criterion, ticker, market=market, price_band=price_band
-            ),
+            "frequencies": frequencies,
         }
 
     return {
@@ -77,9 +101,7 @@ async def enrich_ticker_row(
         **external_get_ticker_extra_analytics(ticker, date, market=market),
         **_to_stub_mentions(),
         "fcf": "",
-        "frequencies": await get_analytics_frequencies(
-            conn, date, criterion, ticker, market=market, price_band=price_band
-        ),
+        "frequencies": frequencies,
     }
 
 
@@ -117,6 +139,9 @@ async def get_ticker_analytics_response_hot(
 ) -> dict:
     market = normalize_market(market)
     last_quater_limit_date = get_last_quater_date(date)
+    frequencies = (
+        await get_analytics_frequencies_many(conn, date, criterion, [ticker], market=market)
+    )[ticker]
 
     if market == "US":
         mentions = (
@@ -128,18 +153,14 @@ async def get_ticker_analytics_response_hot(
             **external_get_ticker_analytics(ticker, date, 45, 15, market=market),
             **mentions,
             "fcf": get_quarterly_free_cash_flow_polygon(ticker, last_quater_limit_date),
-            "frequencies": await get_analytics_frequencies(
-                conn, date, criterion, ticker, market=market
-            ),
+            "frequencies": frequencies,
         }
 
     return {
         **external_get_ticker_analytics(ticker, date, 45, 15, market=market),
         **_to_stub_mentions(),
         "fcf": "",
-        "frequencies": await get_analytics_frequencies(
-            conn, date, criterion, ticker, market=market
-        ),
+        "frequencies": frequencies,
     }
 
 
@@ -226,22 +247,40 @@ async def get_analytics_sorted_by_hot(
     if price_band is not None:
         min_close, max_close = resolve_price_band(price_band)
         include_close = True
-    enrich_fn = partial(
-        enrich_ticker_row,
-        include_mentions=include_mentions,
-        price_band=price_band,
-    )
-    return await crud_get_analytics_sorted_by(
+    rows = await crud_get_analytics_sorted_by(
         conn,
         date,
         criterion,
         lim,
         market=market,
-        enrich_fn=enrich_fn,
+        enrich_fn=_as_is,
         min_close=min_close,
         max_close=max_close,
         include_close=include_close,
     )
+    # one tracking read for the whole list instead of one per row
+    frequencies = await get_analytics_frequencies_many(
+        conn,
+        date,
+        criterion,
+        [row["ticker"] for row in rows],
+        market=market,
+        price_band=price_band,
+    )
+    return await asyncio.gather(
+        *[
+            enrich_ticker_row(
+                conn,
+                row,
+                criterion,
+                market=market,
+                include_mentions=include_mentions,
+                price_band=price_band,
+                frequencies=frequencies[row["ticker"]],
+            )
+            for row in rows
+        ]
+    )
 
 
 async def get_analytics_lists_by_criteria(
@@ -358,12 +397,10 @@ async def get_frequencies_for_tickers(
     market: str = DEFAULT_MARKET,
 ) -> list:
     market = normalize_market(market)
-    frequencies = []
-    for ticker in tickers:
-        frequencies.append(
-            await get_analytics_frequencies(conn, date, criterion, ticker, market=market)
-        )
-    return frequencies
+    frequencies = await get_analytics_frequencies_many(
+        conn, date, criterion, tickers, market=market
+    )
+    return [frequencies[ticker] for ticker in tickers]
 
 
 def get_free_cash_flow(ticker: str, date: str, market: str = DEFAULT_MARKET):
@@ -374,16 +411,83 @@ def get_free_cash_flow(ticker: str, date: str, market: str = DEFAULT_MARKET):
     return get_quarterly_free_cash_flow_polygon(ticker, last_quater_limit_date)
 
 
+async def _run_ingest_stages(tasks: list) -> None:
+    """Wait for all pipeline stages; the first failure cancels the rest."""
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
 async def ingest_base_analytics_for_market(
-    conn: AsyncIOMotorClient, date: str, market: str = DEFAULT_MARKET
+    conn: AsyncIOMotorClient,
+    date: str,
+    market: str = DEFAULT_MARKET,
+    timings: Optional[StageTimings] = None,
+    retry_skipped: Optional[bool] = None,
 ) -> str:
-    from core.settings import CRON_INSERT_BATCH_SIZE, CRON_MAX_WORKERS
+    """
+    Compute and insert base analytics for every ticker missing on ``date``.
+
+    Streaming pipeline with bounded queues between the stages:
+    bar-store load / per-ticker fetch (throttled async HTTP) -> compute (process pool)
+    -> insert. Every CRON_INSERT_BATCH_SIZE rows are upserted on (market,
+    ticker, date) as soon as the batch fills, up to CRON_INSERT_CONCURRENCY
+    batches at once, so memory stays flat, a failure only loses the batches
+    in flight and re-running a date rewrites instead of duplicating. Wall
+    time and counts (tickers, HTTP calls, cache hits, rows written) per stage
+    are accumulated on ``timings`` when given.
+
+    Tickers that produced no analytics for the session before (too few bars,
+    date mismatch) are skipped unless ``retry_skipped`` (default:
+    CRON_RETRY_SKIPPED_TICKERS); new ones are recorded as the run goes.
+
+    With the bar store on, tickers whose indicator state ends on the prior
+    session are updated from today's bar alone and go straight to insert;
+    windows computed by the full path store a fresh state.
+    """
+    from core.settings import (
+        CRON_COMPUTE_CHUNK_SIZE,
+        CRON_CPU_WORKERS,
+        CRON_INSERT_BATCH_SIZE,
+        CRON_INSERT_CONCURRENCY,
+        CRON_MAX_WORKERS,
+        CRON_RETRY_SKIPPED_TICKERS,
+        INDICATOR_STATE_DISABLED,
+        OHLCV_CACHE_DISABLED,
+        OHLCV_GROUPED_INGEST,
+        PROVIDER_MAX_CONCURRENCY,
+        TICKER_SKIP_CACHE_DISABLED,
+        TICKER_SKIP_MISMATCH_RETRY_MINUTES,
+    )
     from utils.handle_datetimes import bar_date_to_string, get_epoch
 
+    timings = timings if timings is not None else StageTimings()
+    retry_skipped = CRON_RETRY_SKIPPED_TICKERS if retry_skipped is None else retry_skipped
     market = normalize_market(market)
-    tickers_to_insert = await get_missing_tickers(conn, date, market=market)
-    n_tickers = len(tickers_to_insert)
     msg = []
+    with timings.stage("universe"):
+        tickers_to_insert = await get_missing_tickers(conn, date, market=market)
+        n_missing = len(tickers_to_insert)
+        if tickers_to_insert and not TICKER_SKIP_CACHE_DISABLED and not retry_skipped:
+            known_skips = await asyncio.to_thread(
+                fetch_skipped_tickers, market, date, TICKER_SKIP_MISMATCH_RETRY_MINUTES
+            )
+            tickers_to_insert = [t for t in tickers_to_insert if t not in known_skips]
+            if len(tickers_to_insert) < n_missing:
+                msg.append(
+                    f"services/analytics_service: skipped {n_missing - len(tickers_to_insert)} tickers"
+                    f" without usable data for {market} on {date} (negative cache)"
+                )
+    n_tickers = len(tickers_to_insert)
+    timings.count("universe", "tickers", n_tickers)
+    timings.count("universe", "skipped", n_missing - n_tickers)
 
     if not tickers_to_insert:
         msg.append(
@@ -398,49 +502,271 @@ async def ingest_base_analytics_for_market(
         f" (epoch {get_epoch(date)})"
     )
 
-    sem = asyncio.Semaphore(CRON_MAX_WORKERS)
-
-    async def process_ticker(ticker: str):
-        async with sem:
+    if OHLCV_GROUPED_INGEST:
+        with timings.stage("grouped_sync"):
             try:
-                return await asyncio.to_thread(
-                    external_get_ticker_base_analytics,
-                    ticker,
-                    date,
-                    market=market,
+                grouped = await asyncio.to_thread(
+                    external_sync_grouped_daily_bars, date, market=market
                 )
+                timings.count("grouped_sync", "http_calls", grouped["requests"])
+                timings.count("grouped_sync", "rows_written", grouped["bars"])
+                if grouped["requests"]:
+                    msg.append(
+                        "services/analytics_service: grouped daily sync"
+                        f" requests={grouped['requests']},"
+                        f" sessions={grouped['sessions']}, bars={grouped['bars']}"
+                    )
             except Exception as e:  # pylint: disable=broad-except
                 print(
-                    f"services/analytics_service: failed {ticker} for {market} on {date}: {e}"
+                    f"services/analytics_service: grouped daily sync failed for {market} on {date}: {e}"
                 )
-                return None
 
-    results = await asyncio.gather(
-        *[process_ticker(t) for t in tickers_to_insert], return_exceptions=False
+    # tickers whose state ends on the prior session need only today's bar
+    use_state = not INDICATOR_STATE_DISABLED and not OHLCV_CACHE_DISABLED
+    state_analytics: dict = {}
+    if use_state:
+        with timings.stage("state_update"):
+            try:
+                state_analytics = await asyncio.to_thread(
+                    update_indicator_states, market, date, tickers_to_insert
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                print(
+                    f"services/analytics_service: indicator state update failed for {market} on {date}: {e}"
+                )
+        timings.count("state_update", "tickers", len(state_analytics))
+        if state_analytics:
+            msg.append(
+                f"services/analytics_service: {len(state_analytics)} tickers"
+                " updated from indicator state"
+            )
+    window_tickers = [t for t in tickers_to_insert if t not in state_analytics]
+
+    chunk_size = max(CRON_COMPUTE_CHUNK_SIZE, 1)
+    fetch_arrays = external_supports_ohlcv_window_arrays(market)
+    # async fetches are admitted by the provider throttle's adaptive in-flight
+    # limit, so enough fetchers run to reach its ceiling; threads stay fixed
+    n_fetchers = max(
+        PROVIDER_MAX_CONCURRENCY if fetch_arrays else CRON_MAX_WORKERS, 1
     )
+    n_computers = max(CRON_CPU_WORKERS, 1)
+    # bounded queues: producers wait while the next stage is behind
+    fetch_queue: asyncio.Queue = asyncio.Queue(maxsize=n_fetchers * 2)
+    compute_queue: asyncio.Queue = asyncio.Queue(maxsize=n_computers * 2)
+    insert_queue: asyncio.Queue = asyncio.Queue(maxsize=n_computers * 2)
+    counts = {
+        "loaded": 0,
+        "computed": 0,
+        "inserted": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "batches": 0,
+    }
+    new_skips: dict = {}
+    open_stages = {"fetch": n_fetchers, "compute": n_computers}
+    fetched_windows: dict = {}
+
+    async def load_stage():
+        # bar-store windows per chunk go straight to compute, the rest to fetch
+        if state_analytics:
+            await insert_queue.put(list(state_analytics.items()))
+        for start in range(0, len(window_tickers), chunk_size):
+            chunk = window_tickers[start : start + chunk_size]
+            with timings.stage("bar_load"):
+                try:
+                    windows = await asyncio.to_thread(
+                        external_load_cached_ohlcv_window_arrays,
+                        chunk,
+                        date,
+                        market=market,
+                    )
+                except Exception as e:  # pylint: disable=broad-except
+                    print(
+                        f"services/analytics_service: bulk bar load failed for {market} on {date}: {e}"
+                    )
+                    windows = {}
+            counts["loaded"] += len(windows)
+            timings.count("bar_load", "tickers", len(chunk))
+            timings.count("bar_load", "cache_hits", len(windows))
+            if windows:
+                await compute_queue.put(windows)
+            for ticker in chunk:
+                if ticker not in windows:
+                    await fetch_queue.put(ticker)
+        for _ in range(n_fetchers):
+            await fetch_queue.put(None)
+
+    async def fetch_stage():
+        # providers without raw windows compute per ticker instead
+        while True:
+            ticker = await fetch_queue.get()
+            if ticker is None:
+                break
+            with timings.stage("fetch"), count_http_requests() as http:
+                try:
+                    if fetch_arrays:
+                        arrays = await external_get_ticker_ohlcv_window_arrays_async(
+                            ticker, date, market=market
+                        )
+                    else:
+                        analytics = await asyncio.to_thread(
+                            external_get_ticker_base_analytics,
+                            ticker,
+                            date,
+                            market=market,
+                        )
+                except Exception as e:  # pylint: disable=broad-except
+                    print(
+                        f"services/analytics_service: failed {ticker} for {market} on {date}: {e}"
+                    )
+                    timings.count("fetch", "failed")
+                    continue
+                finally:
+                    timings.count("fetch", "tickers")
+                    timings.count("fetch", "http_calls", http.requests)
+            if not http.requests:
+                # served by the provider's bar cache
+                timings.count("fetch", "cache_hits")
+            if not fetch_arrays:
+                await insert_queue.put([(ticker, analytics)])
+            elif arrays is None:
+                new_skips[ticker] = SKIP_NOT_ENOUGH_BARS
+            else:
+                fetched_windows[ticker] = arrays
+                if len(fetched_windows) >= chunk_size:
+                    windows = dict(fetched_windows)
+                    fetched_windows.clear()
+                    await compute_queue.put(windows)
+
+        open_stages["fetch"] -= 1
+        if open_stages["fetch"] == 0:
+            if fetched_windows:
+                await compute_queue.put(dict(fetched_windows))
+                fetched_windows.clear()
+            for _ in range(n_computers):
+                await compute_queue.put(None)
+
+    async def compute_stage():
+        while True:
+            windows = await compute_queue.get()
+            if windows is None:
+                break
+            with timings.stage("compute"):
+                analytics = await compute_base_analytics_in_pool(windows)
+            timings.count("compute", "tickers", len(windows))
+            timings.count("compute", "rows", len(analytics))
+            if use_state:
+                with timings.stage("state_save"):
+                    try:
+                        saved = await asyncio.to_thread(save_window_states, market, windows)
+                    except Exception as e:  # pylint: disable=broad-except
+                        print(
+                            f"services/analytics_service: indicator state save failed for {market} on {date}: {e}"
+                        )
+                        saved = 0
+                timings.count("state_save", "rows_written", saved)
+            await insert_queue.put(list(analytics.items()))
+
+        open_stages["compute"] -= 1
+        if open_stages["compute"] == 0:
+            await insert_queue.put(None)
+
+    async def insert_stage():
+        batch = []
+        # flushes overlap on the Motor pool, at most CRON_INSERT_CONCURRENCY at once
+        slots = asyncio.Semaphore(max(CRON_INSERT_CONCURRENCY, 1))
+        writes = []
+
+        async def write(rows):
+            try:
+                with timings.stage("insert"):
+                    result = await upsert_analytics_batch(
+                        conn, rows, batch_size=CRON_INSERT_BATCH_SIZE
+                    )
+            finally:
+                slots.release()
+            counts["inserted"] += result.inserted
+            counts["updated"] += result.updated
+            counts["unchanged"] += result.unchanged
+            timings.count("insert", "rows_written", result.written)
+            timings.count("insert", "updated", result.updated)
+            timings.count("insert", "unchanged", result.unchanged)
+
+        async def flush():
+            for task in writes:
+                if task.done() and task.exception() is not None:
+                    raise task.exception()
+            await slots.acquire()
+            writes.append(asyncio.create_task(write(list(batch))))
+            counts["batches"] += 1
+            batch.clear()
+
+        try:
+            while True:
+                items = await insert_queue.get()
+                if items is None:
+                    break
+                for ticker, ticker_base_analytics in items:
+                    if not ticker_base_analytics:
+                        new_skips[ticker] = SKIP_NOT_ENOUGH_BARS
+                        continue
+                    date_str = bar_date_to_string(ticker_base_analytics["date"])
+                    if date_str != date:
+                        new_skips[ticker] = SKIP_DATE_MISMATCH
+                        msg.append(
+                            f"services/analytics_service: skipped {ticker} — "
+                            f"date mismatch {date_str} vs {date}"
+                        )
+                        continue
+                    ticker_base_analytics["market"] = market
+                    batch.append(ticker_base_analytics)
+                    counts["computed"] += 1
+                    if len(batch) >= CRON_INSERT_BATCH_SIZE:
+                        await flush()
+            if batch:
+                await flush()
+            await asyncio.gather(*writes)
+        finally:
+            for task in writes:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*writes, return_exceptions=True)
 
-    analytics_to_insert = []
-    for ticker, ticker_base_analytics in zip(tickers_to_insert, results):
-        if not ticker_base_analytics:
-            continue
-        date_str = bar_date_to_string(ticker_base_analytics["date"])
-        if date_str != date:
-            msg.append(
-                f"services/analytics_service: skipped {ticker} — "
-                f"date mismatch {date_str} vs {date}"
+    try:
+        with timings.stage("pipeline"):
+            await _run_ingest_stages(
+                [
+                    asyncio.create_task(load_stage()),
+                    *[asyncio.create_task(fetch_stage()) for _ in range(n_fetchers)],
+                    *[asyncio.create_task(compute_stage()) for _ in range(n_computers)],
+                    asyncio.create_task(insert_stage()),
+                ]
+            )
+    finally:
+        # keep what was learned even when a later batch fails
+        if new_skips and not TICKER_SKIP_CACHE_DISABLED:
+            recorded = await asyncio.to_thread(
+                record_skipped_tickers, market, date, new_skips
             )
-            continue
-        ticker_base_analytics["market"] = market
-        analytics_to_insert.append(ticker_base_analytics)
+            if recorded:
+                msg.append(
+                    f"services/analytics_service: recorded {recorded} tickers"
+                    " without usable data in the negative cache"
+                )
 
+    if counts["loaded"]:
+        msg.append(
+            f"services/analytics_service: {counts['loaded']} tickers loaded"
+            " from bar store"
+        )
     msg.append(
-        f"services/analytics_service: computed {len(analytics_to_insert)} rows for {market}"
+        f"services/analytics_service: computed {counts['computed']} rows for {market}"
     )
-
-    if analytics_to_insert:
-        inserted = await insert_analytics_batch(
-            conn, analytics_to_insert, batch_size=CRON_INSERT_BATCH_SIZE
+    if counts["batches"]:
+        msg.append(
+            f"services/analytics_service: inserted {counts['inserted']} documents"
+            f" in {counts['batches']} batches (updated {counts['updated']},"
+            f" unchanged {counts['unchanged']})"
         )
-        msg.append(f"services/analytics_service: inserted {inserted} documents")
-
+    msg.append(f"services/analytics_service: stage timings {timings.summary()}")
     return "\n\n".join(msg)
@@ -0,0 +1,93 @@
+"""
+CPU stage of cron ingest: indicator math in worker processes.
+
+Chunks of bar windows are stacked into an OhlcvPanel in the parent, so each
+worker receives a handful of contiguous float64 blocks instead of pickled
+DataFrames, and returns plain analytics dicts.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from utils.panel_calculations import build_ohlcv_panel, compute_base_analytics_panel
+
+if TYPE_CHECKING:
+    from db.crud.ohlcv_bars import BarArrays
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_compute_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared worker pool; None when CRON_CPU_WORKERS is 0 (compute in a thread)."""
+    global _pool  # pylint: disable=global-statement
+    from core.settings import CRON_CPU_WORKERS
+
+    if CRON_CPU_WORKERS <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=CRON_CPU_WORKERS)
+    return _pool
+
+
+def shutdown_compute_pool() -> None:
+    global _pool  # pylint: disable=global-statement
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+def _chunk_windows(windows: Dict[str, "BarArrays"], chunk_size: int) -> List[dict]:
+    tickers = list(windows)
+    return [
+        {ticker: windows[ticker] for ticker in tickers[start : start + chunk_size]}
+        for start in range(0, len(tickers), max(chunk_size, 1))
+    ]
+
+
+async def compute_base_analytics_in_pool(
+    windows: Dict[str, "BarArrays"],
+) -> Dict[str, dict]:
+    """
+    Base analytics for many bar windows, chunk by chunk across the worker pool.
+
+    Args:
+        windows (dict): ticker -> BarArrays (ascending session order)
+
+    Returns:
+        dict: ticker -> base analytics (see compute_base_analytics_panel)
+    """
+    from core.settings import CRON_COMPUTE_CHUNK_SIZE
+
+    if not windows:
+        return {}
+    chunks = _chunk_windows(windows, CRON_COMPUTE_CHUNK_SIZE)
+    panels = [build_ohlcv_panel(chunk) for chunk in chunks]
+
+    pool = get_compute_pool()
+    if pool is None:
+        results = await asyncio.gather(
+            *[asyncio.to_thread(compute_base_analytics_panel, panel) for panel in panels]
+        )
+    else:
+        loop = asyncio.get_running_loop()
+        try:
+            results = await asyncio.gather(
+                *[
+                    loop.run_in_executor(pool, compute_base_analytics_panel, panel)
+                    for panel in panels
+                ]
+            )
+        except BrokenProcessPool as e:
+            print(f"services/compute_pool.py: worker pool broke, computing in a thread: {e}")
+            shutdown_compute_pool()
+            results = [
+                await asyncio.to_thread(compute_base_analytics_panel, panel)
+                for panel in panels
+            ]
+
+    analytics = {}
+    for chunk, chunk_results in zip(chunks, results):
+        analytics.update(zip(chunk.keys(), chunk_results))
+    return analytics
@@ -0,0 +1,284 @@
+"""
+Connections shared by one cron run.
+
+``open_cron_runtime`` opens the Mongo client, the asyncpg pool, the psycopg
+sync pool used by the OHLCV cache, the Redis client and the provider HTTP
+client once, warms them concurrently and closes them when the run ends.
+Phases receive the runtime explicitly instead of reconnecting per session.
+Pool checkouts are observed for the whole run so the cron report can show
+utilisation and wait times.
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from time import monotonic, perf_counter
+from typing import Optional
+
+from pymongo import monitoring
+
+from db.mongo_indexes import ensure_mongo_indexes
+from db.mongodb import connect as connect_mongo, close as close_mongo, get_database as get_mongo_database
+from db.postgres import connect as connect_postgres, close as close_postgres, ping as ping_postgres
+from db.ohlcv_sync import get_ohlcv_sync_pool, close_ohlcv_sync_pool
+from providers.http_transport import get_http_client, close_http_client, shutdown_sync_transport
+
+
+class MongoPoolMonitor(monitoring.ConnectionPoolListener):
+    """Counts Mongo pool checkouts and the time callers waited for a socket."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = monotonic()
+
+    def connection_checked_out(self, event):
+        waited = monotonic() - getattr(self._local, "started", monotonic())
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def stats(self, max_size: int) -> dict:
+        with self._lock:
+            return {
+                "max_size": max_size,
+                "peak_in_use": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "failures": self.checkout_failures,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+class PgPoolSampler:
+    """
+    Periodically samples asyncpg pool occupancy; asyncpg exposes no checkout
+    hooks, so saturation (every connection busy) stands in for waiting.
+    """
+
+    def __init__(self, pool, interval_seconds: float):
+        self.pool = pool
+        self.interval_seconds = interval_seconds
+        self.samples = 0
+        self.saturated = 0
+        self.peak_in_use = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self) -> None:
+        in_use = self.pool.get_size() - self.pool.get_idle_size()
+        self.samples += 1
+        self.peak_in_use = max(self.peak_in_use, in_use)
+        if in_use >= self.pool.get_max_size():
+            self.saturated += 1
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "max_size": self.pool.get_max_size(),
+            "peak_in_use": self.peak_in_use,
+            "samples": self.samples,
+            "saturated_samples": self.saturated,
+        }
+
+
+@dataclass
+class CronRuntime:
+    mongo: object
+    pg_pool: object
+    sync_pool: object = None
+    redis: object = None
+    http: object = None
+    mongo_max_size: int = 0
+    warmup_seconds: dict = field(default_factory=dict)
+    mongo_monitor: Optional[MongoPoolMonitor] = None
+    pg_sampler: Optional[PgPoolSampler] = None
+
+    def utilisation(self) -> dict:
+        """Pool name -> utilisation counters plus per-resource warm-up seconds."""
+        stats: dict = {}
+        if self.mongo_monitor is not None:
+            stats["mongo"] = self.mongo_monitor.stats(self.mongo_max_size)
+        if self.pg_sampler is not None:
+            stats["postgres"] = self.pg_sampler.stats()
+        if self.sync_pool is not None:
+            pool_stats = self.sync_pool.get_stats()
+            stats["ohlcv_sync"] = {
+                "max_size": pool_stats.get("pool_max", 0),
+                "checkouts": pool_stats.get("requests_num", 0),
+                "queued": pool_stats.get("requests_queued", 0),
+                "wait_seconds": pool_stats.get("requests_wait_ms", 0) / 1000,
+                "errors": pool_stats.get("requests_errors", 0),
+            }
+        for name, seconds in self.warmup_seconds.items():
+            stats.setdefault(name, {})["warmup_seconds"] = seconds
+        return stats
+
+
+async def _timed(name: str, warmup_seconds: dict, coro):
+    start = perf_counter()
+    try:
+        return await coro
+    finally:
+        warmup_seconds[name] = perf_counter() - start
+
+
+def _open_sync_pool(max_size: int):
+    pool = get_ohlcv_sync_pool(max_size=max_size)
+    if pool is not None:
+        pool.wait()
+    return pool
+
+
+def _redis_client():
+    from db.redis import RedisCache, db as redis_db
+
+    if redis_db.client is None:
+        RedisCache().connect()
+    return redis_db.client
+
+
+async def _warm_redis():
+    client = _redis_client()
+    try:
+        await asyncio.to_thread(client.ping)
+    except Exception as exc:  # pylint: disable=broad-except
+        # caches degrade to misses; a cold Redis must not stop the run
+        print(f"services/cron_runtime.py _warm_redis: {exc}")
+    return client
+
+
+async def _warm_sync_pool(max_size: int):
+    try:
+        return await asyncio.to_thread(_open_sync_pool, max_size)
+    except Exception as exc:  # pylint: disable=broad-except
+        # the OHLCV cache falls back to provider fetches without Postgres
+        print(f"services/cron_runtime.py _warm_sync_pool: {exc}")
+        return None
+
+
+async def _warm_mongo(max_pool_size: int, listeners: list):
+    await connect_mongo(max_pool_size=max_pool_size, event_listeners=listeners)
+    client = await get_mongo_database()
+    await client.admin.command("ping")
+    # the analytics upsert key and the top-N sort indexes must exist before ingest
+    await ensure_mongo_indexes(client)
+    return client
+
+
+async def _warm_postgres(max_size: int):
+    pool = await connect_postgres(max_size=max_size)
+    await ping_postgres(pool)
+    return pool
+
+
+@asynccontextmanager
+async def open_cron_runtime(n_markets: int = 1, mongo_listeners: Optional[list] = None):
+    """
+    Open and warm every pool the cron uses, sized for ``n_markets`` running
+    at once, and close them on exit. ``mongo_listeners`` are extra pymongo
+    monitoring listeners (e.g. command counters for benchmarks).
+
+    Yields:
+        CronRuntime: live connections and their utilisation counters
+    """
+    from core.settings import (
+        CRON_POOL_SAMPLE_SECONDS,
+        MONGO_MAX_CONNECTIONS,
+        OHLCV_SYNC_POOL_MAX_SIZE,
+        PG_POOL_MAX_SIZE,
+    )
+
+    scale = max(n_markets, 1)
+    mongo_max_size = MONGO_MAX_CONNECTIONS * scale
+    warmup_seconds: dict = {}
+    monitor = MongoPoolMonitor()
+    listeners = [monitor, *(mongo_listeners or [])]
+    sampler = None
+    try:
+        mongo, pg_pool, sync_pool, redis_client = await asyncio.gather(
+            _timed("mongo", warmup_seconds, _warm_mongo(mongo_max_size, listeners)),
+            _timed("postgres", warmup_seconds, _warm_postgres(PG_POOL_MAX_SIZE * scale)),
+            _timed(
+                "ohlcv_sync",
+                warmup_seconds,
+                _warm_sync_pool(OHLCV_SYNC_POOL_MAX_SIZE * scale),
+            ),
+            _timed("redis", warmup_seconds, _warm_redis()),
+        )
+        sampler = PgPoolSampler(pg_pool, CRON_POOL_SAMPLE_SECONDS)
+        sampler.start()
+        yield CronRuntime(
+            mongo=mongo,
+            pg_pool=pg_pool,
+            sync_pool=sync_pool,
+            redis=redis_client,
+            http=get_http_client(),
+            mongo_max_size=mongo_max_size,
+            warmup_seconds=warmup_seconds,
+            mongo_monitor=monitor,
+            pg_sampler=sampler,
+        )
+    finally:
+        if sampler is not None:
+            await sampler.stop()
+        await close_http_client()
+        shutdown_sync_transport()
+        if await get_mongo_database() is not None:
+            await close_mongo()
+        await close_postgres()
+        close_ohlcv_sync_pool()
@@ -0,0 +1,153 @@
+"""
+Incremental base analytics: O(1) day-over-day updates per ticker.
+
+The nightly MACD is an EMA seeded at the first bar of an 85-calendar-day
+window, so its start moves with every session. With the discounted close
+sum G_t = (1 - a) * G_{t-1} + x_t, the EMA over a window starting at s is
+
+    y_t = a * G_t + (1 - a) ** (t - s) * (x_s - a * G_s)
+
+so keeping the term x_i - a * G_i of every session still in the window
+gives the same value as a full recompute while a new session costs one
+multiply-add per EMA period. The last BOUNCE_SESSIONS + 1 bars cover the
+other base analytics (money flow, volume averages, bounce).
+
+A state is only advanced when it ends on the session before the target
+date (session calendar) and the target bar is in the bar store; anything
+else (gaps, new tickers, no calendar) goes through the full window path,
+which stores a fresh state.
+"""
+
+from datetime import date as date_type, timedelta
+from typing import Dict
+
+import numpy as np
+from scipy.signal import lfilter
+
+from db.crud.indicator_state import (
+    IndicatorState,
+    fetch_indicator_states,
+    save_indicator_states,
+)
+from db.crud.ohlcv_bars import BarArrays
+from services.session_calendar import session_n_before
+from utils.handle_external_apis import load_cached_ohlcv_window_arrays
+from utils.panel_calculations import (
+    BOUNCE_SESSIONS,
+    build_ohlcv_panel,
+    compute_base_analytics_panel,
+)
+
+MACD_PERIODS = (12, 26)
+# window of the nightly ingest (provider offset_n_days / actual_offset_n_days)
+WINDOW_DAYS = 85
+MIN_WINDOW_SESSIONS = 50
+TAIL_SESSIONS = BOUNCE_SESSIONS + 1
+BAR_FIELDS = ("session_date", "open", "high", "low", "close", "volume")
+
+
+def _alpha(period: int) -> float:
+    return 2.0 / (period + 1.0)
+
+
+def state_from_window(window: BarArrays) -> IndicatorState:
+    """State at the last session of a full analytics window (ascending bars)."""
+    close = np.asarray(window.close, dtype=np.float64)
+    terms, prefix = {}, {}
+    for period in MACD_PERIODS:
+        alpha = _alpha(period)
+        discounted = lfilter([1.0], [1.0, alpha - 1.0], close)
+        terms[period] = close - alpha * discounted
+        prefix[period] = float(discounted[-1])
+    return IndicatorState(
+        window_dates=np.asarray(window.session_date, dtype="datetime64[D]"),
+        terms=terms,
+        prefix=prefix,
+        tail=BarArrays(
+            **{name: getattr(window, name)[-TAIL_SESSIONS:].copy() for name in BAR_FIELDS}
+        ),
+    )
+
+
+def advance_state(state: IndicatorState, bar: BarArrays, window_start) -> IndicatorState:
+    """
+    State after appending the last bar of ``bar``, with sessions before
+    ``window_start`` dropped from the window.
+    """
+    first = int(np.searchsorted(state.window_dates, np.datetime64(window_start, "D")))
+    close = float(bar.close[-1])
+    terms, prefix = {}, {}
+    for period in MACD_PERIODS:
+        alpha = _alpha(period)
+        discounted = (1.0 - alpha) * state.prefix[period] + close
+        terms[period] = np.append(state.terms[period][first:], close - alpha * discounted)
+        prefix[period] = discounted
+    return IndicatorState(
+        window_dates=np.append(state.window_dates[first:], bar.session_date[-1:]),
+        terms=terms,
+        prefix=prefix,
+        tail=BarArrays(
+            **{
+                name: np.append(getattr(state.tail, name), getattr(bar, name)[-1:])[
+                    -TAIL_SESSIONS:
+                ]
+                for name in BAR_FIELDS
+            }
+        ),
+    )
+
+
+def state_ema(state: IndicatorState, period: int) -> float:
+    """EMA of the closes over the state's window at its last session."""
+    alpha = _alpha(period)
+    decay = (1.0 - alpha) ** (len(state.window_dates) - 1)
+    return alpha * state.prefix[period] + decay * state.terms[period][0]
+
+
+def analytics_from_states(states: Dict[str, IndicatorState]) -> Dict[str, dict]:
+    """Base analytics per ticker (as compute_base_analytics_panel) from states."""
+    if not states:
+        return {}
+    macd = np.array([state_ema(state, 12) - state_ema(state, 26) for state in states.values()])
+    panel = build_ohlcv_panel({ticker: state.tail for ticker, state in states.items()})
+    return dict(zip(states.keys(), compute_base_analytics_panel(panel, macd=macd)))
+
+
+def save_window_states(market: str, windows: Dict[str, BarArrays]) -> int:
+    """Store fresh states for windows computed by the full path."""
+    return save_indicator_states(
+        market, {ticker: state_from_window(window) for ticker, window in windows.items()}
+    )
+
+
+def update_indicator_states(market: str, date: str, tickers: list[str]) -> Dict[str, dict]:
+    """
+    Base analytics for the tickers whose state ends on the session before
+    ``date`` and whose ``date`` bar is in the bar store; their states move
+    to ``date``. Tickers left out need the full window path.
+    """
+    prior_session = session_n_before(market, date, 1)
+    if prior_session is None:
+        return {}
+    states = fetch_indicator_states(market, tickers, prior_session)
+    if not states:
+        return {}
+    bars = load_cached_ohlcv_window_arrays(
+        list(states), date, offset_n_days=1, actual_offset_n_days=1, market=market
+    )
+    target = np.datetime64(date, "D")
+    window_start = date_type.fromisoformat(date) - timedelta(days=WINDOW_DAYS)
+    advanced = {
+        ticker: advance_state(state, bars[ticker], window_start)
+        for ticker, state in states.items()
+        if ticker in bars and bars[ticker].session_date[-1] == target
+    }
+    save_indicator_states(market, advanced)
+    # a window that shrank below the minimum is left to the full path to skip
+    return analytics_from_states(
+        {
+            ticker: state
+            for ticker, state in advanced.items()
+            if len(state.window_dates) >= MIN_WINDOW_SESSIONS
+        }
+    )
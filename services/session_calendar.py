@@ -0,0 +1,229 @@
+"""
+Per-market trading-session calendar.
+
+Sessions are learned from the probe ticker (its bars in ohlcv_bars, or the
+short window the provider fetches when probing) and persisted in Postgres.
+A calendar is complete for [complete_from, checked_through]; questions
+outside that range return None so callers fall back to the provider.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date as date_type, datetime, timedelta, timezone
+from typing import Optional
+
+from core import settings
+from db.crud.session_calendar import (
+    fetch_probe_bar_dates,
+    fetch_session_calendar,
+    record_session_calendar,
+)
+
+# Longest calendar gap between consecutive sessions (long weekend) treated as complete.
+MAX_SESSION_GAP_DAYS = 4
+
+_calendars: dict[str, "SessionCalendar"] = {}
+_calendars_lock = threading.Lock()
+
+
+def _to_date(value) -> date_type:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    return date_type.fromisoformat(str(value)[:10])
+
+
+def _last_weekday(day: date_type) -> date_type:
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def _adjacent(checked_through: date_type, complete_from: date_type) -> bool:
+    """Whether only weekend days lie between two complete ranges."""
+    return _last_weekday(complete_from - timedelta(days=1)) <= checked_through
+
+
+@dataclass(frozen=True)
+class SessionCalendar:
+    market: str
+    sessions: tuple  # ascending dates within [complete_from, checked_through]
+    complete_from: date_type
+    checked_through: date_type
+
+    def covers(self, start, end=None) -> bool:
+        start = _to_date(start)
+        end = start if end is None else _to_date(end)
+        return self.complete_from <= start and _last_weekday(end) <= self.checked_through
+
+    def sessions_before(self, day, n: int) -> Optional[list[date_type]]:
+        """The ``n`` sessions on or before ``day``, ascending; None if unknown."""
+        day = _to_date(day)
+        if not self.covers(day):
+            return None
+        stop = bisect_right(self.sessions, day)
+        if stop < n:
+            return None
+        return list(self.sessions[stop - n : stop])
+
+    def session_n_before(self, day, n: int) -> Optional[date_type]:
+        """The session ``n`` sessions before ``day`` (0: last session on or before)."""
+        window = self.sessions_before(day, n + 1)
+        return None if window is None else window[0]
+
+    def missing_ranges(
+        self, present, start, end
+    ) -> Optional[list[tuple[date_type, date_type]]]:
+        """
+        Inclusive (first, last) runs of sessions in [start, end] absent from
+        ``present``; None when the calendar does not cover the window.
+        """
+        start, end = _to_date(start), _to_date(end)
+        if not self.covers(start, end):
+            return None
+        present = set(present)
+        ranges = []
+        run_start = run_end = None
+        for session in self.sessions[
+            bisect_left(self.sessions, start) : bisect_right(self.sessions, end)
+        ]:
+            if session not in present:
+                run_start = run_start or session
+                run_end = session
+            elif run_start is not None:
+                ranges.append((run_start, run_end))
+                run_start = None
+        if run_start is not None:
+            ranges.append((run_start, run_end))
+        return ranges
+
+    def merge(self, other: "SessionCalendar") -> "SessionCalendar":
+        """Union of calendars whose complete ranges touch; otherwise the newer one."""
+        if not (
+            _adjacent(self.checked_through, other.complete_from)
+            and _adjacent(other.checked_through, self.complete_from)
+        ):
+            return other if other.checked_through >= self.checked_through else self
+        return SessionCalendar(
+            market=self.market,
+            sessions=tuple(sorted(set(self.sessions) | set(other.sessions))),
+            complete_from=min(self.complete_from, other.complete_from),
+            checked_through=max(self.checked_through, other.checked_through),
+        )
+
+
+def calendar_from_window(
+    market: str,
+    sessions: list,
+    window_start,
+    window_end,
+    today: Optional[date_type] = None,
+) -> Optional[SessionCalendar]:
+    """
+    Calendar from a complete probe window. A window ending today only counts
+    through yesterday unless today's bar is already in, since it may be pending.
+    """
+    window_start, window_end = _to_date(window_start), _to_date(window_end)
+    days = sorted({_to_date(day) for day in sessions})
+    today = today or datetime.now(timezone.utc).date()
+    checked_through = window_end
+    if window_end >= today and not (days and days[-1] == window_end):
+        checked_through = min(window_end, today - timedelta(days=1))
+    if checked_through < window_start:
+        return None
+    return SessionCalendar(
+        market=market,
+        sessions=tuple(day for day in days if window_start <= day <= checked_through),
+        complete_from=window_start,
+        checked_through=checked_through,
+    )
+
+
+def calendar_from_bar_dates(market: str, bar_dates: list) -> Optional[SessionCalendar]:
+    """Calendar from the probe ticker's most recent run of bars without gaps."""
+    days = sorted({_to_date(day) for day in bar_dates})
+    if not days:
+        return None
+    first = len(days) - 1
+    while first > 0 and (days[first] - days[first - 1]).days <= MAX_SESSION_GAP_DAYS:
+        first -= 1
+    run = tuple(days[first:])
+    return SessionCalendar(market, run, run[0], run[-1])
+
+
+def cached_session_calendar(market: str) -> Optional[SessionCalendar]:
+    """In-process calendar, no I/O; None until loaded or when disabled."""
+    if settings.SESSION_CALENDAR_DISABLED:
+        return None
+    return _calendars.get(market)
+
+
+def load_session_calendar(market: str) -> Optional[SessionCalendar]:
+    """Calendar from Postgres (kept in-process); the cached one on error."""
+    if settings.SESSION_CALENDAR_DISABLED:
+        return None
+    stored = fetch_session_calendar(market)
+    if stored is None:
+        return _calendars.get(market)
+    sessions, complete_from, checked_through = stored
+    calendar = SessionCalendar(market, tuple(sessions), complete_from, checked_through)
+    with _calendars_lock:
+        _calendars[market] = calendar
+    return calendar
+
+
+def remember_sessions(learned: SessionCalendar) -> SessionCalendar:
+    """Merge ``learned`` into the stored calendar and persist the result."""
+    current = _calendars.get(learned.market) or load_session_calendar(learned.market)
+    merged = learned if current is None else current.merge(learned)
+    record_session_calendar(
+        learned.market, list(learned.sessions), merged.complete_from, merged.checked_through
+    )
+    with _calendars_lock:
+        _calendars[learned.market] = merged
+    return merged
+
+
+def session_calendar_for(market: str, date, probe_ticker: str) -> Optional[SessionCalendar]:
+    """
+    Calendar covering ``date``: in-process, then Postgres, then rebuilt from
+    the probe ticker's cached bars. None when none covers it or disabled.
+    """
+    if settings.SESSION_CALENDAR_DISABLED:
+        return None
+    calendar = _calendars.get(market)
+    if calendar is not None and calendar.covers(date):
+        return calendar
+    calendar = load_session_calendar(market)
+    if calendar is not None and calendar.covers(date):
+        return calendar
+    from_bars = calendar_from_bar_dates(market, fetch_probe_bar_dates(market, probe_ticker))
+    if from_bars is not None:
+        calendar = remember_sessions(from_bars)
+        if calendar.covers(date):
+            return calendar
+    return None
+
+
+def sessions_before(market: str, date, n: int) -> Optional[list[str]]:
+    """The ``n`` sessions on or before ``date`` (YYYY-MM-DD, ascending); None if unknown."""
+    calendar = cached_session_calendar(market)
+    if calendar is None or not calendar.covers(date):
+        calendar = load_session_calendar(market)
+    window = calendar.sessions_before(date, n) if calendar is not None else None
+    return None if window is None else [day.isoformat() for day in window]
+
+
+def session_n_before(market: str, date, n: int) -> Optional[str]:
+    """The session ``n`` sessions before ``date`` (YYYY-MM-DD); None if unknown."""
+    window = sessions_before(market, date, n + 1)
+    return None if window is None else window[0]
+
+
+def clear_session_calendar_cache() -> None:
+    with _calendars_lock:
+        _calendars.clear()
@@ -0,0 +1,51 @@
+"""Wall-time and count accounting for cron ingest stages."""
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Tuple
+
+
+class StageTimings:
+    """
+    Wall seconds per named stage, from its first start to its last end (so
+    concurrent workers of a stage overlap instead of adding up), and named
+    counters per stage (tickers, HTTP calls, cache hits, rows written).
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self._bounds: Dict[str, Tuple[float, float]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            end = perf_counter()
+            self._record(name, start, end, end - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Record a run of ``name`` lasting ``seconds`` that ended just now."""
+        end = perf_counter()
+        self._record(name, end - seconds, end, seconds)
+
+    def _record(self, name: str, start: float, end: float, seconds: float) -> None:
+        bounds = self._bounds.get(name)
+        if bounds is None:
+            self._bounds[name] = (start, end)
+            self.seconds[name] = seconds
+            return
+        first, last = min(bounds[0], start), max(bounds[1], end)
+        self._bounds[name] = (first, last)
+        self.seconds[name] = last - first
+
+    def count(self, name: str, key: str, amount: int = 1) -> None:
+        stage_counts = self.counts.setdefault(name, {})
+        stage_counts[key] = stage_counts.get(key, 0) + amount
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{name}={round(seconds, 2)}s" for name, seconds in self.seconds.items()
+        )
@@ -1,30 +1,12 @@
-"""Polygon HTTP mocking for calculation tests."""
-
-import json
-from pathlib import Path
+"""Polygon HTTP stand-in routes for calculation tests."""
 
 import pytest
-import requests
 
 from tests.helpers.constants import CALC_TICKERS
-
-OHLCV_DIR = Path(__file__).resolve().parents[1] / "fixtures" / "ohlcv"
+from tests.helpers.http_stand_in import serve_polygon_ohlcv_fixtures
 
 
 @pytest.fixture(autouse=True)
-def mock_polygon_requests(monkeypatch):
-    def fake_http_get(self, url, *args, **kwargs):
-        del self, args, kwargs
-        from providers.polygon_us import POLYGON_SYMBOL_ALIASES
-
-        for ticker in CALC_TICKERS:
-            polygon_symbol = POLYGON_SYMBOL_ALIASES.get(ticker.upper(), ticker.upper())
-            if f"/ticker/{polygon_symbol}/" in url or f"/ticker/{ticker.upper()}/" in url:
-                payload = json.loads((OHLCV_DIR / f"{ticker}.json").read_text())
-                response = requests.Response()
-                response.status_code = 200
-                response._content = json.dumps(payload).encode("utf-8")
-                return response
-        raise AssertionError(f"unexpected polygon URL: {url}")
-
-    monkeypatch.setattr("providers.polygon_us.PolygonUSProvider._http_get", fake_http_get)
+def mock_polygon_requests(http_stand_in):
+    serve_polygon_ohlcv_fixtures(http_stand_in, CALC_TICKERS)
+    return http_stand_in
@@ -0,0 +1,116 @@
+"""Incremental indicator state must reproduce the full-window base analytics."""
+
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import services.indicator_state as indicator_state
+from db.crud.ohlcv_bars import BarArrays
+from tests.helpers.constants import CALC_TICKERS, FIXTURE_DATE
+from utils.panel_calculations import compute_base_analytics_for_windows
+
+OHLCV_DIR = Path(__file__).resolve().parents[1] / "fixtures" / "ohlcv"
+FIELDS = (
+    "macd",
+    "one_day_avg_mf",
+    "three_day_avg_mf",
+    "one_day_open_close_change",
+    "close",
+    "open",
+    "volume",
+    "three_day_avg_volume",
+    "date",
+)
+
+
+def _bars(ticker: str) -> BarArrays:
+    payload = json.loads((OHLCV_DIR / f"{ticker}.json").read_text(encoding="utf-8"))
+    rows = sorted(payload["results"], key=lambda row: row["t"])
+    return BarArrays(
+        session_date=np.array(
+            [np.datetime64(int(row["t"]), "ms") for row in rows]
+        ).astype("datetime64[D]"),
+        open=np.array([row["o"] for row in rows], dtype=np.float64),
+        high=np.array([row["h"] for row in rows], dtype=np.float64),
+        low=np.array([row["l"] for row in rows], dtype=np.float64),
+        close=np.array([row["c"] for row in rows], dtype=np.float64),
+        volume=np.array([int(row["v"]) for row in rows], dtype=np.int64),
+    )
+
+
+def _slice(bars: BarArrays, start: int, stop: int) -> BarArrays:
+    return BarArrays(
+        **{name: getattr(bars, name)[start:stop] for name in indicator_state.BAR_FIELDS}
+    )
+
+
+def _window(bars: BarArrays, last: int) -> BarArrays:
+    """The nightly window: sessions within WINDOW_DAYS calendar days of bar ``last``."""
+    end = bars.session_date[last].astype(object)
+    start = np.datetime64(end - timedelta(days=indicator_state.WINDOW_DAYS), "D")
+    first = int(np.searchsorted(bars.session_date, start))
+    return _slice(bars, first, last + 1)
+
+
+def _assert_same_analytics(actual: dict, expected: dict) -> None:
+    for field in FIELDS:
+        assert actual[field] == pytest.approx(expected[field], rel=1e-9, abs=1e-9), field
+    assert actual["bounce"] == pytest.approx(expected["bounce"], rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("ticker", CALC_TICKERS)
+def test_advanced_state_matches_full_recompute(ticker):
+    bars = _bars(ticker)
+    last = len(bars) - 1
+    state = indicator_state.state_from_window(_window(bars, last - 10))
+
+    for position in range(last - 9, last + 1):
+        window = _window(bars, position)
+        state = indicator_state.advance_state(
+            state, _slice(bars, position, position + 1), window.session_date[0]
+        )
+        expected = compute_base_analytics_for_windows({ticker: window})[ticker]
+        actual = indicator_state.analytics_from_states({ticker: state})[ticker]
+
+        assert np.array_equal(state.window_dates, window.session_date)
+        _assert_same_analytics(actual, expected)
+
+
+def test_update_advances_only_states_ending_on_prior_session(monkeypatch):
+    bars = _bars("AAPL")
+    last = len(bars) - 1
+    saved = {}
+    monkeypatch.setattr(
+        indicator_state, "session_n_before", lambda market, date, n: "2024-05-31"
+    )
+    monkeypatch.setattr(
+        indicator_state,
+        "fetch_indicator_states",
+        lambda market, tickers, session_date: {
+            "AAPL": indicator_state.state_from_window(_window(bars, last - 1))
+        },
+    )
+    monkeypatch.setattr(
+        indicator_state,
+        "load_cached_ohlcv_window_arrays",
+        lambda tickers, date, **kwargs: {"AAPL": _slice(bars, last - 1, last + 1)},
+    )
+    monkeypatch.setattr(
+        indicator_state, "save_indicator_states", lambda market, states: saved.update(states)
+    )
+
+    analytics = indicator_state.update_indicator_states("US", FIXTURE_DATE, ["AAPL", "MSFT"])
+
+    expected = compute_base_analytics_for_windows({"AAPL": _window(bars, last)})["AAPL"]
+    assert list(analytics) == ["AAPL"]
+    _assert_same_analytics(analytics["AAPL"], expected)
+    assert str(saved["AAPL"].session_date) == FIXTURE_DATE
+
+
+def test_update_needs_the_session_calendar(monkeypatch):
+    monkeypatch.setattr(indicator_state, "session_n_before", lambda market, date, n: None)
+
+    assert indicator_state.update_indicator_states("US", FIXTURE_DATE, ["AAPL"]) == {}
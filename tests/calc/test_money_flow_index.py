@@ -0,0 +1,68 @@
+"""Vectorized money flow index must match the original per-session loop."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.handle_calculations import (
+    get_money_flow_index,
+    get_money_flow_index_batch,
+    get_money_flow_ratio,
+    get_money_flow_ratio_batch,
+)
+
+
+def _loop_money_flow_ratio(typical_prices, volumes, n_days):
+    positive_mf = 0
+    negative_mf = 10e-5
+    for i in range(n_days - 1):
+        current_typical_price = typical_prices.iloc[-(i + 1)]
+        raw_mf = current_typical_price * volumes.iloc[-(i + 1)]
+        if current_typical_price > typical_prices.iloc[-(i + 2)]:
+            positive_mf += raw_mf
+        else:
+            negative_mf += raw_mf
+    return positive_mf / negative_mf
+
+
+def _random_series(seed: int, sessions: int = 60):
+    rng = np.random.default_rng(seed)
+    typical = pd.Series(100 + rng.normal(0, 2, sessions).cumsum())
+    volumes = pd.Series(rng.integers(1_000, 100_000, sessions).astype(float))
+    return typical, volumes
+
+
+@pytest.mark.parametrize("n_days", [0, 1, 2, 5, 15, 59])
+def test_money_flow_ratio_matches_loop(n_days):
+    typical, volumes = _random_series(3)
+    assert get_money_flow_ratio(typical, volumes, n_days) == pytest.approx(
+        _loop_money_flow_ratio(typical, volumes, n_days), rel=1e-12
+    )
+
+
+def test_money_flow_ratio_keeps_negative_flow_floor():
+    typical = pd.Series([1.0, 2.0, 3.0, 4.0])
+    volumes = pd.Series([10.0, 10.0, 10.0, 10.0])
+    assert get_money_flow_ratio(typical, volumes, 4) == pytest.approx(90 / 10e-5)
+    assert get_money_flow_index(typical, volumes, 4) == pytest.approx(
+        100 - 100 / (1 + 90 / 10e-5)
+    )
+
+
+def test_money_flow_batch_with_per_row_periods_and_padding():
+    series = [_random_series(seed, sessions) for seed, sessions in ((1, 60), (2, 20), (4, 8))]
+    width = max(len(typical) for typical, _ in series)
+    typical_block = np.full((len(series), width), np.nan)
+    volume_block = np.full((len(series), width), np.nan)
+    for row, (typical, volumes) in enumerate(series):
+        typical_block[row, width - len(typical) :] = typical
+        volume_block[row, width - len(volumes) :] = volumes
+    n_days = np.array([15, 15, 7])
+
+    ratios = get_money_flow_ratio_batch(typical_block, volume_block, n_days)
+    indexes = get_money_flow_index_batch(typical_block, volume_block, n_days)
+
+    for row, (typical, volumes) in enumerate(series):
+        expected = _loop_money_flow_ratio(typical, volumes, int(n_days[row]))
+        assert ratios[row] == pytest.approx(expected, rel=1e-12)
+        assert indexes[row] == pytest.approx(100 - 100 / (1 + expected), rel=1e-12)
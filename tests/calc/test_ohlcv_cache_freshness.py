@@ -9,7 +9,7 @@ from providers.polygon_us import PolygonUSProvider
 
 
 class _CacheHitProvider(PolygonUSProvider):
-    def _fetch_ohlcv_from_api(self, ticker, date, offset_n_days, actual_offset_n_days, utc_dates):
+    async def _fetch_ohlcv_from_api_async(self, ticker, date, offset_n_days, actual_offset_n_days, utc_dates):
         raise AssertionError("API should run when cache lacks requested session date")
 
 
@@ -45,10 +45,98 @@ def test_load_ohlcv_window_refetches_when_cache_stops_before_end_date(monkeypatc
             "ticker": ["SPY", "SPY"],
         }
     )
-    monkeypatch.setattr(provider, "_fetch_ohlcv_from_api", lambda *args, **kwargs: api_df)
+    async def api_stub(*args, **kwargs):
+        del args, kwargs
+        return api_df
+
+    monkeypatch.setattr(provider, "_fetch_ohlcv_from_api_async", api_stub)
 
     df = provider._load_ohlcv_window(
         "SPY", "2026-06-19", offset_n_days=85, actual_offset_n_days=2, utc_dates=True
     )
     assert not df.empty
     assert df.sort_values("date")["date"].iloc[-1].strftime("%Y-%m-%d") == "2026-06-19"
+
+
+def _daily_bars(start: date, count: int) -> list[BarRow]:
+    return [
+        BarRow(
+            session_date=start + timedelta(days=i),
+            open=1.0 + i,
+            high=1.0 + i,
+            low=1.0 + i,
+            close=1.0 + i,
+            volume=100 + i,
+        )
+        for i in range(count)
+    ]
+
+
+def test_load_ohlcv_window_fetches_only_missing_tail(monkeypatch):
+    import core.settings as settings_module
+
+    monkeypatch.setattr(settings_module, "OHLCV_CACHE_DISABLED", False)
+    provider = PolygonUSProvider()
+    cached = _daily_bars(date.fromisoformat("2026-04-30"), 50)
+    monkeypatch.setattr(
+        "providers.ohlcv_cache_mixin.fetch_bars",
+        lambda market, ticker, start, end: list(reversed(cached)),
+    )
+    written = []
+    monkeypatch.setattr(
+        "providers.ohlcv_cache_mixin.upsert_bars",
+        lambda market, ticker, rows: written.extend(rows),
+    )
+    calls = []
+
+    async def api_stub(ticker, date, offset_n_days, actual_offset_n_days, utc_dates):
+        calls.append((date, offset_n_days, actual_offset_n_days))
+        return pd.DataFrame(
+            {
+                "date": ["2026-06-19"],
+                "open": [9.0],
+                "high": [9.0],
+                "low": [9.0],
+                "close": [9.0],
+                "volume": [900],
+                "ticker": ["SPY"],
+            }
+        )
+
+    monkeypatch.setattr(provider, "_fetch_ohlcv_from_api_async", api_stub)
+
+    df = provider._load_ohlcv_window(
+        "SPY", "2026-06-19", offset_n_days=85, actual_offset_n_days=50
+    )
+
+    assert calls == [("2026-06-19", 0, 1)]
+    assert [row.session_date.isoformat() for row in written] == ["2026-06-19"]
+    assert len(df) == 51
+    assert df["date"].iloc[0] == "2026-06-19"
+    assert df["close"].iloc[0] == 9.0
+
+
+def test_load_ohlcv_window_falls_back_to_full_fetch_without_cache(monkeypatch):
+    import core.settings as settings_module
+
+    monkeypatch.setattr(settings_module, "OHLCV_CACHE_DISABLED", False)
+    provider = PolygonUSProvider()
+    monkeypatch.setattr(
+        "providers.ohlcv_cache_mixin.fetch_bars",
+        lambda market, ticker, start, end: [],
+    )
+    monkeypatch.setattr(
+        "providers.ohlcv_cache_mixin.upsert_bars", lambda market, ticker, rows: None
+    )
+    calls = []
+
+    async def api_stub(ticker, date, offset_n_days, actual_offset_n_days, utc_dates):
+        calls.append((date, offset_n_days, actual_offset_n_days))
+        return pd.DataFrame()
+
+    monkeypatch.setattr(provider, "_fetch_ohlcv_from_api_async", api_stub)
+
+    provider._load_ohlcv_window(
+        "SPY", "2026-06-19", offset_n_days=85, actual_offset_n_days=50
+    )
+    assert calls == [("2026-06-19", 85, 50)]
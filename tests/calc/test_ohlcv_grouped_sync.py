@@ -0,0 +1,91 @@
+"""Whole-market grouped daily sync fills the OHLCV bar store per session."""
+
+from datetime import date
+
+import pytest
+
+import core.settings as settings_module
+from providers.polygon_us import PolygonUSProvider
+
+
+@pytest.fixture
+def grouped_store(monkeypatch):
+    store = {"bars": {}, "marked": {}}
+    monkeypatch.setattr(settings_module, "OHLCV_CACHE_DISABLED", False)
+    monkeypatch.setattr(
+        "providers.ohlcv_cache_mixin.fetch_grouped_session_dates",
+        lambda market, start, end: {
+            session for session in store["marked"] if start <= session <= end
+        },
+    )
+
+    def upsert_stub(market, bars_by_ticker):
+        del market
+        for ticker, rows in bars_by_ticker.items():
+            store["bars"].setdefault(ticker, []).extend(rows)
+        return sum(len(rows) for rows in bars_by_ticker.values())
+
+    def mark_stub(market, session_date, ticker_count):
+        del market
+        store["marked"][session_date] = ticker_count
+
+    monkeypatch.setattr("db.crud.ohlcv_bars.upsert_market_bars", upsert_stub)
+    monkeypatch.setattr("providers.ohlcv_cache_mixin.mark_grouped_session", mark_stub)
+    return store
+
+
+def test_grouped_sync_requests_one_call_per_missing_session(monkeypatch, grouped_store):
+    urls = []
+
+    def request_json_stub(self, url, max_attempts=3):
+        del self, max_attempts
+        urls.append(url)
+        if "/2024-05-27" in url:
+            return {"resultsCount": 0}
+        return {
+            "results": [
+                {"T": "AAPL", "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 100.0},
+                {"T": "MSFT", "o": 3, "h": 4, "l": 2.5, "c": 3.5, "v": 200},
+            ]
+        }
+
+    monkeypatch.setattr(PolygonUSProvider, "_request_json", request_json_stub)
+
+    provider = PolygonUSProvider()
+    summary = provider.sync_grouped_window("2024-06-03", offset_n_days=14)
+
+    assert summary["requests"] == 11
+    assert summary["sessions"] == 10
+    assert summary["bars"] == 20
+    assert all("/v2/aggs/grouped/locale/us/market/stocks/" in url for url in urls)
+    assert grouped_store["marked"][date(2024, 5, 27)] == 0
+    assert grouped_store["bars"]["AAPL"][0].volume == 100
+
+    urls.clear()
+    repeat = provider.sync_grouped_window("2024-06-03", offset_n_days=14)
+    assert repeat["requests"] == 0
+    assert urls == []
+
+
+def test_grouped_sync_leaves_empty_target_session_unmarked(monkeypatch, grouped_store):
+    monkeypatch.setattr(
+        PolygonUSProvider,
+        "_request_json",
+        lambda self, url, max_attempts=3: {"resultsCount": 0},
+    )
+
+    PolygonUSProvider().sync_grouped_window("2024-06-03", offset_n_days=0)
+
+    assert date(2024, 6, 3) not in grouped_store["marked"]
+
+
+def test_grouped_sync_noop_when_cache_disabled(monkeypatch):
+    monkeypatch.setattr(settings_module, "OHLCV_CACHE_DISABLED", True)
+
+    def fail_request(self, url, max_attempts=3):
+        raise AssertionError("grouped sync must not call HTTP with cache disabled")
+
+    monkeypatch.setattr(PolygonUSProvider, "_request_json", fail_request)
+
+    summary = PolygonUSProvider().sync_grouped_window("2024-06-03")
+    assert summary == {"requests": 0, "sessions": 0, "bars": 0}
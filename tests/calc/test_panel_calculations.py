@@ -0,0 +1,94 @@
+"""Panel base analytics must match per-ticker compute_base_analytics and goldens."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from db.crud.ohlcv_bars import BarArrays
+from tests.helpers.constants import CALC_TICKERS, FIXTURE_DATE
+from utils.handle_calculations import compute_base_analytics, compute_extra_analytics
+from utils.panel_calculations import (
+    build_ohlcv_panel,
+    compute_base_analytics_for_windows,
+    compute_base_analytics_panel,
+    compute_mfi_for_windows,
+)
+
+GOLDEN_DIR = Path(__file__).resolve().parents[1] / "fixtures" / "golden"
+OHLCV_DIR = Path(__file__).resolve().parents[1] / "fixtures" / "ohlcv"
+BASE_FIELDS = [
+    "macd",
+    "one_day_avg_mf",
+    "three_day_avg_mf",
+    "one_day_open_close_change",
+    "close",
+    "open",
+    "volume",
+    "three_day_avg_volume",
+    "date",
+]
+
+
+def _ohlcv_dataframe(ticker: str) -> pd.DataFrame:
+    payload = json.loads((OHLCV_DIR / f"{ticker}.json").read_text(encoding="utf-8"))
+    df = pd.DataFrame(payload["results"])
+    df["date"] = pd.to_datetime(df["t"], unit="ms").dt.strftime("%Y-%m-%d")
+    df = df.rename(
+        columns={"o": "open", "h": "high", "l": "low", "c": "close", "v": "volume"}
+    )
+    df["ticker"] = ticker.upper()
+    return df[["ticker", "date", "open", "high", "low", "close", "volume"]]
+
+
+def _bar_arrays(df: pd.DataFrame) -> BarArrays:
+    df = df.sort_values("date")
+    return BarArrays(
+        session_date=df["date"].to_numpy(dtype="datetime64[D]"),
+        open=df["open"].to_numpy(dtype=np.float64),
+        high=df["high"].to_numpy(dtype=np.float64),
+        low=df["low"].to_numpy(dtype=np.float64),
+        close=df["close"].to_numpy(dtype=np.float64),
+        volume=df["volume"].to_numpy(dtype=np.int64),
+    )
+
+
+def test_panel_matches_goldens():
+    windows = {ticker: _bar_arrays(_ohlcv_dataframe(ticker)) for ticker in CALC_TICKERS}
+    results = compute_base_analytics_for_windows(windows)
+
+    for ticker in CALC_TICKERS:
+        golden = json.loads(
+            (GOLDEN_DIR / f"{ticker.lower()}_{FIXTURE_DATE}.json").read_text()
+        )
+        for field in ("macd", "one_day_avg_mf", "three_day_avg_mf", "volume", "three_day_avg_volume"):
+            assert results[ticker][field] == pytest.approx(golden[field], rel=1e-6, abs=1e-6)
+
+
+def test_panel_matches_per_ticker_compute_with_ragged_windows():
+    frames = {ticker: _ohlcv_dataframe(ticker) for ticker in CALC_TICKERS}
+    frames["MSFT"] = frames["MSFT"].sort_values("date").iloc[-30:]
+    frames["GOOG"] = frames["GOOG"].sort_values("date").iloc[-2:]
+
+    panel = build_ohlcv_panel({t: _bar_arrays(df) for t, df in frames.items()})
+    results = compute_base_analytics_panel(panel)
+
+    assert [item["ticker"] for item in results] == CALC_TICKERS
+    for item in results:
+        expected = compute_base_analytics(frames[item["ticker"]])
+        for field in BASE_FIELDS:
+            assert item[field] == pytest.approx(expected[field], rel=1e-6, abs=1e-6)
+        assert item["bounce"] == pytest.approx(expected["bounce"], rel=1e-6, abs=1e-6)
+
+
+def test_panel_mfi_matches_per_ticker_extra_analytics():
+    frames = {ticker: _ohlcv_dataframe(ticker) for ticker in CALC_TICKERS}
+    frames["GOOG"] = frames["GOOG"].sort_values("date").iloc[-6:]
+
+    mfi = compute_mfi_for_windows({t: _bar_arrays(df) for t, df in frames.items()})
+
+    assert list(mfi) == CALC_TICKERS
+    for ticker, df in frames.items():
+        assert mfi[ticker] == pytest.approx(compute_extra_analytics(df)["mfi"], rel=1e-9)
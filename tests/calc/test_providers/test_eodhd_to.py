@@ -1,6 +1,5 @@
 import json
 from pathlib import Path
-from unittest.mock import MagicMock
 
 import pytest
 
@@ -32,24 +31,18 @@ def eodhd_to_provider():
     return EodhdTOProvider()
 
 
-def test_eodhd_to_fetch_ohlcv(eodhd_to_provider, monkeypatch):
-    response = MagicMock()
-    response.status_code = 200
-    response.json.return_value = _eodhd_rows()
-    monkeypatch.setattr("providers.eodhd_to.requests.get", lambda *a, **k: response)
-    monkeypatch.setattr("providers.eodhd_to.EodhdTOProvider._http_get", lambda *a, **k: response)
+def test_eodhd_to_fetch_ohlcv(eodhd_to_provider, http_stand_in):
+    http_stand_in.route("/eod/SHOP.TO", _eodhd_rows())
 
     df = eodhd_to_provider.fetch_ohlcv("SHOP", FIXTURE_DATE, offset_n_days=85, actual_offset_n_days=50)
     assert not df.empty
     assert df.iloc[0]["ticker"] == "SHOP"
+    assert len(http_stand_in.requests) == 1
+    assert "from=" in http_stand_in.requests[0] and "fmt=json" in http_stand_in.requests[0]
 
 
-def test_eodhd_to_fetch_ticker_analytics(eodhd_to_provider, monkeypatch):
-    response = MagicMock()
-    response.status_code = 200
-    response.json.return_value = _eodhd_rows()
-    monkeypatch.setattr("providers.eodhd_to.requests.get", lambda *a, **k: response)
-    monkeypatch.setattr("providers.eodhd_to.EodhdTOProvider._http_get", lambda *a, **k: response)
+def test_eodhd_to_fetch_ticker_analytics(eodhd_to_provider, http_stand_in):
+    http_stand_in.route("/eod/SHOP.TO", _eodhd_rows())
 
     analytics = eodhd_to_provider.fetch_ticker_analytics("SHOP", FIXTURE_DATE)
     assert analytics
@@ -57,16 +50,31 @@ def test_eodhd_to_fetch_ticker_analytics(eodhd_to_provider, monkeypatch):
     assert "mfi" in analytics
 
 
-def test_eodhd_to_fetch_ticker_universe(eodhd_to_provider, monkeypatch):
-    response = MagicMock()
-    response.status_code = 200
-    response.json.return_value = [
-        {"Code": "SHOP", "Type": "Common Stock"},
-        {"Code": "RY", "Type": "Common Stock"},
-        {"Code": "XYZ", "Type": "ETF"},
-    ]
-    monkeypatch.setattr("providers.eodhd_to.requests.get", lambda *a, **k: response)
-    monkeypatch.setattr("providers.eodhd_to.EodhdTOProvider._http_get", lambda *a, **k: response)
+def test_eodhd_to_fetch_ticker_universe(eodhd_to_provider, http_stand_in):
+    http_stand_in.route(
+        "/exchange-symbol-list/TO",
+        [
+            {"Code": "SHOP", "Type": "Common Stock"},
+            {"Code": "RY", "Type": "Common Stock"},
+            {"Code": "XYZ", "Type": "ETF"},
+        ],
+    )
 
     tickers = eodhd_to_provider.fetch_ticker_universe(FIXTURE_DATE)
     assert tickers == ["SHOP", "RY"]
+
+
+@pytest.mark.asyncio
+async def test_eodhd_to_async_fetch_retries_rate_limit(eodhd_to_provider, http_stand_in):
+    from providers.http_transport import close_http_client
+
+    responses = [(429, {"error": "slow down"}), (200, _eodhd_rows())]
+    http_stand_in.route("/eod/SHOP.TO", handler=lambda path: responses.pop(0))
+
+    try:
+        df = await eodhd_to_provider.fetch_ohlcv_async("SHOP", FIXTURE_DATE)
+    finally:
+        await close_http_client()
+
+    assert not df.empty
+    assert len(http_stand_in.requests) == 2
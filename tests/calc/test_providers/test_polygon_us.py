@@ -39,7 +39,7 @@ def test_polygon_us_fetch_ohlcv_from_fixtures(polygon_us_provider, mock_polygon_
     assert len(df) == len(payload["results"])
 
 
-def test_polygon_us_cache_hit_skips_http(monkeypatch, postgres_pool):
+def test_polygon_us_cache_hit_skips_http(monkeypatch, postgres_pool, http_stand_in):
     del postgres_pool
     monkeypatch.delenv("OHLCV_CACHE_DISABLED", raising=False)
     import core.settings as settings_module
@@ -65,17 +65,10 @@ def test_polygon_us_cache_hit_skips_http(monkeypatch, postgres_pool):
     ]
     upsert_bars("US", "AAPL", rows)
 
-    calls = {"http": 0}
-
-    def fail_http(self, url, *args, **kwargs):
-        del self, url, args, kwargs
-        calls["http"] += 1
-        raise AssertionError("HTTP should not be called on cache hit")
-
-    monkeypatch.setattr("providers.polygon_us.PolygonUSProvider._http_get", fail_http)
+    http_stand_in.reset()
 
     provider = PolygonUSProvider()
     df = provider.fetch_ohlcv("AAPL", FIXTURE_DATE, offset_n_days=85, actual_offset_n_days=50)
     assert not df.empty
     assert len(df) >= 50
-    assert calls["http"] == 0
+    assert http_stand_in.requests == []
@@ -0,0 +1,143 @@
+"""Shared provider throttle: token bucket, global 429 pause and AIMD in-flight limit."""
+
+import asyncio
+from time import monotonic
+
+import pytest
+
+import cronjob
+from providers.http_transport import close_http_client, count_http_requests, get_json
+from providers.rate_limiter import ProviderThrottle
+
+
+def _throttle(**overrides) -> ProviderThrottle:
+    options = {
+        "rate_per_second": 0.0,
+        "min_concurrency": 1,
+        "max_concurrency": 8,
+        "target_latency_seconds": 1.0,
+        "initial_concurrency": 4,
+    }
+    options.update(overrides)
+    return ProviderThrottle("test", **options)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests_at_quota():
+    throttle = _throttle(rate_per_second=50.0, burst=1.0)
+
+    started = monotonic()
+    for _ in range(6):
+        await throttle.acquire()
+        throttle.release(0.01)
+    elapsed = monotonic() - started
+
+    # first token is the burst, the next five refill at 50/s
+    assert elapsed >= 0.09
+    stats = throttle.snapshot()
+    assert stats["requests"] == 6
+    assert stats["token_wait_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_in_flight_never_exceeds_limit():
+    throttle = _throttle(initial_concurrency=2, max_concurrency=2)
+    active = {"now": 0, "peak": 0}
+
+    async def request():
+        await throttle.acquire()
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        throttle.release(0.01)
+
+    await asyncio.gather(*(request() for _ in range(10)))
+
+    assert active["peak"] == 2
+    assert throttle.snapshot()["requests"] == 10
+
+
+def test_aimd_halves_on_throttle_and_grows_on_fast_responses():
+    throttle = _throttle(initial_concurrency=8, max_concurrency=8)
+    throttle._in_flight = 3
+
+    throttle.release(0.05, throttled=True)
+    throttle.release(5.0)  # slow, but inside the same decrease window
+    assert throttle.limit == 4
+
+    for _ in range(20):
+        throttle._in_flight += 1
+        throttle.release(0.05)
+    stats = throttle.snapshot()
+    # additive increase: about one slot per window of `limit` fast responses
+    assert 7 < throttle.limit < 8
+    assert stats["concurrency_decreases"] == 1
+    assert stats["limit_min"] == 4
+    assert stats["limit_max"] == 8
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_every_caller(http_stand_in):
+    throttle = _throttle()
+    served = []
+
+    def handler(path):
+        del path
+        served.append(monotonic())
+        if len(served) == 1:
+            return 429, {"status": "slow down"}, {"Retry-After": "0.3"}
+        return 200, {"status": "OK"}
+
+    http_stand_in.route("/v1/quota", handler=handler)
+    url = f"{http_stand_in.base_url}/v1/quota"
+
+    async def late_caller():
+        await asyncio.sleep(0.1)
+        return await get_json(url, "test", throttle=throttle)
+
+    try:
+        results = await asyncio.gather(
+            get_json(url, "test", throttle=throttle), late_caller()
+        )
+    finally:
+        await close_http_client()
+
+    assert results == [{"status": "OK"}, {"status": "OK"}]
+    # the late caller never asked for a retry, yet it waits out the shared pause
+    assert len(served) == 3
+    assert min(served[1:]) - served[0] >= 0.25
+    stats = throttle.snapshot()
+    assert stats["throttled"] == 1
+    assert stats["pauses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_request_counter_is_scoped_to_the_calling_task(http_stand_in):
+    http_stand_in.route("/v1/ok", {"status": "OK"})
+    url = f"{http_stand_in.base_url}/v1/ok"
+
+    async def fetch(times):
+        with count_http_requests() as counter:
+            for _ in range(times):
+                await get_json(url, "test")
+        return counter.requests
+
+    try:
+        counted = await asyncio.gather(fetch(1), fetch(3))
+    finally:
+        await close_http_client()
+
+    assert counted == [1, 3]
+
+
+def test_cron_report_summary_lists_throttle_stats():
+    throttle = _throttle()
+    throttle.pause(2.0)
+    report = cronjob.CronRunReport()
+    report.record_throttle_stats({"polygon": throttle.snapshot()})
+
+    summary = report.summary_text()
+
+    assert "Provider throttling:" in summary
+    assert "- polygon: requests=0, throttled=1, paused=2.0s (1 pauses)" in summary
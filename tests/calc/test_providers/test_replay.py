@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from providers.replay import ReplayProvider, synthetic_replay_dataset
+from scripts.build_replay_dataset import dataset_from_polygon_payloads
+from tests.helpers.constants import CALC_TICKERS, FIXTURE_DATE
+
+GOLDEN_DIR = Path(__file__).resolve().parents[2] / "fixtures" / "golden"
+OHLCV_DIR = Path(__file__).resolve().parents[2] / "fixtures" / "ohlcv"
+
+
+@pytest.fixture
+def recorded_provider(tmp_path):
+    payloads = {
+        ticker: json.loads((OHLCV_DIR / f"{ticker}.json").read_text(encoding="utf-8"))
+        for ticker in CALC_TICKERS
+    }
+    dataset_from_polygon_payloads(tmp_path, "US", payloads)
+    return ReplayProvider("US", tmp_path, probe_ticker="AAPL")
+
+
+@pytest.mark.parametrize("ticker", CALC_TICKERS)
+def test_replay_matches_golden_without_http(ticker, recorded_provider, http_stand_in):
+    golden = json.loads(
+        (GOLDEN_DIR / f"{ticker.lower()}_{FIXTURE_DATE}.json").read_text(encoding="utf-8")
+    )
+
+    # the stand-in serves the whole recording, so replay the whole window too
+    analytics = recorded_provider.fetch_ticker_analytics(
+        ticker, FIXTURE_DATE, offset_n_days=120
+    )
+
+    for field, expected in golden.items():
+        assert analytics[field] == pytest.approx(expected, rel=1e-6, abs=1e-6)
+    assert http_stand_in.requests == []
+
+
+@pytest.mark.asyncio
+async def test_synthetic_universe_serves_windows_and_sessions(tmp_path):
+    synthetic_replay_dataset(
+        tmp_path, "US", n_tickers=400, end_date=FIXTURE_DATE, extra_tickers=["SPY"]
+    )
+    provider = ReplayProvider("US", tmp_path)
+
+    universe = await provider.fetch_ticker_universe_async(FIXTURE_DATE)
+    arrays = await provider.fetch_ohlcv_window_arrays_async("R00001", FIXTURE_DATE)
+    sessions = await provider.resolve_session_dates_async(FIXTURE_DATE)
+
+    assert provider.probe_ticker == "SPY"
+    assert len(universe) == 401
+    assert arrays.session_date[-1] == np.datetime64(FIXTURE_DATE, "D")
+    assert np.all(np.diff(arrays.session_date.astype(np.int64)) > 0)
+    assert sessions == (FIXTURE_DATE, "2024-05-31")
+    # four short-history tickers lack the 50-bar window
+    short = [
+        ticker
+        for ticker in universe
+        if await provider.fetch_ohlcv_window_arrays_async(ticker, FIXTURE_DATE) is None
+    ]
+    assert len(short) == 4
+    assert await provider.fetch_ohlcv_window_arrays_async("NOPE", FIXTURE_DATE) is None
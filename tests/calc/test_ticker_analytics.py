@@ -4,7 +4,12 @@ from pathlib import Path
 import pytest
 
 from tests.helpers.constants import CALC_TICKERS, FIXTURE_DATE
-from utils.handle_calculations import compute_base_analytics, compute_extra_analytics
+from utils.handle_calculations import (
+    compute_analytics,
+    compute_base_analytics,
+    compute_extra_analytics,
+    get_ema_n,
+)
 from utils.handle_external_apis import get_ticker_analytics
 import pandas as pd
 
@@ -52,3 +57,43 @@ def test_compute_extra_analytics_mfi():
     extra = compute_extra_analytics(df)
     golden = _load_golden("AAPL")
     assert extra["mfi"] == pytest.approx(golden["mfi"], rel=1e-6, abs=1e-6)
+
+
+@pytest.mark.parametrize("ticker", CALC_TICKERS)
+def test_compute_analytics_matches_base_and_extra(ticker):
+    df = _ohlcv_dataframe(ticker).sample(frac=1, random_state=7)
+    combined = compute_analytics(df)
+    expected = {**compute_base_analytics(df), **compute_extra_analytics(df)}
+    assert list(combined) == list(expected)
+    assert combined == expected
+    golden = _load_golden(ticker)
+    for field, value in golden.items():
+        assert combined[field] == pytest.approx(value, rel=1e-6, abs=1e-6)
+
+
+def test_compute_extra_analytics_matches_pandas_reference():
+    # fixtures are newest first (Polygon sort=desc); the reference needs ascending
+    df = _ohlcv_dataframe("MSFT").sort_values(by="date")
+    extra = compute_extra_analytics(df)
+    close = df["close"]
+    volume = df["volume"]
+    assert extra["date"] == df["date"].iloc[-1]
+    assert extra["one_day_volume_change"] == pytest.approx(volume.pct_change().iloc[-1])
+    assert extra["three_day_avg_close_change"] == pytest.approx(
+        close.iloc[-3:].mean() / close.iloc[-4] - 1
+    )
+    for period in (20, 26, 50):
+        assert extra[f"ema{period}"] == pytest.approx(get_ema_n(close, period).iloc[-1])
+    assert extra["macd_20_sessions_ago"] == pytest.approx(
+        (get_ema_n(close, 32) - get_ema_n(close, 46)).iloc[-1], abs=1e-9
+    )
+    assert all(flag in ("A", "B") for flag in extra["ema_50over20"])
+    assert len(extra["ema_50over20"]) == 3
+
+
+def test_compute_base_analytics_short_window_reports_zeros():
+    df = _ohlcv_dataframe("AAPL").iloc[-2:]
+    base = compute_base_analytics(df)
+    assert base["three_day_avg_mf"] == 0
+    assert base["three_day_avg_volume"] == 0
+    assert len(base["bounce"]) == 1
@@ -0,0 +1,66 @@
+"""Markets run concurrently, each with its own report slice."""
+
+import asyncio
+
+import pytest
+
+import cronjob
+from tests.helpers.stubs import stub_cron_runtime
+
+
+async def _noop_async(*args, **kwargs):
+    del args, kwargs
+    return None
+
+
+@pytest.fixture
+def cron_stubs(monkeypatch):
+    opened = []
+
+    monkeypatch.setattr(cronjob, "open_cron_runtime", stub_cron_runtime(opened))
+    monkeypatch.setattr(cronjob.mongo_storage_monitor, "run_monitor", _noop_async)
+    monkeypatch.setattr(cronjob, "notify_developer", lambda **kwargs: None)
+    monkeypatch.setattr(cronjob, "clear_ticker_universe_cache", lambda: None)
+    cronjob.reset_cron_failed()
+    yield opened
+    cronjob.reset_cron_failed()
+
+
+@pytest.mark.asyncio
+async def test_cronjob_overlaps_markets_in_one_runtime(monkeypatch, cron_stubs):
+    running, overlap = set(), []
+
+    async def unpublished_dates_stub(pool, market):
+        del pool
+        return ["2024-06-03", "2024-06-04"] if market == "US" else ["2024-06-04"]
+
+    async def run_crud_stub(
+        date_to_insert, date_to_remove, market, pg_pool=None, report=None, runtime=None
+    ):
+        del date_to_remove, pg_pool, runtime
+        assert (market, date_to_insert) not in running
+        same_market = [item for item in running if item[0] == market]
+        assert not same_market, "sessions of one market must not overlap"
+        running.add((market, date_to_insert))
+        if len({item[0] for item in running}) > 1:
+            overlap.append(True)
+        await asyncio.sleep(0.05)
+        running.discard((market, date_to_insert))
+        if market == "TO":
+            report.record(market, date_to_insert, "track", "boom")
+        return "ok"
+
+    monkeypatch.setattr(cronjob, "unpublished_session_dates", unpublished_dates_stub)
+    monkeypatch.setattr(cronjob, "run_crud_ops", run_crud_stub)
+    report = cronjob.CronRunReport()
+
+    await cronjob.cronjob(markets=["US", "TO"], report=report)
+
+    assert overlap
+    assert cron_stubs == [2]
+    assert set(report.market_seconds) == {"US", "TO"}
+    assert [item.phase for item in report.market_errors("TO")] == ["track"]
+    assert report.market_errors("US") == []
+    summary = report.summary_text()
+    assert "Market wall time:" in summary
+    assert "0 phase errors" in summary and "1 phase errors" in summary
@@ -3,6 +3,7 @@
 import pytest
 
 import cronjob
+from tests.helpers.stubs import stub_cron_runtime
 
 
 async def _noop_async(*args, **kwargs):
@@ -29,19 +30,15 @@ async def test_cronjob_continues_after_run_crud_ops_failure(monkeypatch):
         market,
         pg_pool=None,
         report=None,
+        runtime=None,
     ):
-        del date_to_insert, date_to_remove, pg_pool, report
+        del date_to_insert, date_to_remove, pg_pool, report, runtime
         calls.append(market)
         if market == "US":
             raise RuntimeError("US failed")
         return "ok"
 
-    monkeypatch.setattr(cronjob, "connect_postgres", _noop_async)
-    monkeypatch.setattr(cronjob, "close_postgres", _noop_async)
-    monkeypatch.setattr(cronjob, "get_postgres_pool", _noop_async)
-    monkeypatch.setattr(cronjob, "connect_mongo", _noop_async)
-    monkeypatch.setattr(cronjob, "close_mongo", _noop_async)
-    monkeypatch.setattr(cronjob, "get_mongo_database", _noop_async)
+    monkeypatch.setattr(cronjob, "open_cron_runtime", stub_cron_runtime())
     monkeypatch.setattr(cronjob.mongo_storage_monitor, "run_monitor", _noop_async)
     monkeypatch.setattr(cronjob, "unpublished_session_dates", unpublished_dates_stub)
     monkeypatch.setattr(cronjob, "run_crud_ops", run_crud_stub)
@@ -62,8 +59,8 @@ async def test_run_crud_ops_ingest_failure_skips_publish(monkeypatch):
     async def get_db_stub():
         return object()
 
-    async def ingest_fail(conn, date, market="US"):
-        del conn, date, market
+    async def ingest_fail(conn, date, market="US", timings=None):
+        del conn, date, market, timings
         raise RuntimeError("ingest failed")
 
     monkeypatch.setattr(cronjob, "connect_mongo", _noop_async)
@@ -105,8 +102,8 @@ async def test_run_crud_ops_publish_failure_keeps_ingest_message(monkeypatch):
     async def get_db_stub():
         return object()
 
-    async def ingest_stub(conn, date, market="US"):
-        del conn, date, market
+    async def ingest_stub(conn, date, market="US", timings=None):
+        del conn, date, market, timings
         return "ingested"
 
     async def track_stub(conn, date, market="US"):
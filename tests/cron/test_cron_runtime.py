@@ -0,0 +1,186 @@
+"""Cron runtime opens each pool once, warms them together and reports usage."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import core.settings as settings_module
+import cronjob
+import services.cron_runtime as cron_runtime
+from services.cron_runtime import MongoPoolMonitor
+
+
+class _AsyncpgPoolStub:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.busy = 0
+
+    def get_size(self):
+        return self.max_size
+
+    def get_idle_size(self):
+        return self.max_size - self.busy
+
+    def get_max_size(self):
+        return self.max_size
+
+
+class _SyncPoolStub:
+    def get_stats(self):
+        return {"pool_max": 10, "requests_num": 4, "requests_wait_ms": 250}
+
+
+@pytest.fixture
+def runtime_stubs(monkeypatch):
+    calls = {"opened": [], "closed": [], "warming": 0, "peak_warming": 0}
+
+    async def warming(name):
+        calls["warming"] += 1
+        calls["peak_warming"] = max(calls["peak_warming"], calls["warming"])
+        await asyncio.sleep(0.02)
+        calls["warming"] -= 1
+        calls["opened"].append(name)
+
+    async def warm_mongo(max_pool_size, listeners):
+        assert isinstance(listeners[0], MongoPoolMonitor)
+        await warming(("mongo", max_pool_size))
+        return object()
+
+    async def warm_postgres(max_size):
+        await warming(("postgres", max_size))
+        return _AsyncpgPoolStub(max_size)
+
+    async def warm_sync_pool(max_size):
+        await warming(("ohlcv_sync", max_size))
+        return _SyncPoolStub()
+
+    async def warm_redis():
+        await warming(("redis", None))
+        return object()
+
+    async def close_stub(name):
+        calls["closed"].append(name)
+
+    async def no_mongo():
+        return None
+
+    monkeypatch.setattr(settings_module, "MONGO_MAX_CONNECTIONS", 8)
+    monkeypatch.setattr(settings_module, "PG_POOL_MAX_SIZE", 10)
+    monkeypatch.setattr(settings_module, "OHLCV_SYNC_POOL_MAX_SIZE", 5)
+    monkeypatch.setattr(settings_module, "CRON_POOL_SAMPLE_SECONDS", 0.01)
+    monkeypatch.setattr(cron_runtime, "_warm_mongo", warm_mongo)
+    monkeypatch.setattr(cron_runtime, "_warm_postgres", warm_postgres)
+    monkeypatch.setattr(cron_runtime, "_warm_sync_pool", warm_sync_pool)
+    monkeypatch.setattr(cron_runtime, "_warm_redis", warm_redis)
+    monkeypatch.setattr(cron_runtime, "get_http_client", lambda: object())
+    monkeypatch.setattr(cron_runtime, "close_http_client", lambda: close_stub("http"))
+    monkeypatch.setattr(
+        cron_runtime, "shutdown_sync_transport", lambda: calls["closed"].append("sync_http")
+    )
+    monkeypatch.setattr(cron_runtime, "get_mongo_database", no_mongo)
+    monkeypatch.setattr(cron_runtime, "close_postgres", lambda: close_stub("postgres"))
+    monkeypatch.setattr(
+        cron_runtime, "close_ohlcv_sync_pool", lambda: calls["closed"].append("ohlcv_sync")
+    )
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_open_cron_runtime_warms_scaled_pools_in_parallel(runtime_stubs):
+    async with cron_runtime.open_cron_runtime(2) as runtime:
+        runtime.pg_pool.busy = 20
+        await asyncio.sleep(0.05)
+        stats = runtime.utilisation()
+
+    assert sorted(runtime_stubs["opened"]) == [
+        ("mongo", 16),
+        ("ohlcv_sync", 10),
+        ("postgres", 20),
+        ("redis", None),
+    ]
+    assert runtime_stubs["peak_warming"] == 4
+    assert runtime_stubs["closed"] == ["http", "sync_http", "postgres", "ohlcv_sync"]
+    assert stats["postgres"]["peak_in_use"] == 20
+    assert stats["postgres"]["saturated_samples"] >= 1
+    assert stats["ohlcv_sync"]["checkouts"] == 4
+    assert stats["ohlcv_sync"]["wait_seconds"] == pytest.approx(0.25)
+    assert stats["mongo"]["max_size"] == 16
+    assert set(runtime.warmup_seconds) == {"mongo", "postgres", "ohlcv_sync", "redis"}
+
+
+def test_mongo_pool_monitor_times_checkout_waits():
+    monitor = MongoPoolMonitor()
+
+    def checkout(hold_seconds):
+        monitor.connection_check_out_started(None)
+        time.sleep(hold_seconds)
+        monitor.connection_checked_out(None)
+
+    threads = [threading.Thread(target=checkout, args=(0.02,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    monitor.connection_checked_in(None)
+
+    stats = monitor.stats(max_size=3)
+    assert stats["checkouts"] == 3
+    assert stats["peak_in_use"] == 3
+    assert stats["wait_seconds"] >= 0.06
+    assert stats["max_wait_seconds"] >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_run_crud_ops_uses_runtime_connections(monkeypatch):
+    mongo = object()
+    seen = {}
+
+    async def connect_unexpected(*args, **kwargs):
+        raise AssertionError("runtime owns the Mongo client")
+
+    async def published_stub(pool, date, market):
+        seen["pool"] = pool
+        return False
+
+    async def ingest_stub(conn, date, market="US", timings=None):
+        seen["conn"] = conn
+        raise RuntimeError("stop after ingest")
+
+    runtime = cron_runtime.CronRuntime(mongo=mongo, pg_pool="pg-pool")
+    monkeypatch.setattr(cronjob, "connect_mongo", connect_unexpected)
+    monkeypatch.setattr(cronjob, "is_session_published", published_stub)
+    monkeypatch.setattr(
+        cronjob.analytics_service, "ingest_base_analytics_for_market", ingest_stub
+    )
+    monkeypatch.setattr(cronjob, "notify_developer", lambda **kwargs: None)
+
+    report = cronjob.CronRunReport()
+    await cronjob.run_crud_ops("2024-06-03", "2024-03-04", "US", report=report, runtime=runtime)
+    cronjob.reset_cron_failed()
+
+    assert seen == {"pool": "pg-pool", "conn": mongo}
+    assert [item.phase for item in report.errors] == ["ingest"]
+
+
+def test_report_lists_pool_utilisation():
+    report = cronjob.CronRunReport()
+    report.record_resource_stats(
+        {
+            "mongo": {
+                "max_size": 16,
+                "peak_in_use": 9,
+                "checkouts": 120,
+                "wait_seconds": 0.5,
+                "max_wait_seconds": 0.1,
+                "warmup_seconds": 0.2,
+            },
+            "redis": {"warmup_seconds": 0.01},
+        }
+    )
+
+    summary = report.summary_text()
+    assert "Pool utilisation:" in summary
+    assert "- mongo: peak=9/16, checkouts=120, wait=0.5s" in summary
+    assert "- redis: warmup=0.01s" in summary
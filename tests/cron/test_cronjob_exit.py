@@ -3,6 +3,7 @@
 import pytest
 
 import cronjob
+from tests.helpers.stubs import stub_cron_runtime
 
 
 async def _noop_async(*args, **kwargs):
@@ -32,12 +33,7 @@ async def test_cronjob_sets_failed_flag_on_run_crud_ops_error(monkeypatch):
     def notify_stub(**kwargs):
         notified.append(kwargs)
 
-    monkeypatch.setattr(cronjob, "connect_postgres", _noop_async)
-    monkeypatch.setattr(cronjob, "close_postgres", _noop_async)
-    monkeypatch.setattr(cronjob, "get_postgres_pool", _noop_async)
-    monkeypatch.setattr(cronjob, "connect_mongo", _noop_async)
-    monkeypatch.setattr(cronjob, "close_mongo", _noop_async)
-    monkeypatch.setattr(cronjob, "get_mongo_database", _noop_async)
+    monkeypatch.setattr(cronjob, "open_cron_runtime", stub_cron_runtime())
     monkeypatch.setattr(cronjob.mongo_storage_monitor, "run_monitor", _noop_async)
     monkeypatch.setattr(cronjob, "unpublished_session_dates", unpublished_dates_stub)
     monkeypatch.setattr(cronjob, "run_crud_ops", run_crud_fail)
@@ -62,9 +58,7 @@ async def test_cronjob_skips_market_when_latest_sessions_are_published(monkeypat
         del args, kwargs
         raise AssertionError("published market must not ingest")
 
-    monkeypatch.setattr(cronjob, "connect_postgres", _noop_async)
-    monkeypatch.setattr(cronjob, "close_postgres", _noop_async)
-    monkeypatch.setattr(cronjob, "get_postgres_pool", _noop_async)
+    monkeypatch.setattr(cronjob, "open_cron_runtime", stub_cron_runtime())
     monkeypatch.setattr(cronjob.mongo_storage_monitor, "run_monitor", _noop_async)
     monkeypatch.setattr(cronjob, "unpublished_session_dates", no_work)
     monkeypatch.setattr(cronjob, "run_crud_ops", run_crud_unexpected)
@@ -86,9 +80,7 @@ async def test_run_explicit_dates_sets_failed_flag_on_error(monkeypatch):
     def notify_stub(**kwargs):
         notified.append(kwargs)
 
-    monkeypatch.setattr(cronjob, "connect_postgres", _noop_async)
-    monkeypatch.setattr(cronjob, "close_postgres", _noop_async)
-    monkeypatch.setattr(cronjob, "get_postgres_pool", _noop_async)
+    monkeypatch.setattr(cronjob, "open_cron_runtime", stub_cron_runtime())
     monkeypatch.setattr(cronjob, "run_crud_ops", run_crud_fail)
     monkeypatch.setattr(cronjob, "notify_developer", notify_stub)
 
@@ -112,7 +104,7 @@ def test_main_exits_nonzero_when_cron_failed(monkeypatch):
     monkeypatch.setattr(
         cronjob,
         "_parse_args",
-        lambda: type("Args", (), {"dates": [], "markets": None})(),
+        lambda: type("Args", (), {"dates": [], "markets": None, "retry_skipped": False})(),
     )
 
     with pytest.raises(SystemExit) as exc_info:
@@ -0,0 +1,166 @@
+"""Ingest splits bar loading (I/O) from indicator math on the compute pool."""
+
+import asyncio
+import json
+
+import pytest
+
+import core.settings as settings_module
+import cronjob
+import services.analytics_service as analytics_service
+import services.indicator_state as indicator_state
+from services.compute_pool import compute_base_analytics_in_pool, shutdown_compute_pool
+from services.stage_timings import StageTimings
+from tests.helpers.constants import FIXTURE_DATE as SESSION
+from tests.helpers.ingest import bar_arrays, stub_ingest
+from utils.panel_calculations import compute_base_analytics_for_windows
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+@pytest.mark.asyncio
+async def test_compute_pool_matches_panel_compute(monkeypatch, workers):
+    monkeypatch.setattr(settings_module, "CRON_CPU_WORKERS", workers)
+    monkeypatch.setattr(settings_module, "CRON_COMPUTE_CHUNK_SIZE", 2)
+    windows = {f"T{i}": bar_arrays(i, sessions=40 + i) for i in range(5)}
+
+    try:
+        computed = await compute_base_analytics_in_pool(windows)
+    finally:
+        shutdown_compute_pool()
+
+    expected = compute_base_analytics_for_windows(windows)
+    assert list(computed) == list(windows)
+    for ticker, analytics in expected.items():
+        assert computed[ticker]["macd"] == pytest.approx(analytics["macd"])
+        assert computed[ticker]["bounce"] == pytest.approx(analytics["bounce"])
+        assert computed[ticker]["date"] == analytics["date"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_fetches_missing_windows_and_times_stages(monkeypatch):
+    stubs = stub_ingest(
+        monkeypatch,
+        ["AAA", "BBB", "STALE", "NONE"],
+        cached=lambda chunk: {"AAA": bar_arrays(1), "BBB": bar_arrays(2)},
+        fetch=lambda ticker: (
+            bar_arrays(3, last_date="2024-05-31") if ticker == "STALE" else None
+        ),
+    )
+
+    timings = StageTimings()
+    message = await analytics_service.ingest_base_analytics_for_market(
+        object(), SESSION, market="US", timings=timings
+    )
+
+    assert sorted(stubs.fetched) == ["NONE", "STALE"]
+    assert stubs.inserted_tickers == ["AAA", "BBB"]
+    assert all(row["market"] == "US" for row in stubs.inserted)
+    assert "skipped STALE" in message
+    assert {"bar_load", "fetch", "compute", "insert"} <= set(timings.seconds)
+    assert timings.counts["universe"] == {"tickers": 4, "skipped": 0}
+    assert timings.counts["bar_load"] == {"tickers": 4, "cache_hits": 2}
+    assert timings.counts["fetch"]["tickers"] == 2
+    assert timings.counts["fetch"]["http_calls"] == 0
+    assert timings.counts["insert"] == {"rows_written": 2, "updated": 0, "unchanged": 0}
+
+
+@pytest.mark.asyncio
+async def test_stage_timings_report_wall_time_of_overlapping_workers():
+    timings = StageTimings()
+
+    async def worker():
+        with timings.stage("fetch"):
+            await asyncio.sleep(0.1)
+
+    await asyncio.gather(*(worker() for _ in range(4)))
+
+    # four overlapping 0.1s runs span about 0.1s of wall time, not 0.4s
+    assert 0.1 <= timings.seconds["fetch"] < 0.3
+
+
+def test_cron_report_summary_lists_stage_timings():
+    report = cronjob.CronRunReport()
+    timings = StageTimings()
+    timings.add("compute", 1.234)
+    report.record_stage_timings("US", SESSION, timings)
+
+    summary = report.summary_text()
+
+    assert summary.startswith("Cron run completed with no recorded phase errors.")
+    assert "- US 2024-06-03 [compute]: 1.23s" in summary
+
+
+def test_cron_report_emits_spans_with_counts_as_json():
+    report = cronjob.CronRunReport()
+    timings = StageTimings()
+    timings.add("insert", 0.5)
+    timings.count("insert", "rows_written", 120)
+    report.record_stage_timings("US", SESSION, timings)
+    report.record_span("US", "n/a", "session_probe", 0.1, {"sessions": 1})
+
+    payload = json.loads(report.spans_json())
+
+    assert payload["run_id"] == report.run_id
+    assert payload["spans"] == [
+        {"market": "US", "date": SESSION, "phase": "insert", "seconds": 0.5,
+         "counts": {"rows_written": 120}},
+        {"market": "US", "date": "n/a", "phase": "session_probe", "seconds": 0.1,
+         "counts": {"sessions": 1}},
+    ]
+    assert "[insert]: 0.5s (rows_written=120)" in report.summary_text()
+
+
+@pytest.fixture
+def state_ingest(monkeypatch):
+    monkeypatch.setattr(
+        analytics_service, "update_indicator_states", lambda market, date, tickers: {}
+    )
+    # the global conftest turns indicator state off; these runs keep it on
+    return stub_ingest(
+        monkeypatch,
+        ["AAA", "BBB"],
+        cached=lambda chunk: {
+            "AAA": bar_arrays(1, sessions=58),
+            "BBB": bar_arrays(2, sessions=61),
+        },
+        settings={"INDICATOR_STATE_DISABLED": False, "OHLCV_CACHE_DISABLED": False},
+    )
+
+
+@pytest.mark.asyncio
+async def test_ingest_stores_states_for_full_window_chunks(monkeypatch, state_ingest):
+    saved = {}
+
+    def save_stub(market, states):
+        del market
+        saved.update(states)
+        return len(states)
+
+    monkeypatch.setattr(indicator_state, "save_indicator_states", save_stub)
+
+    timings = StageTimings()
+    await analytics_service.ingest_base_analytics_for_market(
+        object(), SESSION, market="US", timings=timings
+    )
+
+    assert sorted(state_ingest.inserted_tickers) == ["AAA", "BBB"]
+    assert sorted(saved) == ["AAA", "BBB"]
+    assert len(saved["BBB"].window_dates) == 61
+    assert timings.counts["state_save"] == {"rows_written": 2}
+
+
+@pytest.mark.asyncio
+async def test_ingest_inserts_when_the_state_save_fails(monkeypatch, state_ingest):
+    def failing_save(market, states):
+        del market, states
+        raise RuntimeError("indicator_state unavailable")
+
+    monkeypatch.setattr(indicator_state, "save_indicator_states", failing_save)
+
+    timings = StageTimings()
+    await analytics_service.ingest_base_analytics_for_market(
+        object(), SESSION, market="US", timings=timings
+    )
+
+    assert sorted(state_ingest.inserted_tickers) == ["AAA", "BBB"]
+    assert timings.counts["state_save"] == {"rows_written": 0}
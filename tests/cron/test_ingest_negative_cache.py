@@ -0,0 +1,76 @@
+"""Ingest skips tickers recorded as having no usable data for the session."""
+
+import pytest
+
+import services.analytics_service as analytics_service
+from db.crud.ticker_skips import SKIP_DATE_MISMATCH, SKIP_NOT_ENOUGH_BARS
+from tests.helpers.constants import FIXTURE_DATE as SESSION
+from tests.helpers.ingest import bar_arrays, stub_ingest
+
+
+def _fetch(ticker):
+    if ticker == "STALE":
+        return bar_arrays(3, last_date="2024-05-31")
+    if ticker == "SKIPME":
+        return bar_arrays(4)
+    return None
+
+
+@pytest.fixture
+def negative_cache(monkeypatch):
+    stubs = stub_ingest(
+        monkeypatch,
+        ["AAA", "SKIPME", "NONE", "STALE"],
+        cached=lambda chunk: {"AAA": bar_arrays(1)},
+        fetch=_fetch,
+        settings={"TICKER_SKIP_CACHE_DISABLED": False, "CRON_RETRY_SKIPPED_TICKERS": False},
+    )
+    recorded = {}
+
+    def record_stub(market, date, reasons):
+        assert (market, date) == ("US", SESSION)
+        recorded.update(reasons)
+        return len(reasons)
+
+    monkeypatch.setattr(
+        analytics_service,
+        "fetch_skipped_tickers",
+        lambda market, date, mismatch_retry_minutes=0: {"SKIPME": SKIP_NOT_ENOUGH_BARS},
+    )
+    monkeypatch.setattr(analytics_service, "record_skipped_tickers", record_stub)
+    return stubs, recorded
+
+
+@pytest.mark.asyncio
+async def test_ingest_skips_known_tickers_and_records_new_ones(negative_cache):
+    message = await analytics_service.ingest_base_analytics_for_market(
+        object(), SESSION, market="US"
+    )
+
+    stubs, recorded = negative_cache
+    assert sorted(stubs.fetched) == ["NONE", "STALE"]
+    assert stubs.inserted_tickers == ["AAA"]
+    assert recorded == {
+        "NONE": SKIP_NOT_ENOUGH_BARS,
+        "STALE": SKIP_DATE_MISMATCH,
+    }
+    assert "skipped 1 tickers without usable data" in message
+    assert "recorded 2 tickers" in message
+
+
+@pytest.mark.asyncio
+async def test_ingest_retry_skipped_override_fetches_known_tickers(
+    monkeypatch, negative_cache
+):
+    def fetch_skips_unexpected(*args, **kwargs):
+        raise AssertionError("override must not consult the negative cache")
+
+    monkeypatch.setattr(analytics_service, "fetch_skipped_tickers", fetch_skips_unexpected)
+
+    await analytics_service.ingest_base_analytics_for_market(
+        object(), SESSION, market="US", retry_skipped=True
+    )
+
+    stubs, _ = negative_cache
+    assert sorted(stubs.fetched) == ["NONE", "SKIPME", "STALE"]
+    assert sorted(stubs.inserted_tickers) == ["AAA", "SKIPME"]
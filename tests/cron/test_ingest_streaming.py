@@ -0,0 +1,70 @@
+"""Streaming ingest writes each insert batch as soon as it fills."""
+
+import pytest
+
+import services.analytics_service as analytics_service
+from db.crud.analytics import AnalyticsWriteResult
+from tests.helpers.constants import FIXTURE_DATE as SESSION
+from tests.helpers.ingest import bar_arrays, stub_ingest
+
+TICKERS = [f"T{i}" for i in range(7)]
+
+
+@pytest.fixture
+def streaming_ingest(monkeypatch):
+    # even tickers come from the bar store, odd ones need a per-ticker fetch
+    return stub_ingest(
+        monkeypatch,
+        TICKERS,
+        cached=lambda chunk: {
+            ticker: bar_arrays(int(ticker[1:])) for ticker in chunk if int(ticker[1:]) % 2 == 0
+        },
+        fetch=lambda ticker: bar_arrays(int(ticker[1:])),
+        settings={
+            "CRON_MAX_WORKERS": 3,
+            "CRON_COMPUTE_CHUNK_SIZE": 2,
+            "CRON_INSERT_BATCH_SIZE": 3,
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_ingest_inserts_full_batches_while_streaming(monkeypatch, streaming_ingest):
+    batches = []
+
+    async def insert_stub(conn, rows, batch_size=500):
+        del conn
+        assert batch_size == 3
+        batches.append([row["ticker"] for row in rows])
+        return AnalyticsWriteResult(inserted=len(rows))
+
+    monkeypatch.setattr(analytics_service, "upsert_analytics_batch", insert_stub)
+
+    message = await analytics_service.ingest_base_analytics_for_market(
+        object(), SESSION, market="US"
+    )
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert sorted(ticker for batch in batches for ticker in batch) == TICKERS
+    assert "inserted 7 documents in 3 batches" in message
+
+
+@pytest.mark.asyncio
+async def test_ingest_insert_failure_keeps_written_batches(monkeypatch, streaming_ingest):
+    written = []
+
+    async def insert_stub(conn, rows, batch_size=500):
+        del conn, batch_size
+        if written:
+            raise RuntimeError("mongo went away")
+        written.extend(rows)
+        return AnalyticsWriteResult(inserted=len(rows))
+
+    monkeypatch.setattr(analytics_service, "upsert_analytics_batch", insert_stub)
+
+    with pytest.raises(RuntimeError, match="mongo went away"):
+        await analytics_service.ingest_base_analytics_for_market(
+            object(), SESSION, market="US"
+        )
+
+    assert len(written) == 3
@@ -1,52 +1,130 @@
-"""Tests for analytics batch insert behavior."""
+"""Tests for the idempotent analytics batch writer."""
 
 import pytest
+from pymongo.errors import BulkWriteError
 
 from core.settings import MONGO_DB_NAME
-from db.crud.analytics import MONGO_COLLECTION_NAME, insert_analytics_batch
+from db.crud.analytics import (
+    MONGO_COLLECTION_NAME,
+    AnalyticsWriteResult,
+    upsert_analytics_batch,
+)
+from db.mongo_indexes import ANALYTICS_KEY_INDEX_NAME, ensure_mongo_indexes
 from utils.handle_datetimes import get_epoch
 
+TICKERS = ["UPSTEST", "UPSTEST2", "UPSTEST3"]
+
 
 @pytest.mark.asyncio
-async def test_insert_analytics_batch_counts_partial_inserts_on_duplicate(mongo_client):
+async def test_upsert_analytics_batch_counts_inserted_updated_unchanged(mongo_client):
     collection = mongo_client[MONGO_DB_NAME][MONGO_COLLECTION_NAME]
-    await collection.delete_many({"ticker": {"$in": ["DUPTEST", "DUPTEST2"]}})
-    await collection.create_index(
-        [("ticker", 1), ("date", 1), ("market", 1)],
-        unique=True,
-        name="test_ticker_date_market_unique",
-    )
+    await collection.delete_many({"ticker": {"$in": TICKERS}})
+    assert ANALYTICS_KEY_INDEX_NAME in await ensure_mongo_indexes(mongo_client)
 
     epoch = get_epoch("2024-06-03")
-    existing = {
-        "ticker": "DUPTEST",
-        "date": epoch,
-        "market": "US",
-        "macd": 1.0,
-        "volume": 100,
-    }
-    await collection.insert_one(existing)
+    changed = {"ticker": "UPSTEST", "date": epoch, "market": "US", "macd": 1.0}
+    same = {"ticker": "UPSTEST2", "date": epoch, "market": "US", "macd": 2.0}
+    await collection.insert_many([dict(changed), dict(same)])
+
+    batch = [
+        {**changed, "macd": 1.5},
+        dict(same),
+        {"ticker": "UPSTEST3", "date": epoch, "market": "US", "macd": 3.0},
+    ]
+
+    result = await upsert_analytics_batch(mongo_client, batch, batch_size=2, concurrency=2)
+    assert result == AnalyticsWriteResult(inserted=1, updated=1, unchanged=1)
+    assert (await collection.find_one({"ticker": "UPSTEST"}))["macd"] == 1.5
+
+    rerun = await upsert_analytics_batch(mongo_client, batch, batch_size=2)
+    assert rerun == AnalyticsWriteResult(unchanged=3)
+    assert await collection.count_documents({"ticker": {"$in": TICKERS}}) == 3
+
+    await collection.delete_many({"ticker": {"$in": TICKERS}})
+
 
+@pytest.mark.asyncio
+async def test_upsert_analytics_batch_keeps_last_doc_per_key(mongo_client):
+    collection = mongo_client[MONGO_DB_NAME][MONGO_COLLECTION_NAME]
+    await collection.delete_many({"ticker": {"$in": TICKERS}})
+
+    epoch = get_epoch("2024-06-03")
     batch = [
-        existing,
-        {
-            "ticker": "DUPTEST",
-            "date": epoch,
-            "market": "US",
-            "macd": 2.0,
-            "volume": 200,
-        },
-        {
-            "ticker": "DUPTEST2",
-            "date": epoch,
-            "market": "US",
-            "macd": 3.0,
-            "volume": 300,
-        },
+        {"ticker": "UPSTEST", "date": epoch, "macd": 1.0},
+        {"ticker": "UPSTEST", "date": epoch, "market": "US", "macd": 2.0},
     ]
 
-    inserted = await insert_analytics_batch(mongo_client, batch, batch_size=10)
-    assert inserted == 1
-    assert await collection.count_documents({"ticker": "DUPTEST2"}) == 1
+    result = await upsert_analytics_batch(mongo_client, batch)
+    assert result.written == 1
+    stored = await collection.find({"ticker": "UPSTEST"}).to_list(None)
+    assert [(doc["market"], doc["macd"]) for doc in stored] == [("US", 2.0)]
+
+    await collection.delete_many({"ticker": {"$in": TICKERS}})
+
+
+class _BulkResponse:
+    def __init__(self, upserted=0, modified=0, matched=0):
+        self.upserted_count = upserted
+        self.modified_count = modified
+        self.matched_count = matched
+
+
+class _FailingCollection:
+    """Raises the queued BulkWriteError details, then answers with responses."""
+
+    def __init__(self, failures, response=None):
+        self.failures = list(failures)
+        self.response = response or _BulkResponse()
+        self.calls = []
+
+    async def bulk_write(self, operations, ordered=True):
+        assert not ordered
+        self.calls.append(operations)
+        if self.failures:
+            raise BulkWriteError(self.failures.pop(0))
+        return self.response
+
+
+def _conn(collection):
+    return {MONGO_DB_NAME: {MONGO_COLLECTION_NAME: collection}}
+
+
+def _docs():
+    epoch = get_epoch("2024-06-03")
+    return [{"ticker": ticker, "date": epoch, "market": "US"} for ticker in TICKERS]
+
+
+@pytest.mark.asyncio
+async def test_upsert_analytics_batch_retries_duplicate_key_races_once():
+    collection = _FailingCollection(
+        [{"nUpserted": 2, "writeErrors": [{"index": 1, "code": 11000}]}],
+        response=_BulkResponse(matched=1, modified=1),
+    )
+
+    result = await upsert_analytics_batch(_conn(collection), _docs())
+
+    assert result == AnalyticsWriteResult(inserted=2, updated=1)
+    assert len(collection.calls) == 2
+    assert collection.calls[1] == [collection.calls[0][1]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "failures",
+    [
+        # a write that is not a duplicate-key race is a lost row
+        [{"nUpserted": 2, "writeErrors": [{"index": 0, "code": 121}]}],
+        # so is a race lost twice
+        [
+            {"nUpserted": 2, "writeErrors": [{"index": 0, "code": 11000}]},
+            {"writeErrors": [{"index": 0, "code": 11000}]},
+        ],
+    ],
+)
+async def test_upsert_analytics_batch_raises_write_errors(failures):
+    collection = _FailingCollection(failures)
+
+    with pytest.raises(BulkWriteError):
+        await upsert_analytics_batch(_conn(collection), _docs())
 
-    await collection.delete_many({"ticker": {"$in": ["DUPTEST", "DUPTEST2"]}})
+    assert len(collection.calls) == len(failures)
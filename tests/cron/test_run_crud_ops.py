@@ -35,8 +35,8 @@ async def test_run_crud_ops_happy_path(monkeypatch):
     async def get_db_stub():
         return object()
 
-    async def ingest_stub(conn, date, market="US"):
-        del conn, date, market
+    async def ingest_stub(conn, date, market="US", timings=None):
+        del conn, date, market, timings
         calls["order"].append("ingest")
         return "ingested"
 
@@ -103,8 +103,8 @@ async def test_run_crud_ops_publish_gate_skips_delete(monkeypatch):
     async def get_db_stub():
         return object()
 
-    async def ingest_stub(conn, date, market="US"):
-        del conn, date, market
+    async def ingest_stub(conn, date, market="US", timings=None):
+        del conn, date, market, timings
         calls["order"].append("ingest")
         return "ingested"
 
@@ -160,8 +160,8 @@ async def test_run_crud_ops_idempotent_when_repeated(monkeypatch):
     async def get_db_stub():
         return object()
 
-    async def ingest_stub(conn, date, market="US"):
-        del conn, date, market
+    async def ingest_stub(conn, date, market="US", timings=None):
+        del conn, date, market, timings
         return "ingested"
 
     async def track_stub(conn, date, market="US"):
@@ -0,0 +1,104 @@
+"""Session calendar: trading-day arithmetic and network-free session probes."""
+
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+import core.settings as settings_module
+import services.session_calendar as session_calendar
+from providers.polygon_us import PolygonUSProvider
+from services.session_calendar import SessionCalendar, calendar_from_window
+
+# weekdays 2024-05-20 .. 2024-06-03 without Memorial Day
+SESSIONS = [
+    day.date()
+    for day in pd.bdate_range("2024-05-20", "2024-06-03")
+    if day.date() != date(2024, 5, 27)
+]
+
+
+@pytest.fixture(autouse=True)
+def _clear_calendar_cache():
+    session_calendar.clear_session_calendar_cache()
+    yield
+    session_calendar.clear_session_calendar_cache()
+
+
+def _calendar() -> SessionCalendar:
+    return SessionCalendar("US", tuple(SESSIONS), date(2024, 5, 20), date(2024, 6, 3))
+
+
+def test_sessions_before_counts_trading_days():
+    calendar = _calendar()
+
+    assert calendar.sessions_before("2024-06-02", 2) == [date(2024, 5, 30), date(2024, 5, 31)]
+    assert calendar.session_n_before("2024-06-03", 5) == date(2024, 5, 24)
+    assert calendar.session_n_before("2024-05-28", 1) == date(2024, 5, 24)
+    assert calendar.sessions_before("2024-06-04", 1) is None
+    assert calendar.sessions_before("2024-05-22", 5) is None
+
+
+def test_missing_ranges_are_exact_sessions():
+    calendar = _calendar()
+    present = [day for day in SESSIONS if day not in (date(2024, 5, 29), date(2024, 5, 30))]
+
+    assert calendar.missing_ranges(present, "2024-05-20", "2024-06-03") == [
+        (date(2024, 5, 29), date(2024, 5, 30))
+    ]
+    assert calendar.missing_ranges(present, "2024-05-01", "2024-06-03") is None
+
+
+def test_window_ending_today_waits_for_todays_bar():
+    pending = calendar_from_window(
+        "US", SESSIONS[:-1], "2024-05-20", "2024-06-03", today=date(2024, 6, 3)
+    )
+    closed = calendar_from_window(
+        "US", SESSIONS, "2024-05-20", "2024-06-03", today=date(2024, 6, 3)
+    )
+
+    assert pending.checked_through == date(2024, 6, 2)
+    assert not pending.covers("2024-06-03")
+    assert closed.checked_through == date(2024, 6, 3)
+
+
+def test_merge_keeps_touching_ranges_and_drops_stale_ones():
+    older = SessionCalendar("US", tuple(SESSIONS[:5]), date(2024, 5, 20), date(2024, 5, 26))
+    newer = SessionCalendar("US", tuple(SESSIONS[5:]), date(2024, 5, 27), date(2024, 6, 3))
+    distant = SessionCalendar("US", (date(2024, 7, 1),), date(2024, 7, 1), date(2024, 7, 1))
+
+    assert older.merge(newer) == _calendar()
+    assert older.merge(distant) == distant
+
+
+def test_probe_answers_from_calendar_after_first_fetch(monkeypatch):
+    recorded = []
+    calls = []
+
+    async def api_stub(ticker, end, offset_n_days, actual_offset_n_days, utc_dates):
+        calls.append((ticker, end, offset_n_days))
+        start = date.fromisoformat(end) - timedelta(days=offset_n_days)
+        window = [day.isoformat() for day in SESSIONS if day >= start]
+        return pd.DataFrame({"date": window, "close": [1.0] * len(window)})
+
+    monkeypatch.setattr(settings_module, "SESSION_CALENDAR_DISABLED", False)
+    monkeypatch.setattr(session_calendar, "fetch_session_calendar", lambda market: None)
+    monkeypatch.setattr(session_calendar, "fetch_probe_bar_dates", lambda market, ticker: [])
+    monkeypatch.setattr(
+        session_calendar,
+        "record_session_calendar",
+        lambda *args: recorded.append(args) or len(args[1]),
+    )
+    provider = PolygonUSProvider()
+    monkeypatch.setattr(provider, "_fetch_ohlcv_from_api_async", api_stub)
+
+    first = provider.resolve_session_dates("2024-06-03")
+    again = provider.resolve_session_dates("2024-06-03")
+    weekend = provider.resolve_session_dates("2024-06-02")
+
+    assert first == again == ("2024-06-03", "2024-05-31")
+    assert weekend == ("2024-05-31", "2024-05-30")
+    assert len(calls) == 1
+    assert recorded[0][0] == "US"
+    assert recorded[0][2:] == (date(2024, 5, 24), date(2024, 6, 3))
+    assert provider._window_end_session(date(2024, 6, 2)) == date(2024, 5, 31)
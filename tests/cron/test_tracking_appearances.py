@@ -0,0 +1,103 @@
+"""Appearance bitsets decode to the same frequencies as the tracking scan."""
+
+import asyncio
+import random
+
+import pytest
+
+import core.settings as settings_module
+from db.crud import tracking
+from db.crud.tracking_appearances import (
+    APPEARANCE_SESSIONS,
+    AppearanceSessions,
+    appearances_from_lists,
+    decode_frequencies,
+    shift_appearance,
+)
+
+TICKERS = [f"T{idx}" for idx in range(8)]
+
+
+def _scan(lists, ticker, epoch_past_date, epoch_date, period):
+    window = [
+        tickers
+        for date, tickers in sorted(lists, reverse=True)
+        if epoch_past_date < date < epoch_date
+    ][:period]
+    return ", ".join(f"T-{idx+1}" for idx, tickers in enumerate(window) if ticker in tickers)
+
+
+def test_decoded_frequencies_match_tracking_scan():
+    rng = random.Random(7)
+    dates = sorted(rng.sample(range(1, 140), 90))
+    lists = [(date, rng.sample(TICKERS, rng.randint(1, 4))) for date in dates]
+    kept = lists[-APPEARANCE_SESSIONS:]
+    sessions = AppearanceSessions(tuple(date for date, _ in kept), kept[0][0])
+    appearances = appearances_from_lists(kept)
+
+    decoded_dates = 0
+    for epoch_date in range(60, 145):
+        frequencies = decode_frequencies(
+            sessions, appearances, TICKERS, epoch_date - 30, epoch_date, 12
+        )
+        if frequencies is None:
+            # the window reaches past the kept sessions
+            assert epoch_date - 30 < sessions.complete_from
+            continue
+        decoded_dates += 1
+        assert frequencies == {
+            ticker: _scan(lists, ticker, epoch_date - 30, epoch_date, 12) for ticker in TICKERS
+        }
+    assert decoded_dates > 50
+
+
+def test_shift_appearance_keeps_only_the_retained_sessions():
+    dates = list(range(APPEARANCE_SESSIONS + 5))
+
+    assert shift_appearance(0b101, 2, 4, dates) == 0b10101
+    assert shift_appearance(1, 0, APPEARANCE_SESSIONS, dates) == 1
+    assert shift_appearance(0b11, None, 3, dates) == 1
+    assert decode_frequencies(
+        AppearanceSessions((10, 20, 30), 0), {"A": (30, 0b101)}, ["A", "B"], 0, 31, 25
+    ) == {"A": "T-1, T-3", "B": ""}
+
+
+@pytest.mark.asyncio
+async def test_sessions_of_one_market_advance_appearances_in_turn(monkeypatch):
+    monkeypatch.setattr(settings_module, "TRACKING_APPEARANCES_DISABLED", False)
+    stored = {("macd", None): AppearanceSessions((10,), 0)}
+    running, overlaps, advanced = [], [], []
+
+    async def fetch_sessions_stub(conn, market):
+        del conn, market
+        return dict(stored)
+
+    async def advance_stub(conn, market, epoch_date, lists, sessions):
+        del conn, market, lists
+        running.append(epoch_date)
+        overlaps.append(len(running))
+        await asyncio.sleep(0.01)
+        # the read-modify-write a concurrent session would clobber
+        stored[("macd", None)] = AppearanceSessions(
+            (*sessions[("macd", None)].dates, epoch_date), 0
+        )
+        advanced.append(epoch_date)
+        running.remove(epoch_date)
+        return 1
+
+    async def prune_stub(conn, market, sessions):
+        del conn, market, sessions
+        return 0
+
+    monkeypatch.setattr(tracking, "fetch_appearance_sessions", fetch_sessions_stub)
+    monkeypatch.setattr(tracking, "advance_appearances", advance_stub)
+    monkeypatch.setattr(tracking, "prune_appearances", prune_stub)
+
+    await asyncio.gather(
+        tracking.update_tracking_appearances(object(), "US", 20, {("macd", None): ["A"]}),
+        tracking.update_tracking_appearances(object(), "US", 30, {("macd", None): ["B"]}),
+    )
+
+    assert overlaps == [1, 1]
+    assert advanced == [20, 30]
+    assert stored[("macd", None)].dates == (10, 20, 30)
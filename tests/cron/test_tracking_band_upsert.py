@@ -9,30 +9,26 @@ from utils.price_bands import PRICE_BANDS
 
 @pytest.mark.asyncio
 async def test_put_top_tickers_upserts_unbanded_and_all_price_bands(monkeypatch):
-    upsert_filters = []
+    finds = []
+    bulk_writes = []
 
     class CursorStub:
-        def sort(self, *args, **kwargs):
-            del args, kwargs
-            return self
-
-        def limit(self, *args, **kwargs):
-            del args, kwargs
-            return self
-
         async def to_list(self, length=None):
             del length
-            return [{"ticker": "AAA"}, {"ticker": "BBB"}]
+            return [
+                {"ticker": "AAA", "close": 4.0, **{c: 1.0 for c in tracking.CRITERIA}},
+                {"ticker": "BBB", "close": 8.0, **{c: 2.0 for c in tracking.CRITERIA}},
+            ]
 
     class AnalyticsCollectionStub:
-        def find(self, *args, **kwargs):
-            del args, kwargs
+        def find(self, query, projection):
+            finds.append((query, projection))
             return CursorStub()
 
     class TrackingCollectionStub:
-        async def update_one(self, filt, update, upsert=False):
-            del update, upsert
-            upsert_filters.append(dict(filt))
+        async def bulk_write(self, operations, ordered=True):
+            assert not ordered
+            bulk_writes.append(operations)
 
     class MarketDbStub:
         def __getitem__(self, collection_name):
@@ -50,35 +46,53 @@ async def test_put_top_tickers_upserts_unbanded_and_all_price_bands(monkeypatch)
 
     await tracking.put_top_tickers(conn, "2024-06-01", market="US")
 
-    # 5 criteria × (1 unbanded + 4 bands)
-    assert len(upsert_filters) == len(tracking.CRITERIA) * (1 + len(PRICE_BANDS))
+    assert len(finds) == 1
+    assert finds[0][0] == {"date": 1717200000, "market": "US"}
+    assert set(finds[0][1]) == {"_id", "ticker", "close", *tracking.CRITERIA}
+    assert len(bulk_writes) == 1
+    upserts = {
+        (op._filter["criterion"], op._filter["price_band"]): op for op in bulk_writes[0]
+    }
+    # 5 criteria × (unbanded + lte5 + 5to10); the other bands have no tickers
+    assert len(upserts) == len(bulk_writes[0]) == len(tracking.CRITERIA) * 3
 
     for criterion in tracking.CRITERIA:
-        unbanded = [
-            f
-            for f in upsert_filters
-            if f.get("criterion") == criterion and f.get("price_band") is None
-        ]
-        assert len(unbanded) == 1
-        assert unbanded[0] == {
+        unbanded = upserts[(criterion, None)]
+        assert unbanded._filter == {
             "date": 1717200000,
             "criterion": criterion,
             "market": "US",
             "price_band": None,
         }
-        for band in PRICE_BANDS:
-            banded = [
-                f
-                for f in upsert_filters
-                if f.get("criterion") == criterion and f.get("price_band") == band
-            ]
-            assert len(banded) == 1
-            assert banded[0] == {
-                "date": 1717200000,
-                "criterion": criterion,
-                "market": "US",
-                "price_band": band,
-            }
+        assert unbanded._upsert
+        assert unbanded._doc["$set"]["tickers"] == ["BBB", "AAA"]
+        assert upserts[(criterion, "lte5")]._doc["$set"]["tickers"] == ["AAA"]
+        assert upserts[(criterion, "5to10")]._doc["$set"]["tickers"] == ["BBB"]
+
+
+def test_rank_top_tickers_matches_sort_and_limit_per_band():
+    rows = [
+        {"ticker": f"T{idx:02d}", "close": 1.0 + idx, "volume": float(idx % 7)}
+        for idx in range(30)
+    ]
+    rows.append({"ticker": "NOCLOSE", "close": None, "volume": 100.0})
+    rows.append({"ticker": "NOVOLUME", "close": 3.0})
+
+    top = tracking.rank_top_tickers(rows, lim=5)
+
+    assert set(top) == {
+        (criterion, band)
+        for criterion in tracking.CRITERIA
+        for band in [None, *PRICE_BANDS]
+    }
+    assert top[("volume", None)] == ["NOCLOSE", "T06", "T13", "T20", "T27"]
+    # T00..T04 close at 1.0..5.0, inside lte5 (max 5.00 inclusive); NOVOLUME
+    # has no value, so it ranks after all of them and misses the limit
+    assert top[("volume", "lte5")] == ["T04", "T03", "T02", "T01", "T00"]
+    assert tracking.rank_top_tickers(rows, lim=6)[("volume", "lte5")][-1] == "NOVOLUME"
+    assert top[("volume", "20to50")] == ["T20", "T27", "T26", "T25", "T24"]
+    assert all(len(tickers) <= 5 for tickers in top.values())
+    assert tracking.rank_top_tickers([]) == {}
 
 
 @pytest.mark.asyncio
@@ -60,16 +60,37 @@ async def test_put_top_tickers_by_criterion_propagates_atlas_error(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_put_top_tickers_propagates_atlas_error(monkeypatch):
-    async def failing_criterion(conn, date, criterion, lim=None, market="US", price_band=None):
-        del conn, date, lim, market, price_band
-        if criterion == "volume":
+    class CursorStub:
+        async def to_list(self, length=None):
+            del length
+            return [{"ticker": "AAPL", "close": 4.0, "volume": 1.0}]
+
+    class AnalyticsCollectionStub:
+        def find(self, *args, **kwargs):
+            del args, kwargs
+            return CursorStub()
+
+    class TrackingCollectionStub:
+        async def bulk_write(self, *args, **kwargs):
+            del args, kwargs
             raise Exception("AtlasError quota exceeded")
-        return ["AAPL"]
 
-    monkeypatch.setattr(tracking, "put_top_tickers_by_criterion", failing_criterion)
+    class MarketDbStub:
+        def __getitem__(self, collection_name):
+            if collection_name == tracking.MONGO_ANALYTICS_COLLECTION:
+                return AnalyticsCollectionStub()
+            if collection_name == tracking.MONGO_TRACKING_COLLECTION:
+                return TrackingCollectionStub()
+            raise KeyError(collection_name)
+
+    conn = {MONGO_DB_NAME: MarketDbStub()}
+
+    monkeypatch.setattr(tracking, "get_epoch", lambda date: 1717200000)
+    monkeypatch.setattr(tracking, "normalize_market", lambda market: market)
+    monkeypatch.setattr(tracking, "market_mongo_filter", lambda market: {"market": market})
 
     with pytest.raises(Exception) as exc_info:
-        await tracking.put_top_tickers(object(), "2024-06-01", market="US")
+        await tracking.put_top_tickers(conn, "2024-06-01", market="US")
 
     message = str(exc_info.value)
     assert "AtlasError" in message or "quota" in message
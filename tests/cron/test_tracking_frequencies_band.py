@@ -70,7 +70,44 @@ async def test_get_analytics_frequencies_unbanded_matches_null_or_absent(monkeyp
         conn, "2024-06-01", "macd", "AAPL", market="US", price_band=None
     )
     match0 = pipelines[0][0]["$match"]
-    assert match0["$or"] == [
-        {"price_band": None},
-        {"price_band": {"$exists": False}},
-    ]
+    assert match0["price_band"] is None
+    assert "$or" not in match0
+
+
+@pytest.mark.asyncio
+async def test_get_analytics_frequencies_many_reads_tracking_once(monkeypatch):
+    pipelines = []
+
+    class CursorStub:
+        async def to_list(self, length=None):
+            assert length == 25
+            return [
+                {"tickers": ["AAPL", "MSFT"]},
+                {"tickers": ["MSFT"]},
+                {"tickers": ["AAPL", "MSFT"]},
+            ]
+
+    class TrackingCollectionStub:
+        def aggregate(self, pipeline):
+            pipelines.append(pipeline)
+            return CursorStub()
+
+    class MarketDbStub:
+        def __getitem__(self, collection_name):
+            if collection_name == tracking.MONGO_TRACKING_COLLECTION:
+                return TrackingCollectionStub()
+            raise KeyError(collection_name)
+
+    conn = {MONGO_DB_NAME: MarketDbStub()}
+    monkeypatch.setattr(tracking, "normalize_market", lambda market: market)
+    monkeypatch.setattr(tracking, "market_mongo_filter", lambda market: {"market": market})
+    monkeypatch.setattr(tracking, "get_past_date", lambda period, date: "2024-05-01")
+    monkeypatch.setattr(tracking, "get_epoch", lambda date: 1000 if date == "2024-05-01" else 2000)
+
+    freqs = await tracking.get_analytics_frequencies_many(
+        conn, "2024-06-01", "macd", ["AAPL", "MSFT", "TSLA"], market="US", price_band="lte5"
+    )
+
+    assert len(pipelines) == 1
+    assert pipelines[0][0]["$match"]["price_band"] == "lte5"
+    assert freqs == {"AAPL": "T-1, T-3", "MSFT": "T-1, T-2, T-3", "TSLA": ""}
@@ -27,3 +27,52 @@ def test_get_tickers_memoizes_universe_per_market_date(monkeypatch):
     assert second == first
     assert other_date == ["T-2024-06-04"]
     assert calls["count"] == 2
+
+
+def test_get_tickers_serves_stored_universe_across_processes(monkeypatch):
+    import core.settings as settings_module
+    import utils.handle_external_apis as external
+    from db.crud.ticker_universe import UniverseDiff
+
+    monkeypatch.setattr(settings_module, "TICKER_UNIVERSE_STORE_DISABLED", False)
+    stored, mirror = {}, {}
+    calls = {"count": 0}
+
+    class StubProvider:
+        market = "US"
+
+        def fetch_ticker_universe_entries(self, date):
+            calls["count"] += 1
+            return [external.UniverseEntry("MSFT", "CS"), external.UniverseEntry("AAPL", "CS")]
+
+    def store_stub(market, date, entries):
+        stored[(market, date)] = sorted(entries, key=lambda entry: entry.ticker)
+        return UniverseDiff(market=market, session_date=date, ticker_count=len(entries))
+
+    monkeypatch.setattr(external, "get_market_data_provider", lambda market="US": StubProvider())
+    monkeypatch.setattr(external, "store_universe", store_stub)
+    monkeypatch.setattr(
+        external, "fetch_universe", lambda market, date: stored.get((market, date))
+    )
+    monkeypatch.setattr(
+        external, "_read_universe_mirror", lambda market, date: mirror.get((market, date))
+    )
+    monkeypatch.setattr(
+        external,
+        "_write_universe_mirror",
+        lambda market, date, tickers: mirror.__setitem__((market, date), tickers),
+    )
+
+    assert get_tickers("2024-06-03", market="US") == ["AAPL", "MSFT"]
+
+    # a new process: Redis mirror answers without the provider
+    clear_ticker_universe_cache()
+    assert get_tickers("2024-06-03", market="US") == ["AAPL", "MSFT"]
+
+    # Redis evicted: Postgres answers and re-fills the mirror
+    clear_ticker_universe_cache()
+    mirror.clear()
+    assert get_tickers("2024-06-03", market="US") == ["AAPL", "MSFT"]
+    assert mirror[("US", "2024-06-03")] == ["AAPL", "MSFT"]
+
+    assert calls["count"] == 1
@@ -0,0 +1,53 @@
+"""Cron performance history: spans are appended per run and summed per phase."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from db.crud.cron_spans import get_phase_history, insert_cron_spans
+
+
+@pytest.fixture(autouse=True)
+async def _truncate_cron_spans(postgres_pool):
+    async with postgres_pool.acquire() as conn:
+        await conn.execute("TRUNCATE TABLE cron_spans")
+    yield
+
+
+@pytest.mark.asyncio
+async def test_phase_history_sums_markets_per_run(postgres_pool):
+    first = datetime(2024, 6, 3, 22, tzinfo=timezone.utc)
+    second = first + timedelta(days=1)
+    await insert_cron_spans(
+        postgres_pool,
+        "run-1",
+        first,
+        [
+            {"market": "US", "date": "2024-06-03", "phase": "fetch", "seconds": 10.0,
+             "counts": {"tickers": 100, "http_calls": 100}},
+            {"market": "TO", "date": "2024-06-03", "phase": "fetch", "seconds": 10.0,
+             "counts": {"tickers": 50}},
+            {"market": "all", "date": "n/a", "phase": "storage_monitor", "seconds": 0.5},
+        ],
+    )
+    written = await insert_cron_spans(
+        postgres_pool,
+        "run-2",
+        second,
+        [{"market": "US", "date": "2024-06-04", "phase": "fetch", "seconds": 4.0,
+          "counts": {"tickers": 100}}],
+    )
+
+    history = await get_phase_history(postgres_pool, "fetch")
+    us_history = await get_phase_history(postgres_pool, "fetch", market="US")
+
+    assert written == 1
+    assert [item["run_id"] for item in history] == ["run-2", "run-1"]
+    assert history[1]["tickers"] == 150
+    assert history[1]["tickers_per_second"] == pytest.approx(7.5)
+    assert [item["tickers_per_second"] for item in us_history] == [
+        pytest.approx(25.0),
+        pytest.approx(10.0),
+    ]
+    monitor = await get_phase_history(postgres_pool, "storage_monitor")
+    assert monitor[0]["tickers_per_second"] is None
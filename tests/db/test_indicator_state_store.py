@@ -0,0 +1,68 @@
+"""Indicator state rows round-trip and are only served for their session."""
+
+import numpy as np
+import pytest
+
+from db.crud.indicator_state import fetch_indicator_states, save_indicator_states
+from db.crud.ohlcv_bars import BarArrays
+from db.ohlcv_sync import close_ohlcv_sync_pool, get_ohlcv_sync_pool
+from services.indicator_state import state_from_window
+
+
+@pytest.fixture(autouse=True)
+def _empty_indicator_state(postgres_pool):
+    del postgres_pool
+    close_ohlcv_sync_pool()
+    pool = get_ohlcv_sync_pool()
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE TABLE indicator_state")
+        conn.commit()
+    yield
+    close_ohlcv_sync_pool()
+
+
+def _window(n_sessions: int) -> BarArrays:
+    dates = np.arange(
+        np.datetime64("2024-03-01"), np.datetime64("2024-03-01") + n_sessions, dtype="datetime64[D]"
+    )
+    close = np.linspace(100.0, 120.0, n_sessions)
+    return BarArrays(
+        session_date=dates,
+        open=close - 1,
+        high=close + 1,
+        low=close - 2,
+        close=close,
+        volume=np.arange(n_sessions, dtype=np.int64) + 1000,
+    )
+
+
+def test_states_round_trip_for_their_session():
+    state = state_from_window(_window(60))
+    written = save_indicator_states("US", {"AAPL": state})
+
+    loaded = fetch_indicator_states("US", ["AAPL", "MSFT"], "2024-04-29")
+    stale = fetch_indicator_states("US", ["AAPL"], "2024-04-26")
+
+    assert written == 1
+    assert stale == {}
+    restored = loaded["AAPL"]
+    assert np.array_equal(restored.window_dates, state.window_dates)
+    assert np.allclose(restored.terms[26], state.terms[26])
+    assert restored.prefix[12] == pytest.approx(state.prefix[12])
+    assert np.array_equal(restored.tail.session_date, state.tail.session_date)
+    assert np.array_equal(restored.tail.volume, state.tail.volume)
+
+
+def test_older_state_does_not_replace_a_newer_one():
+    newer = state_from_window(_window(60))
+    older = state_from_window(_window(59))
+    save_indicator_states("US", {"AAPL": newer})
+
+    # a catch-up or backfill of the prior session runs after the last one
+    written = save_indicator_states("US", {"AAPL": older, "MSFT": older})
+
+    assert written == 1
+    assert list(fetch_indicator_states("US", ["AAPL"], "2024-04-29")) == ["AAPL"]
+    assert fetch_indicator_states("US", ["AAPL"], "2024-04-28") == {}
+    assert list(fetch_indicator_states("US", ["MSFT"], "2024-04-28")) == ["MSFT"]
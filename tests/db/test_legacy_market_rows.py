@@ -0,0 +1,101 @@
+"""Legacy rows without ``market`` (or ``price_band``) stay in US reads."""
+
+import pytest
+import pytest_asyncio
+
+from core.settings import MONGO_DB_NAME
+from db.crud import tracking
+from db.crud.analytics import get_analytics_sorted_by, get_analytics_tickers
+from utils.handle_datetimes import get_epoch
+
+DATE = "2032-01-06"
+PRIOR_DATE = "2032-01-05"
+TICKERS = ["LEGACY", "USROW", "TOROW"]
+
+
+async def _as_is(conn, item, criterion, market="US"):
+    del conn, criterion, market
+    return item
+
+
+async def _clear(conn):
+    epochs = [get_epoch(DATE), get_epoch(PRIOR_DATE)]
+    for collection in ("analytics", tracking.MONGO_TRACKING_COLLECTION):
+        await conn[MONGO_DB_NAME][collection].delete_many({"date": {"$in": epochs}})
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def legacy_db(mongo_client):
+    await _clear(mongo_client)
+    values = {criterion: 1.0 for criterion in tracking.CRITERIA}
+    await mongo_client[MONGO_DB_NAME]["analytics"].insert_many(
+        [
+            # written before rows carried a market
+            {"ticker": "LEGACY", "date": get_epoch(DATE), "close": 4.0, **values},
+            {"market": "US", "ticker": "USROW", "date": get_epoch(DATE), "close": 4.0, **values},
+            {"market": "TO", "ticker": "TOROW", "date": get_epoch(DATE), "close": 4.0, **values},
+        ]
+    )
+    await mongo_client[MONGO_DB_NAME][tracking.MONGO_TRACKING_COLLECTION].insert_many(
+        [
+            # written before lists carried a market or a price band
+            {"date": get_epoch(PRIOR_DATE), "criterion": "macd", "tickers": ["LEGACY"]},
+            {
+                "date": get_epoch(PRIOR_DATE),
+                "criterion": "macd",
+                "market": "US",
+                "price_band": "lte5",
+                "tickers": ["USROW"],
+            },
+            {
+                "date": get_epoch(PRIOR_DATE),
+                "criterion": "macd",
+                "market": "TO",
+                "price_band": None,
+                "tickers": ["TOROW"],
+            },
+        ]
+    )
+    yield mongo_client
+    await _clear(mongo_client)
+
+
+@pytest.mark.asyncio
+async def test_us_analytics_reads_include_rows_without_market(legacy_db):
+    assert sorted(await get_analytics_tickers(legacy_db, DATE, market="US")) == [
+        "LEGACY",
+        "USROW",
+    ]
+    assert await get_analytics_tickers(legacy_db, DATE, market="TO") == ["TOROW"]
+
+    rows = await get_analytics_sorted_by(
+        legacy_db, DATE, "macd", market="US", enrich_fn=_as_is, max_close=5.0
+    )
+    assert sorted(row["ticker"] for row in rows) == ["LEGACY", "USROW"]
+
+
+@pytest.mark.asyncio
+async def test_us_tracking_reads_include_lists_without_market_or_band(legacy_db):
+    unbanded = await tracking.get_analytics_frequencies_many(
+        legacy_db, DATE, "macd", TICKERS, market="US"
+    )
+    banded = await tracking.get_analytics_frequencies_many(
+        legacy_db, DATE, "macd", TICKERS, market="US", price_band="lte5"
+    )
+    toronto = await tracking.get_analytics_frequencies_many(
+        legacy_db, DATE, "macd", TICKERS, market="TO"
+    )
+
+    assert unbanded == {"LEGACY": "T-1", "USROW": "", "TOROW": ""}
+    assert banded == {"LEGACY": "", "USROW": "T-1", "TOROW": ""}
+    assert toronto == {"LEGACY": "", "USROW": "", "TOROW": "T-1"}
+
+
+@pytest.mark.asyncio
+async def test_us_top_tickers_rank_rows_without_market(legacy_db):
+    await tracking.put_top_tickers(legacy_db, DATE, market="US", lim=5)
+
+    listed = await legacy_db[MONGO_DB_NAME][tracking.MONGO_TRACKING_COLLECTION].find_one(
+        {"date": get_epoch(DATE), "criterion": "macd", "market": "US", "price_band": None}
+    )
+    assert sorted(listed["tickers"]) == ["LEGACY", "USROW"]
@@ -0,0 +1,228 @@
+"""Query plans of the hot Mongo CRUD queries against the declared indexes."""
+
+import pytest
+import pytest_asyncio
+
+from core.settings import MONGO_DB_NAME
+from db.crud import tracking
+from db.crud.analytics import get_analytics_sorted_by, get_analytics_tickers
+from db.crud.scrapes import get_mentions
+from db.mongo_indexes import MONGO_INDEXES, dedupe_analytics_keys, ensure_mongo_indexes
+from services.read_router import _latest_mongo_date
+from tests.helpers.constants import FIXTURE_DATE
+
+# a plan with either of these scans the collection or sorts in memory
+BANNED_STAGES = {"COLLSCAN", "SORT", "$sort"}
+
+
+class _RecordingCursor:
+    def __init__(self, cursor, command):
+        self._cursor = cursor
+        self._command = command
+
+    def sort(self, key, direction):
+        self._command["sort"] = {key: direction}
+        self._cursor = self._cursor.sort(key, direction)
+        return self
+
+    def limit(self, n):
+        self._command["limit"] = n
+        self._cursor = self._cursor.limit(n)
+        return self
+
+    async def to_list(self, length=None):
+        return await self._cursor.to_list(length=length)
+
+
+class _RecordingCollection:
+    """Runs reads on the real collection and keeps each as an explainable command."""
+
+    def __init__(self, collection, commands):
+        self._collection = collection
+        self._commands = commands
+
+    def _record(self, command):
+        self._commands.append(command)
+        return command
+
+    def find(self, query, projection=None):
+        command = self._record(
+            {"find": self._collection.name, "filter": query, "projection": projection}
+        )
+        return _RecordingCursor(self._collection.find(query, projection), command)
+
+    async def find_one(self, query):
+        self._record({"find": self._collection.name, "filter": query, "limit": 1})
+        return await self._collection.find_one(query)
+
+    def aggregate(self, pipeline):
+        self._record({"aggregate": self._collection.name, "pipeline": pipeline, "cursor": {}})
+        return self._collection.aggregate(pipeline)
+
+    async def distinct(self, key, query):
+        self._record({"distinct": self._collection.name, "key": key, "query": query})
+        return await self._collection.distinct(key, query)
+
+    async def bulk_write(self, operations, ordered=True):
+        del operations, ordered
+
+    async def update_one(self, query, update, upsert=False):
+        # explained, not applied: the seeded tracking docs stay as they are
+        self._record(
+            {
+                "update": self._collection.name,
+                "updates": [{"q": query, "u": update, "upsert": upsert}],
+            }
+        )
+
+
+class _RecordingClient:
+    def __init__(self, client):
+        self._client = client
+        self.commands = []
+
+    def __getitem__(self, db_name):
+        database = self._client[db_name]
+        commands = self.commands
+
+        class _Database:
+            def __getitem__(self, collection_name):
+                return _RecordingCollection(database[collection_name], commands)
+
+        return _Database()
+
+
+def _plan_stages(node) -> list:
+    """Stage names of the winning plan (and unpushed pipeline stages)."""
+    if isinstance(node, list):
+        return [stage for item in node for stage in _plan_stages(item)]
+    if not isinstance(node, dict):
+        return []
+    stages = [node["stage"]] if isinstance(node.get("stage"), str) else []
+    stages += [key for key in node if key.startswith("$")]
+    for key, value in node.items():
+        if key not in ("rejectedPlans", "command", "parsedQuery"):
+            stages += _plan_stages(value)
+    return stages
+
+
+async def _banned_stages(mongo_client, commands) -> list:
+    assert commands
+    found = []
+    for command in commands:
+        plan = await mongo_client[MONGO_DB_NAME].command(
+            {"explain": command, "verbosity": "queryPlanner"}
+        )
+        found += [
+            (next(iter(command.values())), stage)
+            for stage in _plan_stages(plan)
+            if stage in BANNED_STAGES
+        ]
+    return found
+
+
+async def _as_is(conn, item, criterion, market="US"):
+    del conn, criterion, market
+    return item
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def recording_db(mongo_client):
+    await ensure_mongo_indexes(mongo_client)
+    yield _RecordingClient(mongo_client)
+
+
+@pytest.mark.asyncio
+async def test_ensure_mongo_indexes_is_idempotent(mongo_client):
+    declared = sorted(
+        index.document["name"] for indexes in MONGO_INDEXES.values() for index in indexes
+    )
+
+    first = await ensure_mongo_indexes(mongo_client)
+    second = await ensure_mongo_indexes(mongo_client)
+
+    assert sorted(first) == sorted(second) == declared
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("market", ["US", "TO"])
+@pytest.mark.parametrize("criterion", tracking.CRITERIA)
+async def test_sorted_analytics_use_an_index(mongo_client, recording_db, criterion, market):
+    await get_analytics_sorted_by(
+        recording_db, FIXTURE_DATE, criterion, market=market, enrich_fn=_as_is
+    )
+    await get_analytics_sorted_by(
+        recording_db,
+        FIXTURE_DATE,
+        criterion,
+        market=market,
+        enrich_fn=_as_is,
+        min_close=5.01,
+        max_close=10.0,
+    )
+
+    assert await _banned_stages(mongo_client, recording_db.commands) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("price_band", [None, "lte5", "20to50"])
+async def test_top_tickers_and_frequencies_use_an_index(mongo_client, recording_db, price_band):
+    await tracking.put_top_tickers_by_criterion(
+        recording_db, FIXTURE_DATE, "macd", price_band=price_band
+    )
+    await tracking.get_analytics_frequencies_many(
+        recording_db, FIXTURE_DATE, "one_day_avg_mf", ["AAPL", "MSFT"], price_band=price_band
+    )
+
+    assert await _banned_stages(mongo_client, recording_db.commands) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("market", ["US", "TO"])
+async def test_top_tickers_day_read_uses_an_index(mongo_client, recording_db, market):
+    await tracking.put_top_tickers(recording_db, FIXTURE_DATE, market=market)
+
+    assert len(recording_db.commands) == 1
+    assert await _banned_stages(mongo_client, recording_db.commands) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("market", ["US", "TO"])
+async def test_latest_date_and_ticker_universe_use_an_index(mongo_client, recording_db, market):
+    await _latest_mongo_date(recording_db, market)
+    await get_analytics_tickers(recording_db, FIXTURE_DATE, market=market)
+
+    assert await _banned_stages(mongo_client, recording_db.commands) == []
+
+
+@pytest.mark.asyncio
+async def test_mentions_use_an_index(mongo_client, recording_db):
+    await get_mentions(recording_db, "AAPL", FIXTURE_DATE)
+
+    assert await _banned_stages(mongo_client, recording_db.commands) == []
+
+
+@pytest.mark.asyncio
+async def test_dedupe_analytics_keys_keeps_the_newest_doc_per_key(mongo_client):
+    collection = mongo_client[MONGO_DB_NAME]["analytics_dedupe_test"]
+    await collection.drop()
+    await collection.insert_many(
+        [
+            {"market": "US", "ticker": "AAA", "date": 1, "macd": 1.0},
+            {"market": "US", "ticker": "AAA", "date": 1, "macd": 2.0},
+            {"market": "TO", "ticker": "AAA", "date": 1, "macd": 3.0},
+            {"ticker": "BBB", "date": 1, "macd": 4.0},
+            {"ticker": "BBB", "date": 1, "macd": 5.0},
+            {"market": "US", "ticker": "BBB", "date": 1, "macd": 6.0},
+        ]
+    )
+
+    deleted = await dedupe_analytics_keys(mongo_client, "analytics_dedupe_test")
+
+    kept = await collection.find({}, {"_id": False}).to_list(length=None)
+    assert deleted == 2
+    assert sorted(doc["macd"] for doc in kept) == [2.0, 3.0, 5.0, 6.0]
+    await collection.create_index(
+        [("market", 1), ("ticker", 1), ("date", 1)], unique=True
+    )
+    await collection.drop()
@@ -1,13 +1,16 @@
 """Unit tests for OHLCV bar store CRUD."""
 
+from dataclasses import replace
 from datetime import date, timedelta
 
 import pytest
 
 from db.crud.ohlcv_bars import (
     BarRow,
+    BulkBarWriter,
     delete_bars_for_session_date,
     fetch_bars,
+    fetch_bars_many,
     oldest_session_date,
     upsert_bars,
 )
@@ -138,3 +141,52 @@ def test_goog_normalizes_to_googl_ticker_key(postgres_pool):
     )
     fetched = fetch_bars("US", "GOOGL", session, session)
     assert len(fetched) == 1
+
+
+def test_fetch_bars_many_returns_ascending_arrays_per_ticker(postgres_pool):
+    del postgres_pool
+    upsert_bars("US", "AAPL", _sample_rows(date(2024, 1, 1), 3))
+    upsert_bars("US", "MSFT", _sample_rows(date(2024, 1, 2), 2))
+    upsert_bars("TO", "AAPL", _sample_rows(date(2024, 1, 1), 3))
+
+    windows = fetch_bars_many(
+        "US", ["MSFT", "AAPL", "NOPE"], date(2024, 1, 1), date(2024, 1, 3)
+    )
+
+    assert sorted(windows) == ["AAPL", "MSFT"]
+    aapl = windows["AAPL"]
+    assert len(aapl) == 3
+    assert str(aapl.session_date[0]) == "2024-01-01"
+    assert str(aapl.session_date[-1]) == "2024-01-03"
+    assert aapl.close.tolist() == [100.5, 101.5, 102.5]
+    assert aapl.volume.dtype.kind == "i"
+    assert windows["MSFT"].open.tolist() == [100.0, 101.0]
+
+
+def test_bulk_bar_writer_merges_many_tickers_and_duplicates(postgres_pool):
+    del postgres_pool
+    rows = _sample_rows(date(2024, 6, 3), 2)
+    with BulkBarWriter("US", batch_size=3) as writer:
+        writer.add("AAPL", rows)
+        writer.add("MSFT", rows)
+        writer.add("AAPL", rows[:1])
+
+    assert writer.written == 5
+    assert writer.pending_rows == 0
+    assert len(fetch_bars("US", "AAPL", date(2024, 6, 3), date(2024, 6, 4))) == 2
+    assert len(fetch_bars("US", "MSFT", date(2024, 6, 3), date(2024, 6, 4))) == 2
+
+
+def test_bulk_bar_writer_keeps_the_last_bar_staged_for_a_session(postgres_pool):
+    del postgres_pool
+    grouped = _sample_rows(date(2024, 6, 3), 2)
+    # a per-ticker write-through of the same session after the grouped bar
+    later = [replace(grouped[1], close=250.0)]
+    with BulkBarWriter("US", auto_flush=False) as writer:
+        writer.add("AAPL", grouped)
+        writer.add("AAPL", later)
+        assert writer.pending_rows == 2
+
+    assert writer.written == 2
+    fetched = fetch_bars("US", "AAPL", date(2024, 6, 3), date(2024, 6, 4))
+    assert [row.close for row in fetched] == [100.5, 250.0]
@@ -0,0 +1,53 @@
+"""Session calendar persistence and rebuild from the probe ticker's bars."""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import core.settings as settings_module
+import services.session_calendar as session_calendar
+from db.crud.ohlcv_bars import BarRow, upsert_bars
+from db.ohlcv_sync import close_ohlcv_sync_pool, get_ohlcv_sync_pool
+
+
+@pytest.fixture(autouse=True)
+def _empty_calendar(postgres_pool, monkeypatch):
+    del postgres_pool
+    monkeypatch.setattr(settings_module, "SESSION_CALENDAR_DISABLED", False)
+    close_ohlcv_sync_pool()
+    pool = get_ohlcv_sync_pool()
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE TABLE market_sessions, session_calendar_state, ohlcv_bars")
+        conn.commit()
+    session_calendar.clear_session_calendar_cache()
+    yield
+    session_calendar.clear_session_calendar_cache()
+    close_ohlcv_sync_pool()
+
+
+def test_calendar_is_rebuilt_from_probe_bars_and_persisted():
+    sessions = [
+        day.date()
+        for day in pd.bdate_range("2024-03-01", "2024-06-03")
+        if day.date() not in (date(2024, 3, 29), date(2024, 5, 27))
+    ]
+    upsert_bars(
+        "US",
+        "SPY",
+        [BarRow(day, 1.0, 1.0, 1.0, 1.0, 100) for day in sessions],
+    )
+
+    calendar = session_calendar.session_calendar_for("US", "2024-06-03", "SPY")
+    session_calendar.clear_session_calendar_cache()
+    reloaded = session_calendar.load_session_calendar("US")
+
+    assert calendar.sessions_before("2024-06-03", 2) == [date(2024, 5, 31), date(2024, 6, 3)]
+    assert reloaded == calendar
+    assert session_calendar.sessions_before("US", "2024-05-28", 2) == [
+        "2024-05-24",
+        "2024-05-28",
+    ]
+    assert session_calendar.session_n_before("US", "2024-04-01", 1) == "2024-03-28"
+    assert session_calendar.session_calendar_for("US", "2024-06-04", "SPY") is None
@@ -0,0 +1,57 @@
+"""Unit tests for the ingest negative-result cache."""
+
+import pytest
+
+from db.crud.ticker_skips import (
+    SKIP_DATE_MISMATCH,
+    SKIP_NOT_ENOUGH_BARS,
+    clear_skipped_tickers,
+    fetch_skipped_tickers,
+    record_skipped_tickers,
+)
+from db.ohlcv_sync import close_ohlcv_sync_pool, get_ohlcv_sync_pool
+
+
+@pytest.fixture(autouse=True)
+def _truncate_ticker_skips(postgres_pool):
+    del postgres_pool
+    close_ohlcv_sync_pool()
+    pool = get_ohlcv_sync_pool()
+    if pool is not None:
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("TRUNCATE TABLE ticker_skips")
+            conn.commit()
+    yield
+    close_ohlcv_sync_pool()
+
+
+def test_record_and_fetch_skipped_tickers_per_session():
+    written = record_skipped_tickers(
+        "US", "2024-06-03", {"WARR": SKIP_NOT_ENOUGH_BARS, "HALT": SKIP_DATE_MISMATCH}
+    )
+
+    assert written == 2
+    assert fetch_skipped_tickers("US", "2024-06-03") == {
+        "WARR": SKIP_NOT_ENOUGH_BARS,
+        "HALT": SKIP_DATE_MISMATCH,
+    }
+    assert fetch_skipped_tickers("US", "2024-06-04") == {}
+    assert fetch_skipped_tickers("TO", "2024-06-03") == {}
+
+
+def test_stale_date_mismatch_expires_but_not_enough_bars_stays():
+    record_skipped_tickers(
+        "US", "2024-06-03", {"WARR": SKIP_NOT_ENOUGH_BARS, "HALT": SKIP_DATE_MISMATCH}
+    )
+    pool = get_ohlcv_sync_pool()
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE ticker_skips SET recorded_at = NOW() - INTERVAL '3 hours'")
+        conn.commit()
+
+    assert fetch_skipped_tickers("US", "2024-06-03", mismatch_retry_minutes=120) == {
+        "WARR": SKIP_NOT_ENOUGH_BARS
+    }
+    assert clear_skipped_tickers("US", "2024-06-03") == 2
+    assert fetch_skipped_tickers("US", "2024-06-03") == {}
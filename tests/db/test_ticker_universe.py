@@ -0,0 +1,69 @@
+"""Unit tests for the per-session ticker universe store."""
+
+from datetime import date
+
+import pytest
+
+from db.crud.ticker_universe import UniverseEntry, fetch_universe, store_universe
+from db.ohlcv_sync import close_ohlcv_sync_pool, get_ohlcv_sync_pool
+
+
+@pytest.fixture(autouse=True)
+def _truncate_ticker_universe(postgres_pool):
+    del postgres_pool
+    close_ohlcv_sync_pool()
+    pool = get_ohlcv_sync_pool()
+    if pool is not None:
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("TRUNCATE TABLE ticker_universe, ticker_universe_refreshes")
+            conn.commit()
+    yield
+    close_ohlcv_sync_pool()
+
+
+def test_fetch_universe_is_none_before_first_refresh():
+    assert fetch_universe("US", "2024-06-03") is None
+
+
+def test_store_universe_records_metadata_and_diff_vs_previous_session():
+    first = store_universe(
+        "US",
+        "2024-06-03",
+        [
+            UniverseEntry("AAPL", "CS", True),
+            UniverseEntry("MSFT", "CS", True),
+            UniverseEntry("OLD", "CS", True),
+        ],
+    )
+    assert first.previous_session_date is None
+    assert first.added == [] and first.removed == []
+
+    diff = store_universe(
+        "US",
+        "2024-06-04",
+        [
+            UniverseEntry("AAPL", "CS", True),
+            UniverseEntry("MSFT", "CS", True),
+            UniverseEntry("NEW", "ETF", False),
+            UniverseEntry("NEW", "ETF", False),
+        ],
+    )
+
+    assert diff.ticker_count == 3
+    assert diff.previous_session_date == date(2024, 6, 3)
+    assert diff.added == ["NEW"]
+    assert diff.removed == ["OLD"]
+    assert fetch_universe("US", "2024-06-04") == [
+        UniverseEntry("AAPL", "CS", True),
+        UniverseEntry("MSFT", "CS", True),
+        UniverseEntry("NEW", "ETF", False),
+    ]
+    assert fetch_universe("TO", "2024-06-04") is None
+
+
+def test_store_universe_replaces_session_on_refresh():
+    store_universe("US", "2024-06-03", [UniverseEntry("AAPL"), UniverseEntry("MSFT")])
+    store_universe("US", "2024-06-03", [UniverseEntry("AAPL")])
+
+    assert [entry.ticker for entry in fetch_universe("US", "2024-06-03")] == ["AAPL"]
@@ -0,0 +1,101 @@
+"""Appearance bitsets kept by put_top_tickers against the seeded test Mongo."""
+
+import random
+
+import pytest
+import pytest_asyncio
+
+import core.settings as settings_module
+from core.settings import MONGO_DB_NAME
+from db.crud import tracking
+from db.crud.tracking_appearances import (
+    MONGO_APPEARANCES_COLLECTION,
+    MONGO_SESSIONS_COLLECTION,
+)
+from db.mongo_indexes import ensure_mongo_indexes
+from utils.handle_datetimes import get_epoch
+
+MARKET = "TO"
+DATES = ["2031-03-03", "2031-03-04", "2031-03-05", "2031-03-06", "2031-03-07"]
+TICKERS = [f"ZZ{idx}" for idx in range(30)]
+LISTS = [("macd", None), ("volume", "lte5"), ("three_day_avg_mf", "10to20")]
+
+
+def _analytics(date: str, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "market": MARKET,
+            "ticker": ticker,
+            "date": get_epoch(date),
+            "close": rng.choice([3.0, 7.0, 15.0, 40.0]),
+            **{criterion: rng.random() for criterion in tracking.CRITERIA},
+        }
+        for ticker in TICKERS
+    ]
+
+
+async def _clear(conn):
+    epochs = [get_epoch(date) for date in DATES]
+    for collection in ("analytics", tracking.MONGO_TRACKING_COLLECTION):
+        await conn[MONGO_DB_NAME][collection].delete_many(
+            {"market": MARKET, "date": {"$in": epochs}}
+        )
+    for collection in (MONGO_SESSIONS_COLLECTION, MONGO_APPEARANCES_COLLECTION):
+        await conn[MONGO_DB_NAME][collection].delete_many({"market": MARKET})
+
+
+async def _frequencies(conn, monkeypatch, date, criterion, price_band, disabled):
+    monkeypatch.setattr(settings_module, "TRACKING_APPEARANCES_DISABLED", disabled)
+    return await tracking.get_analytics_frequencies_many(
+        conn, date, criterion, TICKERS, market=MARKET, price_band=price_band
+    )
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def appearances_db(mongo_client, monkeypatch):
+    await ensure_mongo_indexes(mongo_client)
+    await _clear(mongo_client)
+    rng = random.Random(11)
+    for date in DATES:
+        await mongo_client[MONGO_DB_NAME]["analytics"].insert_many(_analytics(date, rng))
+    monkeypatch.setattr(settings_module, "TRACKING_APPEARANCES_DISABLED", False)
+    yield mongo_client
+    await _clear(mongo_client)
+
+
+@pytest.mark.asyncio
+async def test_bitsets_follow_in_order_backfilled_and_rerun_sessions(
+    appearances_db, monkeypatch
+):
+    # in order with a gap, then the gap backfilled, then the last day re-run
+    for date in [DATES[0], DATES[1], DATES[2], DATES[4], DATES[3], DATES[4]]:
+        monkeypatch.setattr(settings_module, "TRACKING_APPEARANCES_DISABLED", False)
+        await tracking.put_top_tickers(appearances_db, date, market=MARKET, lim=5)
+
+        for read_date in [*DATES, "2031-03-10"]:
+            for criterion, price_band in LISTS:
+                from_bits = await _frequencies(
+                    appearances_db, monkeypatch, read_date, criterion, price_band, False
+                )
+                scanned = await _frequencies(
+                    appearances_db, monkeypatch, read_date, criterion, price_band, True
+                )
+                assert from_bits == scanned, (date, read_date, criterion, price_band)
+
+    decoded = await tracking._frequencies_from_appearances(  # pylint: disable=protected-access
+        appearances_db,
+        MARKET,
+        "macd",
+        None,
+        TICKERS,
+        get_epoch("2031-02-13"),
+        get_epoch("2031-03-10"),
+        25,
+    )
+    assert decoded is not None
+    assert any(value.startswith("T-1") for value in decoded.values())
+    sessions = await appearances_db[MONGO_DB_NAME][MONGO_SESSIONS_COLLECTION].find_one(
+        {"market": MARKET, "criterion": "macd", "price_band": None}
+    )
+    assert sessions["dates"] == [get_epoch(date) for date in DATES]
+    assert sessions["complete_from"] == 0
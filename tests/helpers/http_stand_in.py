@@ -0,0 +1,85 @@
+"""Local HTTP server standing in for market data vendors in provider tests."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class HttpStandIn:
+    """
+    Serve canned JSON on 127.0.0.1 so providers exercise their real HTTP
+    transport. Routes match by path prefix (query string ignored); unmatched
+    paths return 404. Every requested path+query is kept in ``requests``.
+    """
+
+    def __init__(self):
+        self.routes: list = []
+        self.requests: list = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                stand_in.requests.append(self.path)
+                path = self.path.split("?", 1)[0]
+                headers = {}
+                for prefix, respond in stand_in.routes:
+                    if path.startswith(prefix):
+                        status, payload, *extra = respond(self.path)
+                        headers = extra[0] if extra else {}
+                        break
+                else:
+                    status, payload = 404, {"error": f"no route for {path}"}
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                del format, args
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="http-stand-in", daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def route(self, prefix: str, payload=None, status: int = 200, handler=None) -> None:
+        """
+        Answer GETs under ``prefix`` with ``payload``, or with
+        ``handler(path) -> (status, payload[, headers])``.
+        """
+        respond = handler or (lambda path: (status, payload))
+        self.routes.append((prefix, respond))
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.requests.clear()
+
+    def start(self) -> "HttpStandIn":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def serve_polygon_ohlcv_fixtures(stand_in: HttpStandIn, tickers) -> None:
+    """Route Polygon aggregate requests for ``tickers`` to tests/fixtures/ohlcv."""
+    from providers.polygon_us import POLYGON_SYMBOL_ALIASES
+    from tests.helpers.fixture_loader import load_json
+
+    for ticker in tickers:
+        payload = load_json(f"ohlcv/{ticker}.json")
+        polygon_symbol = POLYGON_SYMBOL_ALIASES.get(ticker.upper(), ticker.upper())
+        for symbol in {polygon_symbol, ticker.upper()}:
+            stand_in.route(f"/v2/aggs/ticker/{symbol}/", payload)
@@ -0,0 +1,93 @@
+"""Synthetic bar windows and stubbed dependencies for the cron ingest tests."""
+
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+from db.crud.analytics import AnalyticsWriteResult
+from db.crud.ohlcv_bars import BarArrays
+from tests.helpers.constants import FIXTURE_DATE
+
+
+def bar_arrays(seed: int, sessions: int = 60, last_date: str = FIXTURE_DATE) -> BarArrays:
+    """Random-walk daily bars ending on ``last_date`` (one per calendar day)."""
+    rng = np.random.default_rng(seed)
+    close = 50 + rng.normal(0, 1, sessions).cumsum()
+    end = np.datetime64(last_date, "D")
+    return BarArrays(
+        session_date=np.arange(end - sessions + 1, end + 1, dtype="datetime64[D]"),
+        open=close + rng.normal(0, 0.5, sessions),
+        high=close + 1,
+        low=close - 1,
+        close=close,
+        volume=rng.integers(1_000, 50_000, sessions).astype(np.int64),
+    )
+
+
+@dataclass
+class IngestStubs:
+    """What the stubbed ingest was asked for and what it wrote."""
+
+    fetched: list = field(default_factory=list)
+    inserted: list = field(default_factory=list)
+    batches: list = field(default_factory=list)
+
+    @property
+    def inserted_tickers(self) -> list:
+        return [row["ticker"] for row in self.inserted]
+
+
+def stub_ingest(
+    monkeypatch,
+    tickers: list[str],
+    cached: Optional[Callable[[list[str]], dict]] = None,
+    fetch: Optional[Callable[[str], Optional[BarArrays]]] = None,
+    settings: Optional[dict] = None,
+) -> IngestStubs:
+    """
+    Stub the universe, bar store, per-ticker window fetch and analytics
+    writer of ``ingest_base_analytics_for_market``.
+
+    ``tickers`` are missing on the session; ``cached(chunk)`` returns the bar
+    store windows of a chunk (none by default) and ``fetch(ticker)`` a fetched
+    window or None (None by default). ``settings`` override the defaults of
+    an in-process run without the grouped daily sync.
+    """
+    import core.settings as settings_module
+    import services.analytics_service as analytics_service
+
+    overrides = {"CRON_CPU_WORKERS": 0, "OHLCV_GROUPED_INGEST": False, **(settings or {})}
+    for name, value in overrides.items():
+        monkeypatch.setattr(settings_module, name, value)
+    stubs = IngestStubs()
+
+    async def missing_stub(conn, date, market="US"):
+        del conn, date, market
+        return list(tickers)
+
+    async def fetch_arrays_stub(ticker, date, market="US"):
+        del date, market
+        stubs.fetched.append(ticker)
+        return None if fetch is None else fetch(ticker)
+
+    async def insert_stub(conn, rows, batch_size=500):
+        del conn, batch_size
+        stubs.inserted.extend(rows)
+        stubs.batches.append([row["ticker"] for row in rows])
+        return AnalyticsWriteResult(inserted=len(rows))
+
+    monkeypatch.setattr(analytics_service, "get_missing_tickers", missing_stub)
+    monkeypatch.setattr(
+        analytics_service,
+        "external_load_cached_ohlcv_window_arrays",
+        lambda chunk, date, market="US": {} if cached is None else cached(chunk),
+    )
+    monkeypatch.setattr(
+        analytics_service, "external_supports_ohlcv_window_arrays", lambda market: True
+    )
+    monkeypatch.setattr(
+        analytics_service, "external_get_ticker_ohlcv_window_arrays_async", fetch_arrays_stub
+    )
+    monkeypatch.setattr(analytics_service, "upsert_analytics_batch", insert_stub)
+    return stubs
@@ -54,3 +54,18 @@ def apply_external_stubs(monkeypatch):
     recorder = NotifyRecorder()
     monkeypatch.setattr(handle_telegram, "notify_developer", recorder)
     return recorder
+
+
+def stub_cron_runtime(opened=None):
+    """``open_cron_runtime`` stand-in yielding a runtime with no live connections."""
+    from contextlib import asynccontextmanager
+
+    from services.cron_runtime import CronRuntime
+
+    @asynccontextmanager
+    async def open_stub(n_markets=1):
+        if opened is not None:
+            opened.append(n_markets)
+        yield CronRuntime(mongo=object(), pg_pool=object())
+
+    return open_stub
@@ -20,7 +20,6 @@ class _StubUSProvider:
 
     def fetch_ticker_base_analytics(self, ticker, date, offset_n_days=85, actual_offset_n_days=50):
         import json
-        import requests
         from providers.polygon_us import POLYGON_SYMBOL_ALIASES
         from providers.analytics_mixin import base_analytics_from_ohlcv_utc
         import pandas as pd
@@ -61,7 +60,7 @@ async def pipeline_db(mongo_client):
 
 
 @pytest.fixture(autouse=True)
-def mock_provider_registry(monkeypatch):
+def mock_provider_registry(monkeypatch, http_stand_in):
     stub = _StubUSProvider()
 
     def _get_provider(market="US"):
@@ -73,23 +72,9 @@ def mock_provider_registry(monkeypatch):
         "utils.handle_external_apis.get_market_data_provider", _get_provider
     )
 
-    import json
-    import requests
-    from providers.polygon_us import POLYGON_SYMBOL_ALIASES
-
-    def fake_http_get(self, url, *args, **kwargs):
-        del self, args, kwargs
-        for ticker in CALC_TICKERS:
-            polygon_symbol = POLYGON_SYMBOL_ALIASES.get(ticker.upper(), ticker.upper())
-            if f"/ticker/{polygon_symbol}/" in url or f"/ticker/{ticker.upper()}/" in url:
-                payload = json.loads((OHLCV_DIR / f"{ticker}.json").read_text())
-                response = requests.Response()
-                response.status_code = 200
-                response._content = json.dumps(payload).encode("utf-8")
-                return response
-        raise AssertionError(f"unexpected polygon URL: {url}")
-
-    monkeypatch.setattr("providers.polygon_us.PolygonUSProvider._http_get", fake_http_get)
+    from tests.helpers.http_stand_in import serve_polygon_ohlcv_fixtures
+
+    serve_polygon_ohlcv_fixtures(http_stand_in, CALC_TICKERS)
     monkeypatch.setattr(
         "services.analytics_service.external_get_ticker_extra_analytics",
         lambda *args, **kwargs: {},
@@ -0,0 +1,65 @@
+"""Unit tests for the Mongo index apply script."""
+
+import pytest
+
+import scripts.apply_mongo_indexes as apply_mongo_indexes
+from db.mongo_indexes import ANALYTICS_KEY_INDEX_NAME
+
+
+async def _async_noop():
+    return None
+
+
+@pytest.fixture
+def index_script(monkeypatch):
+    calls = []
+
+    async def dedupe_stub(conn):
+        del conn
+        calls.append("dedupe")
+        return 3
+
+    monkeypatch.setattr(apply_mongo_indexes, "connect_mongo", _async_noop)
+    monkeypatch.setattr(apply_mongo_indexes, "close_mongo", _async_noop)
+    monkeypatch.setattr(apply_mongo_indexes, "dedupe_analytics_keys", dedupe_stub)
+    return calls
+
+
+def _ensure_returning(names, calls):
+    async def ensure_stub(conn):
+        del conn
+        calls.append("ensure")
+        return list(names)
+
+    return ensure_stub
+
+
+@pytest.mark.asyncio
+async def test_exits_non_zero_when_the_analytics_key_is_missing(
+    monkeypatch, index_script, capsys
+):
+    monkeypatch.setattr(
+        apply_mongo_indexes,
+        "ensure_mongo_indexes",
+        _ensure_returning(["date_ticker"], index_script),
+    )
+
+    status = await apply_mongo_indexes.apply_mongo_indexes()
+
+    assert status == 1
+    assert index_script == ["ensure"]
+    assert "--dedupe-analytics" in capsys.readouterr().err
+
+
+@pytest.mark.asyncio
+async def test_dedupes_before_building_the_analytics_key(monkeypatch, index_script):
+    monkeypatch.setattr(
+        apply_mongo_indexes,
+        "ensure_mongo_indexes",
+        _ensure_returning([ANALYTICS_KEY_INDEX_NAME], index_script),
+    )
+
+    status = await apply_mongo_indexes.apply_mongo_indexes(dedupe_analytics=True)
+
+    assert status == 0
+    assert index_script == ["dedupe", "ensure"]
@@ -199,18 +199,18 @@ async def test_patch_day_frequencies_upserts_lists_and_criterion(monkeypatch):
         upserts.append((artifact_key, payload, market, date))
 
     async def fake_freqs(
-        conn, date, criterion, ticker, market="US", price_band=None, period=25
+        conn, date, criterion, tickers, market="US", price_band=None, period=25
     ):
         del conn, period
-        freq_calls.append((date, criterion, ticker, market, price_band))
-        return "T-1"
+        freq_calls.append((date, criterion, tuple(tickers), market, price_band))
+        return {ticker: "T-1" for ticker in tickers}
 
     monkeypatch.setattr(
         backfill_band_tracking, "get_artifact_payload", fake_get_artifact
     )
     monkeypatch.setattr(backfill_band_tracking, "upsert_artifact", fake_upsert)
     monkeypatch.setattr(
-        backfill_band_tracking, "get_analytics_frequencies", fake_freqs
+        backfill_band_tracking, "get_analytics_frequencies_many", fake_freqs
     )
     # Limit bands/criteria so test stays small
     monkeypatch.setattr(
@@ -223,7 +223,7 @@ async def test_patch_day_frequencies_upserts_lists_and_criterion(monkeypatch):
     )
 
     assert written >= 1
-    assert ("2024-06-01", "one_day_avg_mf", "AAA", "US", None) in freq_calls
+    assert ("2024-06-01", "one_day_avg_mf", ("AAA",), "US", None) in freq_calls
 
     lists_upsert = next(u for u in upserts if u[0] == "lists_by_criteria:all")
     assert lists_upsert[1]["by_one_day_avg_mf"][0]["frequencies"] == "T-1"
@@ -246,14 +246,14 @@ async def test_patch_skips_missing_artifacts(monkeypatch, capsys):
         upserts.append((args, kwargs))
 
     async def fake_freqs(*args, **kwargs):
-        raise AssertionError("get_analytics_frequencies must not run when missing")
+        raise AssertionError("get_analytics_frequencies_many must not run when missing")
 
     monkeypatch.setattr(
         backfill_band_tracking, "get_artifact_payload", fake_get_artifact
     )
     monkeypatch.setattr(backfill_band_tracking, "upsert_artifact", fake_upsert)
     monkeypatch.setattr(
-        backfill_band_tracking, "get_analytics_frequencies", fake_freqs
+        backfill_band_tracking, "get_analytics_frequencies_many", fake_freqs
     )
     monkeypatch.setattr(
         backfill_band_tracking, "PRICE_BANDS_TO_PUBLISH", [None]
@@ -0,0 +1,49 @@
+"""Unit tests for the cron throughput benchmark's reporting."""
+
+import pytest
+
+import scripts.benchmark_cron as benchmark_cron
+
+
+def test_phase_throughput_sums_spans_and_credits_uncounted_phases():
+    spans = [
+        {"phase": "fetch", "seconds": 2.0, "counts": {"tickers": 600, "http_calls": 0}},
+        {"phase": "fetch", "seconds": 2.0, "counts": {"tickers": 400}},
+        {"phase": "insert", "seconds": 0.5, "counts": {"rows_written": 990}},
+        {"phase": "track", "seconds": 1.0, "counts": {}},
+    ]
+
+    phases = benchmark_cron.phase_throughput(spans, tickers=1000)
+
+    assert phases["fetch"] == {"seconds": 4.0, "tickers": 1000, "tickers_per_second": 250.0}
+    assert phases["insert"]["tickers_per_second"] == pytest.approx(1980.0)
+    assert phases["track"]["tickers"] == 1000
+
+
+def test_compare_with_baseline_flags_regressions_beyond_tolerance():
+    baseline = {
+        "tickers_per_second": 100.0,
+        "phases": {
+            "fetch": {"tickers_per_second": 500.0},
+            "compute": {"tickers_per_second": 200.0},
+        },
+        "peak_rss_mb": 400.0,
+        "db_round_trips": {"mongo": 100, "postgres": 50, "redis": None},
+    }
+    result = {
+        "tickers_per_second": 90.0,
+        "phases": {
+            "fetch": {"tickers_per_second": 300.0},
+            "compute": {"tickers_per_second": 190.0},
+        },
+        "peak_rss_mb": 410.0,
+        "db_round_trips": {"mongo": 400, "postgres": 55, "redis": 12},
+    }
+
+    regressions = benchmark_cron.compare_with_baseline(result, baseline, tolerance=0.2)
+
+    assert regressions == [
+        "phase fetch: 300.0 tickers/s vs baseline 500.0",
+        "mongo round trips: 400 vs baseline 100",
+    ]
+    assert benchmark_cron.compare_with_baseline(result, result, tolerance=0.0) == []
@@ -2,21 +2,35 @@
 Methods to calculate individual stock and market-as-a-whole indicators
 based on the histroical EOD data
 """
-from typing import Optional, List
-from json import loads
-import pandas as pd
-from pandas import DataFrame, concat
-from numpy import where, exp
+from math import isinf, isnan
+from typing import Dict, Optional, List
+from pandas import DataFrame
+from numpy import (
+    arange,
+    asarray,
+    broadcast_to,
+    clip,
+    cumsum,
+    errstate,
+    exp,
+    float64,
+    int64,
+    where,
+    zeros,
+)
+from scipy.signal import lfilter
 from scipy.stats import linregress
 
 from utils.handle_datetimes import bar_date_to_epoch_ms
 
-
-def _date_values_for_json(dates: pd.Series) -> pd.Series:
-    """pandas 1.3.x to_json() fails on tz-aware timestamps in a Series row."""
-    if pd.api.types.is_datetime64_any_dtype(dates):
-        return dates.map(bar_date_to_epoch_ms).rename("date")
-    return dates
+# analytics used to be serialized with DataFrame.to_json (10 decimals)
+JSON_DOUBLE_PRECISION = 10
+# number of trailing EMA values needed for the "over" comparisons
+EMA_TAIL = 3
+# bounce array covers the last 18 trading days (excluding the requested day)
+BOUNCE_SESSIONS = 18
+# keeps the money flow ratio finite when there is no negative flow
+MFI_NEGATIVE_FLOW_FLOOR = 10e-5
 
 
 def get_ema_n(series, period):
@@ -33,11 +47,162 @@ def get_ema_n(series, period):
     return series.ewm(span=period, adjust=False).mean()
 
 
+def _ema_tail(values, period: int, n_tail: int = EMA_TAIL):
+    """
+    Last ``n_tail`` values of ``Series.ewm(span=period, adjust=False).mean()``
+    computed as a first-order IIR filter over a float64 array
+    """
+    alpha = 2.0 / (period + 1.0)
+    ema, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])
+    return ema[-n_tail:]
+
+
+def _close_emas(close, periods, cache: Dict[int, object]) -> Dict[int, object]:
+    """EMA tails of the closing prices; each period is filtered once per stock"""
+    for period in periods:
+        if period not in cache:
+            cache[period] = _ema_tail(close, period)
+    return cache
+
+
+def _json_value(value):
+    """
+    Plain Python scalar as the former to_json/loads round trip returned it:
+    NaN -> 0 (fillna), inf -> None, floats rounded to JSON_DOUBLE_PRECISION
+    """
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float):
+        if isnan(value):
+            return 0.0
+        if isinf(value):
+            return None
+        return round(value, JSON_DOUBLE_PRECISION)
+    return value
+
+
+def _last_change(values, offset: int = 1) -> float:
+    """Fractional change of the last value against the one ``offset`` sessions before"""
+    if len(values) <= offset:
+        return float("nan")
+    return values[-1] / values[-1 - offset] - 1
+
+
+def _sorted_ohlcv(df):
+    """
+    Sorts by date (only when needed) and returns the frame with float64
+    column arrays for the kernels below
+    """
+    if not df["date"].is_monotonic_increasing:
+        df = df.sort_values(by="date")
+    arrays = {
+        name: df[name].to_numpy(dtype=float64)
+        for name in ("open", "high", "low", "close", "volume")
+    }
+    return df, arrays
+
+
+def _base_analytics(df, arrays, emas) -> dict:
+    close, volume = arrays["close"], arrays["volume"]
+    _close_emas(close, (12, 26), emas)
+
+    # average EOD money flow over the last three sessions
+    money_flow = volume[-3:] * (
+        (close[-3:] + arrays["high"][-3:] + arrays["low"][-3:]) / 3
+    )
+    # open/close changes (in fractions) over the bounce window
+    window = BOUNCE_SESSIONS + 1
+    with errstate(divide="ignore", invalid="ignore"):
+        open_close_change = close[-window:] / arrays["open"][-window:] - 1
+
+    has_three_sessions = len(close) >= 3
+    # running sums from the newest session backwards, newest-but-one first
+    bounce = cumsum(open_close_change[::-1])[::-1][:-1][::-1] * 100
+
+    return {
+        "ticker": df["ticker"].iloc[-1],
+        "date": bar_date_to_epoch_ms(df["date"].iloc[-1]),
+        "close": _json_value(close[-1]),
+        "open": _json_value(arrays["open"][-1]),
+        "macd": _json_value(emas[12][-1] - emas[26][-1]),
+        "one_day_avg_mf": _json_value(money_flow[-1]),
+        "three_day_avg_mf": _json_value(
+            money_flow.mean() if has_three_sessions else float("nan")
+        ),
+        "one_day_open_close_change": _json_value(open_close_change[-1]),
+        "volume": _json_value(df["volume"].iloc[-1]),
+        "three_day_avg_volume": _json_value(
+            volume[-3:].mean() if has_three_sessions else float("nan")
+        ),
+        "bounce": bounce.tolist(),
+    }
+
+
+def _extra_analytics(df, arrays, emas, n_trading_days: int) -> dict:
+    close, volume = arrays["close"], arrays["volume"]
+    _close_emas(close, (3, 9, 12, 13, 17, 20, 26, 27, 31, 32, 46, 50), emas)
+    has_four_sessions = len(close) >= 4
+
+    with errstate(divide="ignore", invalid="ignore"):
+        # 3 day averages compared to the 4th day (in fractions)
+        three_day_avg_volume_change = (
+            volume[-3:].mean() / volume[-4] - 1 if has_four_sessions else float("nan")
+        )
+        three_day_avg_close_change = (
+            close[-3:].mean() / close[-4] - 1 if has_four_sessions else float("nan")
+        )
+        # closing prices change between days for the 3-day period (in fractions)
+        dyas12_close_change = (close[-1] - close[-2]) / close[-2]
+        dyas23_close_change = (close[-2] - close[-3]) / close[-3]
+        one_day_volume_change = _last_change(volume)
+        one_day_close_change = _last_change(close)
+
+    # for comupting money flow ratio
+    typical_price = (close + arrays["high"] + arrays["low"]) / 3
+
+    # if a stock does not have a data for the last 14 days, use the availble period instead
+    if len(typical_price) - 1 < n_trading_days:
+        n_trading_days = len(typical_price) - 1
+
+    last_date = df["date"].iloc[-1]
+    ema3, ema9, ema12, ema20, ema26, ema50 = (emas[p] for p in (3, 9, 12, 20, 26, 50))
+    return {
+        "ticker": df["ticker"].iloc[-1],
+        "date": last_date if isinstance(last_date, str) else bar_date_to_epoch_ms(last_date),
+        "one_day_volume_change": _json_value(one_day_volume_change),
+        "three_day_avg_volume_change": _json_value(three_day_avg_volume_change),
+        "one_day_close_change": _json_value(one_day_close_change),
+        "three_day_avg_close_change": _json_value(three_day_avg_close_change),
+        "macd_2_sessions_ago": _json_value(emas[13][-1] - emas[27][-1]),
+        "macd_5_sessions_ago": _json_value(emas[17][-1] - emas[31][-1]),
+        "macd_20_sessions_ago": _json_value(emas[32][-1] - emas[46][-1]),
+        # comparing EMAs for diffrent periods over the three last days
+        # e.g. ema3 is higher than ema9 for the last three days (inlcuding last day in the period?)
+        # reversion arrays afterwards so that last day is on the first index
+        "ema_3over9": where(ema3 > ema9, "A", "B").tolist()[::-1],
+        "ema_12over9": where(ema12 > ema9, "A", "B").tolist()[::-1],
+        "ema_12over26": where(ema12 > ema26, "A", "B").tolist()[::-1],
+        "ema_50over20": where(ema50 > ema20, "A", "B").tolist()[::-1],
+        "closingPriceChangeDay12": float(dyas12_close_change),
+        "closingPriceChangeDay23": float(dyas23_close_change),
+        "mfi": get_money_flow_index(typical_price, volume, n_trading_days),
+        "ema3": float(ema3[-1]),
+        "ema9": float(ema9[-1]),
+        "ema12": float(ema12[-1]),
+        "ema20": float(ema20[-1]),
+        "ema26": float(ema26[-1]),
+        "ema50": float(ema50[-1]),
+    }
+
+
 def compute_base_analytics(df):
     """
     Function to assemble the json object with the base analytical characteristics
     (which supposed to be inserted into db) for a single stock.
 
+    Only the values of the last session (and the trailing bounce window) are
+    computed, as plain Python scalars.
+
     Args:
         df (pandas.dataframe):
             dataframe with EOD data for a single stock.
@@ -48,72 +213,11 @@ def compute_base_analytics(df):
         ticker, date, macd, one_day_avg_mf, three_day_avg_mf, last_day_open_close_change,
         volume, three_day_avg_volume
     """
+    df, arrays = _sorted_ohlcv(df)
+    return _base_analytics(df, arrays, {})
 
-    # making sure the last row in dataframe coincides with the first date in the past period
-    df = df.sort_values(by="date")
-    date_values = _date_values_for_json(df["date"])
-
-    # MACD
-    macd = DataFrame(get_ema_n(df["close"], 12) - get_ema_n(df["close"], 26)).rename(
-        columns={"close": "macd"}
-    )
-
-    # average EOD money flow
-    one_day_avg_mf = DataFrame(
-        df["volume"] * df[["close", "high", "low"]].mean(axis=1)
-    ).rename(columns={0: "one_day_avg_mf"})
-
-    # 3 day average of the average EOD money flow
-    three_day_avg_mf = DataFrame(
-        one_day_avg_mf["one_day_avg_mf"].rolling(3).mean()
-    ).rename(columns={"one_day_avg_mf": "three_day_avg_mf"})
-
-    # the last tradings day change between open and close prices (in fractions)
-    one_day_open_close_change = DataFrame(
-        df[["open", "close"]].pct_change(axis=1)["close"]
-    ).rename(columns={"close": "one_day_open_close_change"})
 
-    # 3 day average volume
-    three_day_avg_volume = DataFrame(df["volume"].rolling(3).mean()).rename(
-        columns={"volume": "three_day_avg_volume"}
-    )
-
-    # assembling the final dataframe
-    frames = [
-        df["ticker"],
-        date_values,
-        df["close"],
-        df["open"],
-        macd,
-        one_day_avg_mf,
-        three_day_avg_mf,
-        one_day_open_close_change,
-        df["volume"],
-        three_day_avg_volume,
-    ]
-    
-    # converting to json only the last day (-last row) data and converting NaNs to zeros
-    res = loads(concat(frames, join="inner", axis=1).fillna(0).iloc[-1].to_json())
-
-    res["date"] = bar_date_to_epoch_ms(df["date"].iloc[-1])
-
-    bounce_changes = one_day_open_close_change["one_day_open_close_change"]
-    return {
-        **res,
-        # bounce array is only for the last 18 trading days (but excluding the requested day)
-        "bounce": [
-            value * 100
-            for value in bounce_changes.iloc[::-1]
-            .cumsum()
-            .iloc[::-1]
-            .tolist()[-19:-1][::-1]
-        ],
-    }
-
-
-def compute_extra_analytics(
-    df, n_trading_days: Optional[int] = 15
-):  # pylint: disable=R0914
+def compute_extra_analytics(df, n_trading_days: Optional[int] = 15):
     """
     Function to assemble the json object with the extra analytical characteristics
     (which NOT supposed to be inserted into db) for a single stock.
@@ -127,120 +231,72 @@ def compute_extra_analytics(
     Returns:
         [type]: [description]
     """
+    df, arrays = _sorted_ohlcv(df)
+    return _extra_analytics(df, arrays, {}, n_trading_days)
 
-    # making sure the last row in dataframe coincides with the first date in the past period
-    df = df.sort_values(by="date")
 
-    # last day volume change in fractions
-    one_day_volume_change = DataFrame(df[["volume"]].pct_change()["volume"]).rename(
-        columns={"volume": "one_day_volume_change"}
-    )
+def compute_analytics(df, n_trading_days: Optional[int] = 15) -> dict:
+    """
+    Base and extra analytics for a single stock in one pass: the frame is
+    sorted once and every closing-price EMA is computed once.
 
-    # 3 day average volume  change compared to the 4th day in fractions
-    df["three_day_avg_mf"] = df["volume"].rolling(3).mean()
-    df["shifted_volume"] = df["volume"].shift(
-        3
-    )  # shifting 3 rows up to compare the 4th day with the 3-day average volume
-    three_day_avg_volume_change = DataFrame(
-        df[["shifted_volume", "three_day_avg_mf"]].pct_change(axis=1)[
-            "three_day_avg_mf"
-        ]
-    ).rename(columns={"three_day_avg_mf": "three_day_avg_volume_change"})
-
-    # last day closing price change in fractions
-    one_day_close_change = DataFrame(df[["close"]].pct_change()["close"]).rename(
-        columns={"close": "one_day_close_change"}
-    )
+    Same result as ``{**compute_base_analytics(df), **compute_extra_analytics(df)}``.
+    """
+    df, arrays = _sorted_ohlcv(df)
+    emas: Dict[int, object] = {}
+    return {
+        **_base_analytics(df, arrays, emas),
+        **_extra_analytics(df, arrays, emas, n_trading_days),
+    }
 
-    # 3 day average close price change compared to the 4th day
-    df["three_day_avg_close"] = df["close"].rolling(3).mean()
-    df["shifted_close"] = df["close"].shift(
-        3
-    )  # shifting 3 rows up to compare the 4th day with the 3-day average close price
-    three_day_avg_close_change = DataFrame(
-        df[["shifted_close", "three_day_avg_close"]].pct_change(axis=1)[
-            "three_day_avg_close"
-        ]
-    ).rename(columns={"three_day_avg_close": "three_day_avg_close_change"})
-
-    # closing price EMAs as numpy arrays
-    ema3 = get_ema_n(df["close"], 3).to_numpy()
-    ema9 = get_ema_n(df["close"], 9).to_numpy()
-    ema12 = get_ema_n(df["close"], 12).to_numpy()
-    ema20 = get_ema_n(df["close"], 20).to_numpy()
-    ema26 = get_ema_n(df["close"], 26).to_numpy()
-    ema50 = get_ema_n(df["close"], 50).to_numpy()
-
-    # closing prices change between days for the 3-day period (in fractions)
-    dyas12_close_change = (df["close"].iloc[-1] - df["close"].iloc[-2]) / df[
-        "close"
-    ].iloc[-2]
-    dyas23_close_change = (df["close"].iloc[-2] - df["close"].iloc[-3]) / df[
-        "close"
-    ].iloc[-3]
 
-    # for comupting money flow ratio
-    typical_price = DataFrame(df[["close", "high", "low"]].mean(axis=1)).rename(
-        columns={0: "typical"}
-    )
+def get_money_flow_ratio_batch(typical_prices, volumes, n_days):
+    """
+    Function to compute MFR (money flow ratio) for many stocks at once
 
-    # if a stock does not have a data for the last 14 days, use the availble period instead
-    if len(typical_price["typical"]) - 1 < n_trading_days:
-        n_trading_days = len(typical_price["typical"]) - 1
-
-    # MACDs
-    macd_2_sessions_ago = DataFrame(
-        get_ema_n(df["close"], 13) - get_ema_n(df["close"], 27)
-    ).rename(columns={"close": "macd_2_sessions_ago"})
-    macd_5_sessions_ago = DataFrame(
-        get_ema_n(df["close"], 17) - get_ema_n(df["close"], 31)
-    ).rename(columns={"close": "macd_5_sessions_ago"})
-    macd_20_sessions_ago = DataFrame(
-        get_ema_n(df["close"], 32) - get_ema_n(df["close"], 46)
-    ).rename(columns={"close": "macd_20_sessions_ago"})
+    Rows are stocks and columns are sessions (the last column is the last
+    session). Over the last ``n_days - 1`` sessions of every row the raw money
+    flow (typical price * volume) counts as positive when the typical price
+    rose against the previous session and as negative otherwise.
 
-    return {
-        # assembling new dataframe and converting to json only the
-        # last day (last row) data and converting NaNs to zeros
-        **loads(
-            concat(
-                [
-                    df["ticker"],
-                    df["date"],
-                    one_day_volume_change,
-                    three_day_avg_volume_change,
-                    one_day_close_change,
-                    three_day_avg_close_change,
-                    macd_2_sessions_ago,
-                    macd_5_sessions_ago,
-                    macd_20_sessions_ago,
-                ],
-                join="inner",
-                axis=1,
-            )
-            .fillna(0)
-            .iloc[-1]
-            .to_json()
-        ),
-        # comparing EMAs for diffrent periods over the three last days
-        # e.g. ema3 is higher than ema9 for the last three days (inlcuding last day in the period?)
-        # reversion arrays afterwards so that last day is on the first index
-        "ema_3over9": where(ema3[-3:] > ema9[-3:], "A", "B").tolist()[::-1],
-        "ema_12over9": where(ema12[-3:] > ema9[-3:], "A", "B").tolist()[::-1],
-        "ema_12over26": where(ema12[-3:] > ema26[-3:], "A", "B").tolist()[::-1],
-        "ema_50over20": where(ema50[-3:] > ema20[-3:], "A", "B").tolist()[::-1],
-        "closingPriceChangeDay12": dyas12_close_change,
-        "closingPriceChangeDay23": dyas23_close_change,
-        "mfi": get_money_flow_index(
-            typical_price["typical"], df["volume"], n_trading_days
-        ),
-        "ema3": ema3[-1],
-        "ema9": ema9[-1],
-        "ema12": ema12[-1],
-        "ema20": ema20[-1],
-        "ema26": ema26[-1],
-        "ema50": ema50[-1],
-    }
+    Args:
+        typical_prices (numpy.ndarray): 2-D typical prices (stocks x sessions)
+        volumes (numpy.ndarray): 2-D volumes of the same shape
+        n_days (int | numpy.ndarray): the period, either shared or one per stock
+
+    Returns:
+        numpy.ndarray: MFR per stock
+    """
+    typical_prices = asarray(typical_prices, dtype=float64)
+    volumes = asarray(volumes, dtype=float64)
+    n_stocks, n_sessions = typical_prices.shape
+
+    n_days = broadcast_to(asarray(n_days, dtype=int64), (n_stocks,))
+    n_flows = clip(n_days - 1, 0, max(n_sessions - 1, 0))
+    width = int(n_flows.max()) if n_stocks else 0
+    if width <= 0:
+        return zeros(n_stocks, dtype=float64)
+
+    current = typical_prices[:, -width:]
+    previous = typical_prices[:, -width - 1 : -1]
+    raw_mf = current * volumes[:, -width:]
+    # each row only counts its own last n_flows sessions
+    in_period = arange(width) >= (width - n_flows)[:, None]
+    rising = current > previous
+
+    positive_mf = where(in_period & rising, raw_mf, 0.0).sum(axis=1)
+    negative_mf = MFI_NEGATIVE_FLOW_FLOOR + where(in_period & ~rising, raw_mf, 0.0).sum(axis=1)
+    return positive_mf / negative_mf
+
+
+def get_money_flow_index_batch(typical_prices, volumes, n_days):
+    """
+    Money Flow Index for many stocks at once (see get_money_flow_ratio_batch)
+
+    Returns:
+        numpy.ndarray: MFI per stock
+    """
+    return 100 - 100 / (1 + get_money_flow_ratio_batch(typical_prices, volumes, n_days))
 
 
 def get_money_flow_ratio(typical_prices, volumes, n_days) -> float:
@@ -248,29 +304,20 @@ def get_money_flow_ratio(typical_prices, volumes, n_days) -> float:
     Function to compute MFR (money flow ratio)
 
     Args:
-        typical_prices (pandas.dataseries): typical prices data series
-        volumes (pandas.dataseries): volume data series
+        typical_prices (array-like): typical prices data series
+        volumes (array-like): volume data series
         n_days (int): the period, over which to compute the MFI
 
     Returns:
         float: MFR
     """
-
-    positive_mf = 0
-    negative_mf = 10e-5  # can't divide by zero
-
-    # computing positive and negative money flow
-    for i in range(n_days - 1):
-        # previous to the last
-        current_typical_price = typical_prices.iloc[-(i + 1)]
-        raw_mf = current_typical_price * volumes.iloc[-(i + 1)]
-
-        if current_typical_price > typical_prices.iloc[-(i + 2)]:
-            positive_mf += raw_mf
-        else:
-            negative_mf += raw_mf
-
-    return positive_mf / negative_mf
+    return float(
+        get_money_flow_ratio_batch(
+            asarray(typical_prices, dtype=float64)[None, :],
+            asarray(volumes, dtype=float64)[None, :],
+            n_days,
+        )[0]
+    )
 
 
 def get_money_flow_index(typical_prices, volumes, n_days) -> float:
@@ -279,8 +326,8 @@ def get_money_flow_index(typical_prices, volumes, n_days) -> float:
     (see https://www.investopedia.com/terms/m/mfi.asp for details)
 
     Args:
-        typical_prices (pandas.dataseries): typical prices data series
-        volumes (pandas.dataseries): volume data series
+        typical_prices (array-like): typical prices data series
+        volumes (array-like): volume data series
         n_days (int): the period, over which to compute the MFI
 
     Returns:
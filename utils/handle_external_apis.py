@@ -1,10 +1,12 @@
 """
 Methods to access external endpoints and manage responses
 """
+import json
 import random
 import time
 import requests
 import pandas as pd
+from datetime import date as date_type
 from typing import Optional, List
 from time import sleep
 from pandas import date_range, json_normalize
@@ -13,6 +15,12 @@ from requests.exceptions import RequestException
 import nasdaqdatalink
 from fake_headers import Headers
 from db.redis import RedisCache
+from db.crud.ticker_universe import (
+    UniverseDiff,
+    UniverseEntry,
+    fetch_universe,
+    store_universe,
+)
 from utils.handle_validation import validate_date_string
 from utils.handle_datetimes import (
     get_epoch,
@@ -48,11 +56,18 @@ cache.connect()
 _ticker_universe_cache: dict[tuple[str, str], list] = {}
 
 
+UNIVERSE_REDIS_PREFIX = "universe"
+
+
 def clear_ticker_universe_cache() -> None:
     """Clear in-process ticker universe memoization (call at cron start)."""
     _ticker_universe_cache.clear()
 
 
+def _universe_redis_key(market: str, date: str) -> str:
+    return f"{UNIVERSE_REDIS_PREFIX}:{market}:{date}"
+
+
 MI_REQUEST_TIMEOUT_SECONDS = 30
 MI_MAX_ATTEMPTS = 3
 
@@ -211,6 +226,106 @@ def get_ticker_extra_analytics(
         ) from e
 
 
+def sync_grouped_daily_bars(
+    date: str,
+    offset_n_days: Optional[int] = 85,
+    market: str = DEFAULT_MARKET,
+) -> dict:
+    """
+    Fill the OHLCV bar store for the whole market over the analytics window
+    using grouped daily bars, so per-ticker analytics read from PG only.
+    Providers without a grouped endpoint return zero counts.
+
+    Returns:
+        dict: {"requests", "sessions", "bars"} counts for the sync
+    """
+    provider = get_market_data_provider(market)
+    if not getattr(provider, "supports_grouped_daily", False):
+        return {"requests": 0, "sessions": 0, "bars": 0}
+    return provider.sync_grouped_window(date, offset_n_days)
+
+
+def load_cached_ohlcv_window_arrays(
+    tickers: List[str],
+    date: str,
+    offset_n_days: Optional[int] = 85,
+    actual_offset_n_days: Optional[int] = 50,
+    market: str = DEFAULT_MARKET,
+) -> dict:
+    """
+    Load complete OHLCV windows for many tickers from the bar store in a few
+    round trips. Tickers missing from the result need the per-ticker
+    provider path.
+
+    Returns:
+        dict: ticker -> BarArrays (ascending session order)
+    """
+    provider = get_market_data_provider(market)
+    if not hasattr(provider, "load_cached_window_arrays"):
+        return {}
+    return provider.load_cached_window_arrays(
+        tickers, date, offset_n_days, actual_offset_n_days
+    )
+
+
+def supports_ohlcv_window_arrays(market: str = DEFAULT_MARKET) -> bool:
+    """Whether the market provider can return raw bar windows for local compute."""
+    provider = get_market_data_provider(market)
+    return hasattr(provider, "fetch_ohlcv_window_arrays_async")
+
+
+async def get_ticker_ohlcv_window_arrays_async(
+    ticker: str,
+    date: str,
+    offset_n_days: Optional[int] = 85,
+    actual_offset_n_days: Optional[int] = 50,
+    market: str = DEFAULT_MARKET,
+):
+    """
+    Awaitable get_ticker_ohlcv_window_arrays for callers already on an event
+    loop; provider HTTP runs on the loop's pooled client.
+
+    Returns:
+        BarArrays | None: ascending session order; None when there is not enough data
+    """
+    try:
+        provider = get_market_data_provider(market)
+        return await provider.fetch_ohlcv_window_arrays_async(
+            ticker, date, offset_n_days, actual_offset_n_days
+        )
+    except Exception as e:
+        print("Error message:", e)
+        raise Exception(
+            f"utils/handle_external_apis.py, get_ticker_ohlcv_window_arrays_async reported an error for ticker {ticker} and date {date}"
+        ) from e
+
+
+def get_ticker_ohlcv_window_arrays(
+    ticker: str,
+    date: str,
+    offset_n_days: Optional[int] = 85,
+    actual_offset_n_days: Optional[int] = 50,
+    market: str = DEFAULT_MARKET,
+):
+    """
+    OHLCV window of a single stock as column arrays (the I/O half of
+    get_ticker_base_analytics).
+
+    Returns:
+        BarArrays | None: ascending session order; None when there is not enough data
+    """
+    try:
+        provider = get_market_data_provider(market)
+        return provider.fetch_ohlcv_window_arrays(
+            ticker, date, offset_n_days, actual_offset_n_days
+        )
+    except Exception as e:
+        print("Error message:", e)
+        raise Exception(
+            f"utils/handle_external_apis.py, get_ticker_ohlcv_window_arrays reported an error for ticker {ticker} and date {date}"
+        ) from e
+
+
 @cache.use_cache()
 def get_market_sp500(date: str, actual_offset_n_days: Optional[int] = 50):
     """
@@ -308,17 +423,97 @@ def get_market_vixs(
             "utils/handle_external_apis.py, def get_market_vixs reported an error"
         ) from e
 
+def _read_universe_mirror(market: str, date: str) -> Optional[list]:
+    try:
+        if cache.client is None:
+            return None
+        raw = cache.client.get(_universe_redis_key(market, date))
+        return json.loads(raw) if raw is not None else None
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"utils/handle_external_apis.py _read_universe_mirror: {e}")
+        return None
+
+
+def _write_universe_mirror(market: str, date: str, tickers: list) -> None:
+    try:
+        if cache.client is None:
+            return
+        cache.client.set(
+            _universe_redis_key(market, date),
+            json.dumps(tickers),
+            ex=int(cache.expiration.total_seconds()),
+        )
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"utils/handle_external_apis.py _write_universe_mirror: {e}")
+
+
+def refresh_ticker_universe(date: str, market: str = DEFAULT_MARKET) -> UniverseDiff:
+    """
+    Fetch the market's universe from the provider, store it for the session
+    with its diff against the previous stored session, and update the Redis
+    mirror and in-process memo.
+
+    Returns:
+        UniverseDiff: added/removed tickers vs the previous stored session
+    """
+    from core.settings import TICKER_UNIVERSE_STORE_DISABLED
+
+    market = normalize_market(market)
+    provider = get_market_data_provider(market)
+    if hasattr(provider, "fetch_ticker_universe_entries"):
+        entries = provider.fetch_ticker_universe_entries(date)
+    else:
+        entries = [UniverseEntry(ticker=t) for t in provider.fetch_ticker_universe(date)]
+    tickers = sorted({entry.ticker for entry in entries})
+
+    diff = None
+    # an empty response is a provider hiccup, not a session without listings
+    if tickers and not TICKER_UNIVERSE_STORE_DISABLED:
+        diff = store_universe(market, date, entries)
+        _write_universe_mirror(market, date, tickers)
+    if diff is None:
+        diff = UniverseDiff(
+            market=market,
+            session_date=date_type.fromisoformat(date),
+            ticker_count=len(tickers),
+        )
+    else:
+        print(
+            f"utils/handle_external_apis.py refresh_ticker_universe: {market} {date}"
+            f" {diff.ticker_count} tickers (+{len(diff.added)}/-{len(diff.removed)}"
+            f" vs {diff.previous_session_date})"
+        )
+    _ticker_universe_cache[(market, date)] = tickers
+    return diff
+
+
 def get_tickers(date: str, market: str = DEFAULT_MARKET) -> list:
+    """
+    Ticker universe of the market for the session. Served from the in-process
+    memo, then the Redis mirror, then Postgres; the provider is only asked
+    once per session (refresh_ticker_universe).
+    """
+    from core.settings import TICKER_UNIVERSE_STORE_DISABLED
+
     try:
         market = normalize_market(market)
         cache_key = (market, date)
         if cache_key in _ticker_universe_cache:
             return list(_ticker_universe_cache[cache_key])
 
-        provider = get_market_data_provider(market)
-        tickers = provider.fetch_ticker_universe(date)
-        _ticker_universe_cache[cache_key] = tickers
-        return tickers
+        if not TICKER_UNIVERSE_STORE_DISABLED:
+            tickers = _read_universe_mirror(market, date)
+            if tickers is None:
+                entries = fetch_universe(market, date)
+                if entries:
+                    tickers = [entry.ticker for entry in entries]
+                    _write_universe_mirror(market, date, tickers)
+            if tickers:
+                _ticker_universe_cache[cache_key] = tickers
+                return list(tickers)
+
+        refresh_ticker_universe(date, market=market)
+        return list(_ticker_universe_cache[cache_key])
     except Exception as e:
         print("Error message:", e)
         raise Exception(
@@ -457,18 +652,23 @@ def get_quarterly_free_cash_flow_polygon(ticker: str, date_quarter: str) -> str:
     except (KeyError, IndexError, TypeError):
         return "N/A"
 
-def cache_quaterly_free_cash_flow(tickers: List[str], date: str, rate_limit: int = 10):
+def cache_quaterly_free_cash_flow(
+    tickers: Optional[List[str]], date: str, rate_limit: int = 10
+):
     """
     Utility function to cache (in Redis) a result of
     the call to def get_quaterly_free_cash_flow
 
     Args:
-        tickers (list[str]): list of tickers fo which the FCF needs to be cached
+        tickers (list[str] | None): list of tickers fo which the FCF needs to be cached;
+            None caches the stored US universe of the session
         date (str): reqeusted date
         rate_limit (int, optional):
             number of seconds to wait before calling get_quaterly_free_cash_flow.
             Defaults to 2.
     """
+    if tickers is None:
+        tickers = get_tickers(date, market="US")
     start_date = get_past_date(366, date)
     try:
         quater_dates = date_range(start_date, date, freq="QE")
@@ -0,0 +1,196 @@
+"""
+Vectorized base analytics over a tickers x sessions OHLCV panel.
+
+Mirrors compute_base_analytics for many stocks at once: every indicator is
+computed with NumPy along the session axis for all tickers in one pass.
+Windows are right-aligned (last session in the last column) and padded
+with NaN on the left, so tickers with shorter history share the block.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from utils.handle_calculations import BOUNCE_SESSIONS, get_money_flow_index_batch
+from utils.handle_datetimes import bar_date_to_epoch_ms
+
+if TYPE_CHECKING:
+    from db.crud.ohlcv_bars import BarArrays
+
+MFI_TRADING_DAYS = 15
+
+
+@dataclass(frozen=True)
+class OhlcvPanel:
+    """Right-aligned OHLCV block; rows follow ``tickers``."""
+
+    tickers: List[str]
+    last_dates: np.ndarray  # datetime64[D], one per ticker
+    lengths: np.ndarray  # valid sessions per ticker
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+
+def build_ohlcv_panel(windows: Dict[str, "BarArrays"]) -> OhlcvPanel:
+    """
+    Stack per-ticker ascending bar arrays into one panel.
+
+    Args:
+        windows (dict): ticker -> BarArrays (ascending session order)
+
+    Returns:
+        OhlcvPanel: float64 blocks of shape (n_tickers, longest window)
+    """
+    tickers = [ticker.upper() for ticker in windows]
+    arrays = list(windows.values())
+    lengths = np.array([len(item) for item in arrays], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    blocks = {
+        name: np.full((len(arrays), width), np.nan, dtype=np.float64)
+        for name in ("open", "high", "low", "close", "volume")
+    }
+    for row, item in enumerate(arrays):
+        start = width - len(item)
+        for name, block in blocks.items():
+            block[row, start:] = getattr(item, name)
+    last_dates = np.array(
+        [item.session_date[-1] for item in arrays], dtype="datetime64[D]"
+    )
+    return OhlcvPanel(
+        tickers=tickers,
+        last_dates=last_dates,
+        lengths=lengths,
+        **blocks,
+    )
+
+
+def ema_panel(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Row-wise EMA matching ``Series.ewm(span=period, adjust=False).mean()``;
+    each row starts at its first non-NaN value.
+    """
+    alpha = 2.0 / (period + 1.0)
+    result = np.empty_like(values)
+    previous = np.full(values.shape[0], np.nan)
+    for col in range(values.shape[1]):
+        current = values[:, col]
+        previous = np.where(
+            np.isnan(previous),
+            current,
+            np.where(np.isnan(current), previous, alpha * current + (1 - alpha) * previous),
+        )
+        result[:, col] = previous
+    return result
+
+
+def _trailing_mean(values: np.ndarray, n_sessions: int) -> np.ndarray:
+    """Mean of the last n sessions per row; NaN when a row is shorter (pandas rolling)."""
+    return values[:, -n_sessions:].mean(axis=1)
+
+
+def _bounce_panel(changes: np.ndarray, lengths: np.ndarray) -> List[List[float]]:
+    # suffix sums of open/close changes, newest-but-one first (see compute_base_analytics)
+    suffix = np.nancumsum(changes[:, ::-1], axis=1)[:, ::-1]
+    tail = suffix[:, -(BOUNCE_SESSIONS + 1) : -1][:, ::-1] * 100
+    bounces = []
+    for row, length in enumerate(lengths):
+        n_values = max(0, min(BOUNCE_SESSIONS, int(length) - 1))
+        bounces.append(tail[row, :n_values].tolist())
+    return bounces
+
+
+def _nan_to_zero(values: np.ndarray) -> List[float]:
+    return np.where(np.isnan(values), 0.0, values).tolist()
+
+
+def compute_base_analytics_panel(
+    panel: OhlcvPanel, macd: Optional[np.ndarray] = None
+) -> List[dict]:
+    """
+    Base analytics for every ticker in the panel (same fields and semantics
+    as compute_base_analytics; NaNs are reported as zeros).
+
+    Args:
+        panel (OhlcvPanel): stacked OHLCV windows
+        macd (np.ndarray, optional): last-session MACD per ticker when already
+            known (incremental state); the panel then only needs the last
+            BOUNCE_SESSIONS + 1 sessions
+
+    Returns:
+        list[dict]: one analytics dict per ticker, in panel order
+    """
+    if not panel.tickers:
+        return []
+
+    close = panel.close
+    if macd is None:
+        macd = (ema_panel(close, 12) - ema_panel(close, 26))[:, -1]
+    money_flow = panel.volume * ((close + panel.high + panel.low) / 3)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        open_close_change = close / panel.open - 1
+
+    last_close = close[:, -1].tolist()
+    last_open = panel.open[:, -1].tolist()
+    last_volume = panel.volume[:, -1].tolist()
+    columns = {
+        "macd": _nan_to_zero(macd),
+        "one_day_avg_mf": _nan_to_zero(money_flow[:, -1]),
+        "three_day_avg_mf": _nan_to_zero(_trailing_mean(money_flow, 3)),
+        "one_day_open_close_change": _nan_to_zero(open_close_change[:, -1]),
+        "three_day_avg_volume": _nan_to_zero(_trailing_mean(panel.volume, 3)),
+    }
+    bounces = _bounce_panel(open_close_change, panel.lengths)
+    dates = np.datetime_as_string(panel.last_dates, unit="D").tolist()
+
+    results = []
+    for row, ticker in enumerate(panel.tickers):
+        results.append(
+            {
+                "ticker": ticker,
+                "date": bar_date_to_epoch_ms(dates[row]),
+                "close": last_close[row],
+                "open": last_open[row],
+                "macd": columns["macd"][row],
+                "one_day_avg_mf": columns["one_day_avg_mf"][row],
+                "three_day_avg_mf": columns["three_day_avg_mf"][row],
+                "one_day_open_close_change": columns["one_day_open_close_change"][row],
+                "volume": last_volume[row],
+                "three_day_avg_volume": columns["three_day_avg_volume"][row],
+                "bounce": bounces[row],
+            }
+        )
+    return results
+
+
+def compute_base_analytics_for_windows(windows: Dict[str, "BarArrays"]) -> Dict[str, dict]:
+    """Panel base analytics keyed by the requested ticker."""
+    if not windows:
+        return {}
+    panel = build_ohlcv_panel(windows)
+    return dict(zip(windows.keys(), compute_base_analytics_panel(panel)))
+
+
+def compute_mfi_panel(panel: OhlcvPanel, n_trading_days: int = MFI_TRADING_DAYS) -> List[float]:
+    """
+    Money Flow Index for every ticker in the panel (same value as the
+    ``mfi`` field of compute_extra_analytics); shorter windows use the
+    available period instead.
+    """
+    if not panel.tickers:
+        return []
+    typical = (panel.close + panel.high + panel.low) / 3
+    n_days = np.minimum(n_trading_days, panel.lengths - 1)
+    return get_money_flow_index_batch(typical, panel.volume, n_days).tolist()
+
+
+def compute_mfi_for_windows(
+    windows: Dict[str, "BarArrays"], n_trading_days: int = MFI_TRADING_DAYS
+) -> Dict[str, float]:
+    """Panel MFI keyed by the requested ticker (e.g. a whole top list)."""
+    if not windows:
+        return {}
+    panel = build_ohlcv_panel(windows)
+    return dict(zip(windows.keys(), compute_mfi_panel(panel, n_trading_days)))